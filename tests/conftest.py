@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the app the way start_platform.py runs it: from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def dashboard(tmp_path_factory):
+    """The app module, bound to a throwaway SQLite database."""
+    os.environ["DATABASE_URL"] = "sqlite:///" + str(tmp_path_factory.mktemp("db") / "users.db")
+    from unified_dashboard import app as dashboard
+    return dashboard
+
+
+@pytest.fixture
+def user(dashboard):
+    db = dashboard.db
+    with dashboard.app.app_context():
+        user = dashboard.User(username="analyst", email="analyst@example.com", password="x")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    yield user_id
+    with dashboard.app.app_context():
+        db.session.execute(dashboard.ActivityLog.__table__.delete())
+        db.session.execute(dashboard.ActivityRollup.__table__.delete())
+        db.session.execute(dashboard.User.__table__.delete())
+        db.session.commit()
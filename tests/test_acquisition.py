@@ -0,0 +1,108 @@
+import hashlib
+import os
+import stat
+import sys
+
+import pytest
+
+from unified_dashboard.modules.ram_forensics import acquisition, results
+
+# Stands in for `adb exec-out "su -c 'dd if=... bs=N skip=M ...'"`: serves FAKE_MEM from
+# the requested block and, if FAKE_FAIL_AFTER is set, drops off after that many bytes
+FAKE_ADB = f"""#!{sys.executable}
+import os, re, sys
+remote = sys.argv[-1]
+bs = int(re.search(r"bs=(\\d+)", remote).group(1))
+skip = int(re.search(r"skip=(\\d+)", remote).group(1))
+with open(os.environ["FAKE_MEM"], "rb") as f:
+    data = f.read()[skip * bs:]
+limit = os.environ.get("FAKE_FAIL_AFTER")
+sys.stdout.buffer.write(data[:int(limit)] if limit else data)
+sys.exit(1 if limit else 0)
+"""
+
+
+@pytest.fixture
+def device(tmp_path, monkeypatch):
+    monkeypatch.setattr(acquisition, "CHUNK_SIZE", 4096)
+    monkeypatch.setattr(acquisition, "DD_BLOCK", 1024)
+    monkeypatch.setattr(acquisition, "READ_SIZE", 1000)
+    mem = os.urandom(4096 * 5 + 1000)
+    (tmp_path / "mem").write_bytes(mem)
+    monkeypatch.setenv("FAKE_MEM", str(tmp_path / "mem"))
+    adb = tmp_path / "adb"
+    adb.write_text(FAKE_ADB)
+    adb.chmod(adb.stat().st_mode | stat.S_IEXEC)
+    return str(adb), mem
+
+
+def _run(adb, dump_path, **kwargs):
+    return "".join(acquisition.stream_dd(adb, dump_path, **kwargs))
+
+
+def test_interrupted_acquisition_resumes_from_state(tmp_path, monkeypatch, device):
+    adb, mem = device
+    dump_path = str(tmp_path / "android.raw")
+
+    monkeypatch.setenv("FAKE_FAIL_AFTER", str(4096 * 2 + 500))
+    out = _run(adb, dump_path)
+
+    assert "interrupted at chunk 2" in out
+    state = acquisition.load_state(dump_path)
+    assert (state["chunks_done"], state["file_offset"]) == (2, 8192)
+    assert acquisition.pending(str(tmp_path))[0]["name"] == "android.raw"
+
+    # A chunk that was only partly written before the drop is discarded on resume
+    with open(dump_path + ".part", "ab") as f:
+        f.write(b"torn")
+    monkeypatch.delenv("FAKE_FAIL_AFTER")
+    out = _run(adb, dump_path, resume=True)
+
+    assert "Resuming at chunk 2" in out
+    with open(dump_path, "rb") as f:
+        assert f.read() == mem
+    state = acquisition.load_state(dump_path)
+    assert state["completed_at"]
+    assert state["sha256"] == hashlib.sha256(mem).hexdigest()
+    assert state["chunk_sha256"] == [hashlib.sha256(mem[i:i + 4096]).hexdigest() for i in range(0, len(mem), 4096)]
+    assert acquisition.pending(str(tmp_path)) == []
+    # Analyses reuse the acquisition hash instead of hashing the dump again
+    assert results.known_sha256(dump_path) == state["sha256"]
+
+
+def test_state_with_another_chunk_size_starts_over(tmp_path, monkeypatch, device):
+    adb, mem = device
+    dump_path = str(tmp_path / "android.raw")
+    monkeypatch.setenv("FAKE_FAIL_AFTER", "5000")
+    _run(adb, dump_path)
+    monkeypatch.setattr(acquisition, "CHUNK_SIZE", 2048)
+    monkeypatch.delenv("FAKE_FAIL_AFTER")
+
+    out = _run(adb, dump_path, resume=True)
+
+    assert "starting over" in out
+    with open(dump_path, "rb") as f:
+        assert f.read() == mem
+
+
+@pytest.mark.skipif(acquisition.zstandard is None, reason="zstandard not installed")
+def test_compressed_resume_keeps_the_original_codec(tmp_path, monkeypatch, device):
+    adb, mem = device
+    dump_path = str(tmp_path / "android.raw")
+    monkeypatch.setenv("FAKE_FAIL_AFTER", "9000")
+    _run(adb, dump_path, codec="zstd")
+    monkeypatch.delenv("FAKE_FAIL_AFTER")
+
+    _run(adb, dump_path, codec="none", resume=True)
+
+    with open(dump_path + ".zst", "rb") as f:
+        assert b"".join(acquisition._decompress_stream("zstd", f)) == mem
+
+
+def test_no_data_is_an_error(tmp_path, monkeypatch, device):
+    adb, _ = device
+    (tmp_path / "mem").write_bytes(b"")
+
+    out = _run(adb, str(tmp_path / "android.raw"))
+
+    assert "No data received" in out
@@ -0,0 +1,95 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from unified_dashboard.activity import ActivityWriter, rollup_day
+
+
+@pytest.fixture
+def writer(dashboard, tmp_path, monkeypatch):
+    monkeypatch.setitem(dashboard.app.config, "ACTIVITY_LOG_QUEUE_SIZE", 5)
+    monkeypatch.setitem(dashboard.app.config, "ACTIVITY_LOG_BATCH_SIZE", 3)
+    monkeypatch.setitem(dashboard.app.config, "ACTIVITY_ARCHIVE_DIR", str(tmp_path / "archive"))
+    writer = ActivityWriter()
+    writer.init_app(dashboard.app, dashboard.ActivityLog, dashboard.ActivityRollup)
+    # No background thread: tests drive flushes themselves
+    writer.stopping.set()
+    yield writer
+    # Nothing left for the exit-time flush once the test user is gone
+    while writer._take_batch(0):
+        pass
+
+
+def _event(user_id, action="TOOL_ACCESS", timestamp=None):
+    return {"user_id": user_id, "action": action, "details": "test", "timestamp": timestamp or datetime.utcnow()}
+
+
+def _count(dashboard, model):
+    with dashboard.app.app_context():
+        return dashboard.db.session.query(model).count()
+
+
+def test_batches_are_bounded_and_written_in_one_go(dashboard, writer, user):
+    for _ in range(5):
+        writer.queue.put(_event(user))
+
+    assert len(writer._take_batch(0)) == 3
+    assert len(writer._take_batch(0)) == 2
+    assert writer._take_batch(0) == []
+
+    for _ in range(5):
+        writer.queue.put(_event(user))
+    writer.flush()
+
+    assert writer.stats() == {"queued": 0, "written": 5, "dropped": 0}
+    assert _count(dashboard, dashboard.ActivityLog) == 5
+
+
+def test_full_queue_drops_page_views(dashboard, writer, user, monkeypatch):
+    monkeypatch.setattr("unified_dashboard.activity.BLOCK_SECONDS", 0.01)
+    for _ in range(5):
+        assert writer.record(user, "TOOL_ACCESS")
+
+    assert not writer.record(user, "TOOL_ACCESS")
+    # Audit events wait for room, and are dropped only when none frees up
+    assert not writer.record(user, "LOGIN")
+    assert writer.stats()["dropped"] == 2
+
+
+def test_rollups_count_each_batch(dashboard, writer, user):
+    now = datetime.utcnow()
+    for action in ("LOGIN", "TOOL_ACCESS", "TOOL_ACCESS"):
+        writer.queue.put(_event(user, action, now))
+    writer.flush()
+    writer.queue.put(_event(user, "TOOL_ACCESS", now))
+    writer.flush()
+
+    with dashboard.app.app_context():
+        rows = dashboard.db.session.query(dashboard.ActivityRollup).all()
+        counts = {(r.day, r.action): r.events for r in rows}
+    assert counts == {(rollup_day(now), "LOGIN"): 1, (rollup_day(now), "TOOL_ACCESS"): 3}
+
+
+def test_old_events_are_archived_and_deleted(dashboard, writer, user, tmp_path):
+    old = datetime.utcnow() - timedelta(days=200)
+    for i in range(5):
+        writer.queue.put(_event(user, "TOOL_ACCESS", old + timedelta(minutes=i)))
+    writer.flush()
+    writer.queue.put(_event(user, "LOGIN"))
+    writer.flush()
+    writer.stopping.clear()  # the archiver stops between batches once the writer is stopping
+
+    archived = writer.archive_old_events(days=180, batch_size=2)
+
+    assert archived == 5
+    assert _count(dashboard, dashboard.ActivityLog) == 1
+    (path,) = (tmp_path / "archive").glob("*.jsonl.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [r["timestamp"] for r in rows] == [(old + timedelta(minutes=i)).isoformat() for i in range(5)]
+    # Aggregates outlive the raw rows
+    with dashboard.app.app_context():
+        events = dashboard.db.session.query(dashboard.db.func.sum(dashboard.ActivityRollup.events)).scalar()
+    assert events == 6
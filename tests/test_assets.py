@@ -0,0 +1,106 @@
+import gzip
+
+import pytest
+from flask import Blueprint, Flask, url_for
+
+from unified_dashboard.assets import IMMUTABLE_MAX_AGE, AssetPipeline
+
+CSS = b"body { color: #222; }\n" * 200
+
+
+@pytest.fixture
+def app(tmp_path):
+    (tmp_path / "static").mkdir()
+    (tmp_path / "static" / "app.css").write_bytes(CSS)
+    (tmp_path / "static" / "logo.png").write_bytes(b"\x89PNG" + b"\x00" * 2000)
+    (tmp_path / "tool_static").mkdir()
+    (tmp_path / "tool_static" / "tool.js").write_bytes(b"console.log(1);")
+
+    app = Flask(__name__, static_folder=str(tmp_path / "static"))
+    app.register_blueprint(Blueprint("tool", __name__, url_prefix="/tool", static_folder=str(tmp_path / "tool_static")))
+    app.assets = AssetPipeline()
+    app.assets.init_app(app)
+    return app
+
+
+def _versioned(app, endpoint, filename):
+    with app.test_request_context():
+        return url_for(endpoint, filename=filename)
+
+
+def test_url_for_adds_the_content_hash(app):
+    url = _versioned(app, "static", "app.css")
+    tool_url = _versioned(app, "tool.static", "tool.js")
+
+    assert url.startswith("/static/app.css?v=")
+    assert tool_url.startswith("/tool/tool_static/tool.js?v=")
+    with app.test_request_context():
+        # Missing files and explicit versions are left alone
+        assert url_for("static", filename="missing.css") == "/static/missing.css"
+        assert url_for("static", filename="app.css", v="x") == "/static/app.css?v=x"
+
+
+def test_versioned_request_is_immutable(app):
+    response = app.test_client().get(_versioned(app, "static", "app.css"))
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    assert "Expires" not in response.headers
+
+
+def test_unversioned_or_stale_request_revalidates(app):
+    client = app.test_client()
+
+    plain = client.get("/static/app.css")
+    stale = client.get("/static/app.css?v=0123456789abcdef")
+    again = client.get("/static/app.css", headers={"If-None-Match": plain.headers["ETag"]})
+
+    assert plain.headers["Cache-Control"] == "public, no-cache"
+    assert stale.headers["Cache-Control"] == "public, no-cache"
+    assert again.status_code == 304
+
+
+def test_compressed_variant_follows_accept_encoding(app):
+    client = app.test_client()
+
+    zipped = client.get("/static/app.css", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/static/app.css", headers={"Accept-Encoding": "identity"})
+    png = client.get("/static/logo.png", headers={"Accept-Encoding": "gzip"})
+
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.data) == CSS
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    assert "Content-Encoding" not in plain.headers and plain.data == CSS
+    # Only text assets are compressed
+    assert "Content-Encoding" not in png.headers
+
+
+def test_changed_file_gets_a_new_version(app, tmp_path):
+    before = _versioned(app, "static", "app.css")
+    (tmp_path / "static" / "app.css").write_bytes(CSS + b"a { color: red; }\n")
+
+    after = _versioned(app, "static", "app.css")
+
+    assert after != before
+    assert app.test_client().get(after).headers["Cache-Control"].endswith("immutable")
+
+
+def test_outside_the_folder_is_not_found(app):
+    client = app.test_client()
+
+    assert client.get("/static/../secret.txt").status_code == 404
+    assert client.get("/static/nope.css").status_code == 404
+
+
+def test_dashboard_keeps_asset_caching(dashboard):
+    client = dashboard.app.test_client()
+    with dashboard.app.test_request_context():
+        url = url_for("ram.static", filename="js/main.js")
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    # The no-store policy for dynamic pages must not override it
+    assert response.headers["Cache-Control"].endswith("immutable")
+    assert "Pragma" not in response.headers
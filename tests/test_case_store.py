@@ -0,0 +1,109 @@
+import pytest
+
+from unified_dashboard.modules.mobile_forensics import case_store
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = case_store.connect(str(tmp_path / "cases.db"))
+    yield conn
+    conn.close()
+
+
+def _sms(address, body, date):
+    return {"address": address, "body": body, "date": date, "type": "1"}
+
+
+def _case_with_sms(conn, rows, name="Case"):
+    case_id = case_store.create_case(conn, name, "001", device_serial="SERIAL1")
+    case_store.CategoryWriter(conn, case_id, "sms").add_many(rows)
+    return case_id
+
+
+def test_sms_full_text_search(conn):
+    case_id = _case_with_sms(conn, [
+        _sms("+1555", "Meet at the harbour tonight", "01-03-2024 20:00:00"),
+        _sms("+1666", "Invoice attached", "02-03-2024 09:00:00"),
+        _sms("+1777", "harbour closed tomorrow", "03-03-2024 09:00:00"),
+    ])
+
+    result = case_store.query_category(conn, "sms", case_id=case_id, q="harbour")
+
+    assert result["total"] == 2
+    # Newest first
+    assert [r["address"] for r in result["items"]] == ["+1777", "+1555"]
+
+
+def test_fts_index_follows_deletes(conn):
+    case_id = _case_with_sms(conn, [_sms("+1555", "harbour", "01-03-2024 20:00:00")])
+
+    case_store.clear_category(conn, case_id, "sms")
+
+    assert case_store.query_category(conn, "sms", q="harbour")["total"] == 0
+
+
+def test_date_range_is_inclusive_whole_days(conn):
+    _case_with_sms(conn, [
+        _sms("a", "x", "29-02-2024 23:59:59"),
+        _sms("b", "x", "01-03-2024 00:00:00"),
+        _sms("c", "x", "02-03-2024 23:59:59"),
+        _sms("d", "x", "03-03-2024 00:00:00"),
+    ])
+
+    result = case_store.query_category(conn, "sms", date_from="2024-03-01", date_to="2024-03-02")
+
+    assert sorted(r["address"] for r in result["items"]) == ["b", "c"]
+
+
+def test_raw_ts_wins_over_the_date_string(conn):
+    case_id = case_store.create_case(conn, "Case", "001")
+    case_store.CategoryWriter(conn, case_id, "calls").add_many([
+        {"number": "1", "date": "01-01-2000 00:00:00", "ts": 1709251200, "duration": "5"},
+    ])
+
+    result = case_store.query_category(conn, "calls", date_from="2024-03-01", date_to="2024-03-01")
+
+    assert result["total"] == 1
+
+
+def test_paging_filters_and_extra_columns(conn):
+    case_id = case_store.create_case(conn, "Case", "001")
+    writer = case_store.CategoryWriter(conn, case_id, "calls")
+    writer.add_many([
+        {"number": str(i), "date": f"{i + 1:02d}-01-2024 10:00:00", "type": "MISSED" if i % 2 else "INCOMING",
+         "sim": f"sim{i % 2}"}
+        for i in range(25)
+    ])
+
+    first = case_store.query_category(conn, "calls", case_id=case_id, page=1, per_page=10)
+    last = case_store.query_category(conn, "calls", case_id=case_id, page=3, per_page=10)
+    missed = case_store.query_category(conn, "calls", filters={"type": "MISSED", "bogus": "x"}, per_page=100)
+
+    assert first["total"] == 25 and len(first["items"]) == 10
+    assert [r["number"] for r in first["items"]][:2] == ["24", "23"]
+    assert len(last["items"]) == 5
+    assert missed["total"] == 12
+    # Columns without a stored column come back from the JSON `extra` column
+    assert {r["sim"] for r in missed["items"]} == {"sim1"}
+
+
+def test_page_arguments_are_clamped(conn):
+    result = case_store.query_category(conn, "apps", page=0, per_page=10 ** 6)
+
+    assert (result["page"], result["per_page"]) == (1, case_store.MAX_PER_PAGE)
+    with pytest.raises(ValueError):
+        case_store.query_category(conn, "apps", page="abc")
+    with pytest.raises(ValueError):
+        case_store.query_category(conn, "passwords")
+
+
+def test_list_cases_counts_rows_per_category(conn):
+    first = _case_with_sms(conn, [_sms("a", "x", "01-03-2024 20:00:00")], name="First")
+    second = _case_with_sms(conn, [], name="Second")
+
+    result = case_store.list_cases(conn, per_page=1)
+
+    assert result["total"] == 2
+    assert [(c["id"], c["sms"]) for c in result["items"]] == [(second, 0)]
+    assert case_store.list_cases(conn, page=2, per_page=1)["items"][0]["sms"] == 1
+    assert case_store.get_case(conn, first)["device_serial"] == "SERIAL1"
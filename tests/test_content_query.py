@@ -0,0 +1,81 @@
+import shlex
+
+from unified_dashboard.modules.mobile_forensics.routes import (
+    content_query_args, iter_content_rows, join_where, parse_content_query_output, parse_content_row,
+)
+
+
+def test_parse_content_row_keeps_commas_and_spaces_in_values():
+    row = parse_content_row("_id=7, address=+1 555 0100, body=Hi, see you at 5, ok?, date=1700000000000")
+
+    assert row == {
+        "_id": "7",
+        "address": "+1 555 0100",
+        "body": "Hi, see you at 5, ok?",
+        "date": "1700000000000",
+    }
+
+
+def test_parse_content_row_without_keys_is_raw():
+    assert parse_content_row("  garbage line  ") == {"raw": "garbage line"}
+
+
+def test_iter_content_rows_joins_multiline_values():
+    lines = [
+        "Row: 0 _id=1, body=first line\r\n",
+        "second line\n",
+        "\n",
+        "fourth line, date=1\n",
+        "Row: 1 _id=2, body=single, date=2\n",
+    ]
+
+    rows = list(iter_content_rows(lines))
+
+    assert rows == [
+        {"_id": "1", "body": "first line\nsecond line\n\nfourth line", "date": "1"},
+        {"_id": "2", "body": "single", "date": "2"},
+    ]
+
+
+def test_iter_content_rows_is_lazy():
+    def lines():
+        yield "Row: 0 _id=1\n"
+        yield "Row: 1 _id=2\n"
+        raise AssertionError("read past the second row")
+
+    rows = iter_content_rows(lines())
+
+    assert next(rows) == {"_id": "1"}
+
+
+def test_lines_before_the_first_row_are_raw():
+    assert parse_content_query_output("No result found.\n") == [{"raw": "No result found."}]
+    assert parse_content_query_output("") == []
+
+
+def test_content_query_args_quotes_where_and_sort():
+    args = content_query_args(
+        "content://sms/inbox",
+        projection=["_id", "address", "body"],
+        where="date > 1700000000000 AND address LIKE '%555%'",
+        sort="date DESC",
+    )
+
+    assert args[:6] == ["adb", "shell", "content", "query", "--uri", "content://sms/inbox"]
+    assert args[6:8] == ["--projection", "_id:address:body"]
+    # adb joins the arguments into one device shell command line, so each value must survive it
+    assert shlex.split(" ".join(args[8:])) == [
+        "--where", "date > 1700000000000 AND address LIKE '%555%'",
+        "--sort", "date DESC",
+    ]
+
+
+def test_content_query_args_minimal():
+    assert content_query_args("content://call_log/calls") == [
+        "adb", "shell", "content", "query", "--uri", "content://call_log/calls",
+    ]
+
+
+def test_join_where_skips_empty_clauses():
+    assert join_where(None, "date >= 5", "", "type = 1") == "(date >= 5) AND (type = 1)"
+    assert join_where(None, "") is None
@@ -0,0 +1,94 @@
+from flask import url_for
+
+from unified_dashboard.identity import UserCache
+
+
+class Loader:
+    def __init__(self, users):
+        self.users = users
+        self.calls = []
+
+    def __call__(self, user_id):
+        self.calls.append(user_id)
+        return self.users.get(user_id)
+
+
+def test_cache_hits_until_ttl():
+    loader = Loader({1: "alice"})
+    cache = UserCache(ttl=60)
+
+    assert cache.get(1, loader) == "alice"
+    assert cache.get(1, loader) == "alice"
+    assert loader.calls == [1]
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    expired = UserCache(ttl=0)
+    expired.get(1, loader)
+    expired.get(1, loader)
+    assert loader.calls == [1, 1, 1]
+
+
+def test_missing_users_are_not_cached():
+    loader = Loader({})
+    cache = UserCache()
+
+    assert cache.get(7, loader) is None
+    assert cache.get(7, loader) is None
+    assert loader.calls == [7, 7]
+
+
+def test_least_recently_used_is_evicted():
+    loader = Loader({1: "a", 2: "b", 3: "c"})
+    cache = UserCache(maxsize=2)
+    cache.get(1, loader)
+    cache.get(2, loader)
+    cache.get(1, loader)
+
+    cache.get(3, loader)
+
+    assert list(cache.entries) == [1, 3]
+
+
+def test_invalidate_one_or_all():
+    loader = Loader({1: "a", 2: "b"})
+    cache = UserCache()
+    cache.get(1, loader)
+    cache.get(2, loader)
+
+    cache.invalidate(1)
+    assert list(cache.entries) == [2]
+    cache.invalidate()
+    assert cache.stats()["size"] == 0
+
+
+def test_user_changes_invalidate_the_cached_user(dashboard, user):
+    db, User = dashboard.db, dashboard.User
+    with dashboard.app.app_context():
+        dashboard.user_cache.invalidate()
+        assert dashboard.load_user(str(user)).role == "user"
+        assert user in dashboard.user_cache.entries
+
+        db.session.get(User, user).role = "admin"
+        db.session.commit()
+        assert user not in dashboard.user_cache.entries
+        assert dashboard.load_user(str(user)).role == "admin"
+
+        db.session.delete(db.session.get(User, user))
+        db.session.commit()
+        assert user not in dashboard.user_cache.entries
+        assert dashboard.load_user(str(user)) is None
+
+
+def test_static_files_get_no_session(dashboard):
+    client = dashboard.app.test_client()
+    with client.session_transaction() as session:
+        session["marker"] = "x"
+    with dashboard.app.test_request_context():
+        static_url = url_for("static", filename="css/style.css")
+
+    static = client.get(static_url)
+    page = client.get("/login")
+
+    assert static.status_code == 200
+    assert "Set-Cookie" not in static.headers
+    assert "Set-Cookie" in page.headers
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import pytest
+
+from unified_dashboard.modules.ram_forensics import jobs
+
+
+@pytest.fixture(autouse=True)
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "RING_SIZE", 10)
+    return tmp_path
+
+
+def _job(lines):
+    job = jobs.RamJob("analysis", "test")
+    for i in range(1, lines + 1):
+        job.append(f"line {i}\n")
+    return job
+
+
+def test_read_from_the_ring():
+    job = _job(5)
+
+    entries, done = job.read(2, timeout=0)
+
+    assert entries == [(3, "line 3\n"), (4, "line 4\n"), (5, "line 5\n")]
+    assert not done
+
+
+def test_ring_keeps_only_the_newest_lines():
+    job = _job(25)
+
+    assert [seq for seq, _ in job.ring] == list(range(16, 26))
+
+
+def test_reader_behind_the_ring_replays_the_log():
+    job = _job(25)
+
+    # Last-Event-ID 3: lines 4..15 are only in the log, 16..25 also in the ring
+    entries, done = job.read(3, timeout=0)
+
+    assert [seq for seq, _ in entries] == list(range(4, 26))
+    assert entries[0] == (4, "line 4\n")
+    assert not done
+
+
+def test_replay_after_finish_reports_done():
+    job = _job(25)
+    job.finish("finished")
+
+    entries, done = job.read(0, timeout=0)
+
+    assert [seq for seq, _ in entries] == list(range(1, 26))
+    assert done
+    assert job.read(25, timeout=0) == ([], True)
+
+
+def test_replay_ignores_a_half_written_last_line():
+    job = _job(25)
+    job.log.flush()
+    with open(job.log_path, "a", encoding="utf-8") as f:
+        f.write('[26, "trunc')
+
+    entries, _ = job.read(20, timeout=0)
+
+    assert [seq for seq, _ in entries] == list(range(21, 26))
+
+
+def test_read_waits_for_new_lines():
+    job = _job(1)
+    timer = threading.Timer(0.05, job.append, args=("late\n",))
+    timer.start()
+
+    entries, _ = job.read(1, timeout=5)
+
+    timer.join()
+    assert entries == [(2, "late\n")]
+
+
+def test_manager_runs_a_generator_and_prunes_logs(monkeypatch):
+    monkeypatch.setattr(jobs, "KEEP_FINISHED", 1)
+    manager = jobs.JobManager()
+
+    def lines(n):
+        for i in range(n):
+            yield f"{i}\n"
+
+    first = manager.start("analysis", "a", lines, 3)
+    entries, done = [], False
+    while not done:
+        chunk, done = first.read(len(entries), timeout=5)
+        entries += chunk
+    assert [line for _, line in entries] == ["0\n", "1\n", "2\n"]
+    assert first.status == "finished"
+
+    second = manager.start("analysis", "b", lines, 1)
+    while not second.done:
+        second.read(second.seq, timeout=5)
+    manager.start("analysis", "c", lines, 1)
+
+    # Only the newest finished job is kept; the older one's log goes with it
+    assert manager.get(first.id) is None
+    assert not os.path.exists(first.log_path)
@@ -0,0 +1,63 @@
+import json
+
+from unified_dashboard.modules.ram_forensics import results
+
+PSTREE = [
+    {"PID": 4, "ImageFileName": "System", "__children": [
+        {"PID": 88, "ImageFileName": "Registry", "__children": []},
+        {"PID": 392, "ImageFileName": "smss.exe", "__children": [
+            {"PID": 520, "ImageFileName": "csrss.exe", "Audit": None, "__children": []},
+        ]},
+    ]},
+    {"PID": 600, "ImageFileName": "wininit.exe"},
+]
+
+
+def test_parse_json_output_flattens_children_depth_first():
+    columns, rows = results.parse_json_output(json.dumps(PSTREE))
+
+    assert [(r["PID"], r["__depth"]) for r in rows] == [(4, 0), (88, 1), (392, 1), (520, 2), (600, 0)]
+    assert all("__children" not in r for r in rows)
+    # Columns in first-seen order, including ones only deeper rows have
+    assert columns == ["PID", "ImageFileName", "Audit"]
+
+
+def test_parse_json_output_accepts_a_single_object():
+    columns, rows = results.parse_json_output('{"Variable": "KdVersionBlock", "Value": "0xf80"}')
+
+    assert columns == ["Variable", "Value"]
+    assert rows == [{"Variable": "KdVersionBlock", "Value": "0xf80", "__depth": 0}]
+
+
+def test_render_text_marks_depth():
+    columns, rows = results.parse_json_output(json.dumps(PSTREE))
+
+    lines = list(results.render_text(columns, rows))
+
+    assert lines[0] == "PID\tImageFileName\tAudit\n"
+    assert lines[4] == "** 520\tcsrss.exe\t\n"
+
+
+def test_query_filters_sorts_and_pages():
+    columns, rows = results.parse_json_output(json.dumps(PSTREE))
+    result = {"plugin": "windows.pstree", "args": [], "columns": columns, "rows": rows}
+
+    by_pid = results.query(result, sort="PID", desc=True, per_page=2, page=2)
+    exe = results.query(result, q=".EXE")
+    exact = results.query(result, filters={"PID": "88", "Nope": "1"})
+
+    assert by_pid["total"] == 5
+    assert [r["PID"] for r in by_pid["rows"]] == [392, 88]
+    assert [r["PID"] for r in exe["rows"]] == [392, 520, 600]
+    assert [r["PID"] for r in exact["rows"]] == [88]
+
+
+def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "RESULTS_DIR", str(tmp_path))
+    plugin = ["windows.pstree", "--pid", "4"]
+
+    results.save("abc", plugin, ["PID"], [{"PID": 4, "__depth": 0}])
+
+    assert results.load("abc", plugin)["rows"] == [{"PID": 4, "__depth": 0}]
+    assert results.load("abc", ["windows.pstree"]) is None
+    assert results.cached_plugins("abc") == ["windows.pstree"]
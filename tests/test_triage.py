@@ -0,0 +1,112 @@
+import os
+import time
+
+import pytest
+
+from unified_dashboard.modules.ram_forensics import triage
+
+
+def _write(tmp_path, data, name="mem.raw"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def _scan(path, start=0, length=None, ioc_strings=triage.DEFAULT_IOC_STRINGS):
+    if length is None:
+        length = os.path.getsize(path) - start
+    return triage._scan_chunk(path, start, length, ioc_strings)["hits"]
+
+
+def test_scan_finds_every_ioc_kind(tmp_path):
+    data = b"".join([
+        os.urandom(4096),
+        b"connect 10.1.2.3:443 and 256.1.1.1 and 1.2.3.4.5 ",
+        b"GET HTTP://Evil.example.com:8080/stage2?id=7 ",
+        b"x" * 100 + b"Invoke-MIMIKATZ " + "sekurlsa::logonpasswords".encode("utf-16-le"),
+        b"\x00" * 16 + b"KDBG" + b" \\SystemRoot\\system32\\NTOSKRNL.EXE ",
+        b"Linux version 5.15.0-91-generic (buildd@lcy02) #101-Ubuntu SMP\x00",
+        os.urandom(4096),
+    ])
+    path = _write(tmp_path, data)
+
+    hits = _scan(path)
+
+    assert set(hits["ipv4"]) == {"10.1.2.3"}
+    assert hits["ipv4"]["10.1.2.3"] == [1, data.index(b"10.1.2.3")]
+    assert set(hits["url"]) == {"HTTP://Evil.example.com:8080/stage2?id=7"}
+    assert hits["bad_string"]["sekurlsa"] == [1, data.index("sekurlsa".encode("utf-16-le"))]
+    assert hits["bad_string"]["Invoke-MIMIKATZ"][0] == 1
+    assert hits["bad_string"]["MIMIKATZ"][0] == 1
+    assert hits["windows_kdbg"] == {"KDBG": [1, data.index(b"KDBG") - 8]}
+    assert hits["windows_ntoskrnl"] == {"NTOSKRNL.EXE": [1, data.index(b"NTOSKRNL.EXE")]}
+    assert list(hits["linux_banner"]) == ["Linux version 5.15.0-91-generic (buildd@lcy02) #101-Ubuntu SMP"]
+
+
+def test_utf16_match_needs_zero_high_bytes(tmp_path):
+    path = _write(tmp_path, b"m\x00i\x00m\x00i\x00k\x00a\x00t\x01z\x00 " + "lsadump".encode("utf-16-le"))
+
+    hits = _scan(path)
+
+    assert hits["bad_string"] == {"lsadump": [1, 17]}
+
+
+def test_chunks_split_matches_without_double_counting(tmp_path):
+    data = os.urandom(1000) + b" 192.168.100.200 http://a.example.org/x mimikatz " + os.urandom(1000)
+    path = _write(tmp_path, data)
+    whole = _scan(path)
+
+    for split in range(1000, 1060):
+        merged = {}
+        for start, length in ((0, split), (split, len(data) - split)):
+            for kind, values in _scan(path, start, length).items():
+                for value, (count, offset) in values.items():
+                    kind_hits = merged.setdefault(kind, {})
+                    if value in kind_hits:
+                        kind_hits[value][0] += count
+                    else:
+                        kind_hits[value] = [count, offset]
+        # A value cut by the split is still matched whole, by the chunk it starts in
+        assert merged == whole, split
+
+
+def test_ipv4_lookbehind_sees_previous_chunk(tmp_path):
+    data = b"version 12.7.1.2.3.4 "
+    path = _write(tmp_path, data)
+
+    # "1.2.3.4" would match on its own, but it is part of a longer dotted run
+    assert "ipv4" not in _scan(path, start=10)
+
+
+def test_triage_writes_sidecar(tmp_path):
+    data = os.urandom(2 * triage.BLOCK_SIZE) + b"\x00" * triage.BLOCK_SIZE + b"Linux version 6.1.0 x"
+    path = _write(tmp_path, data)
+
+    index = triage.triage(path, workers=1)
+
+    assert os.path.exists(triage.sidecar_path(path))
+    assert index["size"] == len(data)
+    assert index["kernel"]["os_guess"].lower().startswith("linux")
+    assert index["zero_blocks"] == 1
+    assert len(index["entropy_map"]) == 4
+
+
+@pytest.mark.parametrize("mb", [32])
+def test_scan_throughput(tmp_path, mb):
+    # Dump-like mix: random pages, zero pages, ASCII and UTF-16 text with an IOC per text page
+    text = (b"GET http://198.51.100.7/beacon.dll HTTP/1.1\r\n"
+            + b"C:\\Windows\\System32\\ntdll.dll 10.0.19041.1 libc.so.6 GLIBC_2.31 Host: cdn.example.com " * 1024)[:65536]
+    pages = [os.urandom(65536), b"\x00" * 65536, text, text.decode().encode("utf-16-le")[:65536]]
+    data = b"".join(pages[i % len(pages)] for i in range(mb * 16))
+    path = _write(tmp_path, data)
+
+    started = time.perf_counter()
+    hits = _scan(path)
+    elapsed = time.perf_counter() - started
+
+    assert hits["bad_string"]["beacon.dll"][0] > 0
+    assert "198.51.100.7" in hits["ipv4"]
+    # The previous single-regex scan ran at about 2 MB/s per worker
+    rate = len(data) / (1024 * 1024) / elapsed
+    print(f"triage scan: {rate:.0f} MB/s per worker")
+    assert rate > 10
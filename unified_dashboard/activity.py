@@ -0,0 +1,262 @@
+import os
+import json
+import gzip
+import time
+import queue
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: retention runs are not serialized across processes
+    fcntl = None
+
+# -------------------------
+# Activity log writer
+# -------------------------
+# Requests don't write ActivityLog rows themselves: `record()` stamps the
+# event and puts it on a bounded in-memory queue, and one background writer
+# inserts whatever has accumulated in a single transaction every
+# FLUSH_INTERVAL (or as soon as BATCH_SIZE events are waiting). Page views
+# therefore never wait on the SQLite writer lock or an fsync.
+#
+# When the queue is full (database stalled or far behind), page-view events
+# are dropped and counted; login/logout events wait up to BLOCK_SECONDS for
+# room, since they are the audit trail. Pending events are flushed on
+# interpreter shutdown.
+#
+# Each batch also bumps the daily per-user/per-action rollup counters in the
+# same transaction, so aggregates never have to scan raw logs. Raw rows older
+# than ACTIVITY_RETENTION_DAYS are archived to gzipped JSON-lines files and
+# deleted in batches; the writer thread does this about once per
+# RETENTION_CHECK_SECONDS, between flushes, so it never competes with itself
+# for the database write lock.
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0     # seconds
+BLOCK_SECONDS = 2.0      # how long audit events may wait for queue space
+AUDIT_ACTIONS = ("LOGIN", "LOGOUT")
+RETENTION_DAYS = 180
+RETENTION_BATCH = 1000
+RETENTION_CHECK_SECONDS = 3600
+ROLLUP_DAY_OFFSET = timedelta(hours=5, minutes=30)  # rollup days are IST days, like the admin views
+
+
+def rollup_day(timestamp):
+    """The rollup day (IST date) of a UTC timestamp."""
+    return (timestamp + ROLLUP_DAY_OFFSET).date()
+
+
+class ActivityWriter:
+    def __init__(self):
+        self.app = None
+        self.model = None
+        self.rollup_model = None
+        self.next_retention = 0.0
+        self.queue = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+
+    def init_app(self, app, model, rollup_model=None):
+        """Bind to the app (for the DB session), the ActivityLog model and its daily rollup model."""
+        self.app = app
+        self.model = model
+        self.rollup_model = rollup_model
+        self.queue = queue.Queue(maxsize=app.config.get("ACTIVITY_LOG_QUEUE_SIZE", QUEUE_SIZE))
+        self.batch_size = app.config.get("ACTIVITY_LOG_BATCH_SIZE", BATCH_SIZE)
+        self.flush_interval = app.config.get("ACTIVITY_LOG_FLUSH_INTERVAL", FLUSH_INTERVAL)
+        self.retention_days = app.config.get("ACTIVITY_RETENTION_DAYS", RETENTION_DAYS)
+        self.archive_dir = app.config.get("ACTIVITY_ARCHIVE_DIR",
+                                          os.path.join(app.instance_path, "activity_archive"))
+        atexit.register(self.shutdown)
+
+    def record(self, user_id, action, details=None):
+        """Queue one ActivityLog row; returns False if it had to be dropped."""
+        event = {"user_id": user_id, "action": action, "details": details, "timestamp": datetime.utcnow()}
+        self._ensure_started()
+        try:
+            if action in AUDIT_ACTIONS:
+                self.queue.put(event, timeout=BLOCK_SECONDS)
+            else:
+                self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                self.app.logger.warning("Activity log queue full; %d event(s) dropped so far", dropped)
+            return False
+
+    def stats(self):
+        return {"queued": self.queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+    def _ensure_started(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+                self.thread.start()
+
+    def _take_batch(self, timeout):
+        """Wait up to `timeout` for the first event, then take whatever else is waiting (up to a batch)."""
+        try:
+            batch = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self.stopping.is_set():
+            batch = self._take_batch(self.flush_interval)
+            if batch:
+                self._write(batch)
+            if self.retention_days and time.time() >= self.next_retention:
+                self.next_retention = time.time() + RETENTION_CHECK_SECONDS
+                try:
+                    self.archive_old_events()
+                except Exception:
+                    self.app.logger.exception("Activity log retention run failed")
+
+    def _write(self, batch):
+        from unified_dashboard.extensions import db
+        with self.app.app_context():
+            try:
+                db.session.bulk_insert_mappings(self.model, batch)
+                self._add_to_rollups(db.session, Counter(
+                    (rollup_day(e["timestamp"]), e["user_id"], e["action"]) for e in batch))
+                db.session.commit()
+                self.written += len(batch)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("Failed to write %d activity log event(s)", len(batch))
+            finally:
+                db.session.remove()
+
+    def _add_to_rollups(self, session, counts):
+        """Add {(day, user_id, action): n} to the rollup counters (in the caller's transaction)."""
+        if self.rollup_model is None or not counts:
+            return
+        table = self.rollup_model.__table__
+        values = [{"day": day, "user_id": user_id, "action": action, "events": n}
+                  for (day, user_id, action), n in counts.items()]
+        dialect = session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(index_elements=["day", "user_id", "action"],
+                                              set_={"events": table.c.events + stmt.excluded.events})
+            session.execute(stmt, values)
+            return
+        for row in values:
+            updated = session.execute(table.update().where(
+                (table.c.day == row["day"]) & (table.c.user_id == row["user_id"]) & (table.c.action == row["action"])
+            ).values(events=table.c.events + row["events"]))
+            if updated.rowcount == 0:
+                session.execute(table.insert().values(**row))
+
+    def rebuild_rollups(self):
+        """Recompute all rollup counters from the raw logs (first run, or after manual edits)."""
+        from unified_dashboard.extensions import db
+        model = self.model
+        with self.app.app_context():
+            counts = Counter()
+            for user_id, action, timestamp in db.session.query(
+                    model.user_id, model.action, model.timestamp).yield_per(RETENTION_BATCH):
+                counts[(rollup_day(timestamp), user_id, action)] += 1
+            db.session.execute(self.rollup_model.__table__.delete())
+            self._add_to_rollups(db.session, counts)
+            db.session.commit()
+            return len(counts)
+
+    def ensure_rollups(self):
+        """Build the rollups once for logs written before they existed."""
+        from unified_dashboard.extensions import db
+        with self.app.app_context():
+            empty = db.session.query(self.rollup_model).first() is None
+            has_logs = db.session.query(self.model.id).first() is not None
+        if empty and has_logs:
+            self.rebuild_rollups()
+
+    def archive_old_events(self, days=None, batch_size=RETENTION_BATCH):
+        """
+        Move raw events older than `days` (default ACTIVITY_RETENTION_DAYS) into a
+        gzipped JSON-lines archive, deleting them from the table one batch at a
+        time after the batch is on disk. Rollups are kept. Returns rows archived.
+        """
+        from unified_dashboard.extensions import db
+        days = days or self.retention_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        model = self.model
+        if self.rollup_model is not None:
+            self.ensure_rollups()  # archived rows must already be counted
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        lock = open(os.path.join(self.archive_dir, ".lock"), "w")
+        try:
+            if fcntl:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0  # another process is already archiving
+            archived = 0
+            path = os.path.join(self.archive_dir, f"activity_before_{cutoff:%Y%m%d}_{int(time.time())}.jsonl.gz")
+            out = None
+            with self.app.app_context():
+                try:
+                    while not self.stopping.is_set():
+                        rows = db.session.query(model.id, model.user_id, model.action, model.details, model.timestamp) \
+                            .filter(model.timestamp < cutoff).order_by(model.id).limit(batch_size).all()
+                        if not rows:
+                            break
+                        if out is None:
+                            out = gzip.open(path, "at", encoding="utf-8")
+                        for row in rows:
+                            out.write(json.dumps({"id": row.id, "user_id": row.user_id, "action": row.action,
+                                                  "details": row.details, "timestamp": row.timestamp.isoformat()}) + "\n")
+                        out.flush()
+                        os.fsync(out.fileno())
+                        db.session.execute(model.__table__.delete().where(model.id.in_([row.id for row in rows])))
+                        db.session.commit()
+                        archived += len(rows)
+                finally:
+                    if out is not None:
+                        out.close()
+                    db.session.remove()
+            if archived:
+                self.app.logger.info("Archived %d activity log row(s) older than %d days to %s", archived, days, path)
+            return archived
+        finally:
+            lock.close()
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        while True:
+            batch = self._take_batch(0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+activity_writer = ActivityWriter()
@@ -1,26 +1,32 @@
-from flask import Flask, render_template, redirect, url_for, request, flash
+from flask import Flask, render_template, redirect, url_for, request, flash, jsonify, g
 from flask_sqlalchemy import SQLAlchemy
 from unified_dashboard.extensions import db
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import click
 from datetime import datetime, timedelta
+from sqlalchemy import event, func, text
 
 # Initialize App
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'cyber-tools-secure-key'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=5)
 
 # Import Shared Extensions
 from unified_dashboard.extensions import db, socketio
+from unified_dashboard import database
+database.configure(app)  # DATABASE_URL, pooling / SQLite pragmas
 db.init_app(app)
+database.install_listeners(app)
 socketio.init_app(app)
 
-# Ensure responses aren't cached
+# Ensure dynamic responses aren't cached (static assets set their own caching, see assets.py)
 @app.after_request
 def add_header(response):
+    if g.get('asset_response'):
+        return response
     response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
     response.headers["Pragma"] = "no-cache"
     response.headers["Expires"] = "0"
@@ -38,6 +44,14 @@ app.register_blueprint(mobile_bp)
 app.register_blueprint(nmap_bp)
 app.register_blueprint(network_bp)
 
+# Fingerprinted, precompressed static files for the app and every blueprint
+from unified_dashboard.assets import assets
+assets.init_app(app)
+
+# Static files are served without a session (and so without loading the user)
+from unified_dashboard.identity import StaticSessionInterface
+app.session_interface = StaticSessionInterface()
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -61,9 +75,165 @@ class ActivityLog(db.Model):
     details = db.Column(db.String(255))
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Per-user timelines (session durations) and time-range scans
+        db.Index('ix_activity_log_user_time', 'user_id', 'timestamp', 'id'),
+        db.Index('ix_activity_log_time', 'timestamp'),
+    )
+
+class ActivityRollup(db.Model):
+    """Events per user, action and (IST) day; kept current by the activity writer and outlives raw-log retention."""
+    __tablename__ = 'activity_daily_rollup'
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    action = db.Column(db.String(100), primary_key=True)
+    events = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_activity_rollup_user_day', 'user_id', 'day'),
+    )
+
+# Activity rows are written in batches by a background writer
+from unified_dashboard.activity import activity_writer, rollup_day
+activity_writer.init_app(app, ActivityLog, ActivityRollup)
+
+# Create/upgrade the schema in every worker at startup (serialized between workers)
+database.init_schema(app, after=activity_writer.ensure_rollups)
+
+# Logged-in users are cached briefly instead of being SELECTed on every request
+from unified_dashboard.identity import UserCache
+user_cache = UserCache(ttl=app.config.get('USER_CACHE_TTL', 60))
+
+def _load_user_from_db(user_id):
+    user = db.session.get(User, user_id)
+    if user is not None:
+        # Detached, so later commits in this session can't expire the cached copy
+        db.session.expunge(user)
+    return user
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id), _load_user_from_db)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _forget_cached_user(mapper, connection, target):
+    # Role, password or profile changes take effect on the user's next request
+    user_cache.invalidate(target.id)
+
+# --- Activity log queries ---
+LOG_WINDOW_DAYS = 90
+IST_OFFSET = timedelta(hours=5, minutes=30)
+ACTIVITY_ACTIONS = ('LOGIN', 'LOGOUT', 'TOOL_ACCESS')
+ADMIN_LOGS_PER_PAGE = 50
+MAX_LOGS_PER_PAGE = 500
+
+def _seconds_between(start, end):
+    """SQL expression for the seconds from `start` to `end` (NULL if either is NULL)."""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        return (func.julianday(end) - func.julianday(start)) * 86400.0
+    if dialect in ('mysql', 'mariadb'):
+        return func.timestampdiff(text('MICROSECOND'), start, end) / 1000000.0
+    return func.extract('epoch', end - start)
+
+def _parse_ist_date(value, end_of_day=False):
+    """'YYYY-MM-DD' (IST, as shown in the UI) -> naive UTC datetime bound."""
+    day = datetime.strptime(value, '%Y-%m-%d')
+    if end_of_day:
+        day += timedelta(days=1)
+    return day - IST_OFFSET
+
+def activity_filters(args):
+    """Filter kwargs for activity_page() from request args; raises ValueError on bad input."""
+    filters = {}
+    if args.get('user_id'):
+        filters['user_id'] = int(args['user_id'])
+    if args.get('action'):
+        filters['action'] = args['action'].upper()
+    try:
+        if args.get('start'):
+            filters['start'] = _parse_ist_date(args['start'])
+        if args.get('end'):
+            filters['end'] = _parse_ist_date(args['end'], end_of_day=True)
+    except ValueError:
+        raise ValueError('Dates must be YYYY-MM-DD')
+    if args.get('q'):
+        filters['q'] = args['q']
+    return filters
+
+def format_duration(action, seconds):
+    if action == 'LOGOUT':
+        return "Session Ended"
+    if seconds is None:
+        return "Active"
+    total_seconds = int(round(seconds, 3))
+    return f"{total_seconds // 60}m {total_seconds % 60}s"
+
+def _window_start(start=None):
+    """Oldest timestamp a log query looks at: the retention window, narrowed by a start filter."""
+    lower = datetime.utcnow() - timedelta(days=LOG_WINDOW_DAYS)
+    return start if start and start > lower else lower
+
+def _filter_activity(query, cols, action=None, end=None, q=None):
+    """Apply the action / end date / details filters to a query over ActivityLog-like columns."""
+    if action:
+        query = query.filter(cols.action == action)
+    if end:
+        query = query.filter(cols.timestamp < end)
+    if q:
+        query = query.filter(cols.details.ilike(f"%{q}%"))
+    return query
+
+def activity_page(user_id=None, action=None, start=None, end=None, q=None, page=1, per_page=ADMIN_LOGS_PER_PAGE):
+    """
+    Activity logs from the last LOG_WINDOW_DAYS, newest first, one page at a time.
+    A row's duration is the time until the same user's next event, taken with
+    LEAD() over (user_id, timestamp) in the database. Only the requested page
+    is fetched, with the username joined in.
+    """
+    page = max(1, page or 1)
+    per_page = min(MAX_LOGS_PER_PAGE, max(1, per_page or ADMIN_LOGS_PER_PAGE))
+    # A row's next event is always later, so rows before `start` can be left out of the window too
+    lower = _window_start(start)
+
+    def filtered(query, cols):
+        return _filter_activity(query, cols, action, end, q)
+
+    windowed = db.session.query(
+        ActivityLog.id, ActivityLog.user_id, ActivityLog.timestamp, ActivityLog.action, ActivityLog.details,
+        func.lead(ActivityLog.timestamp).over(
+            partition_by=ActivityLog.user_id,
+            order_by=(ActivityLog.timestamp, ActivityLog.id)).label('next_timestamp'),
+    ).filter(ActivityLog.timestamp >= lower)
+    if user_id:
+        windowed = windowed.filter(ActivityLog.user_id == user_id)
+    logs = windowed.subquery()
+
+    rows = filtered(db.session.query(
+        logs.c.id, logs.c.timestamp, logs.c.action, logs.c.details, logs.c.user_id, User.username,
+        _seconds_between(logs.c.timestamp, logs.c.next_timestamp).label('duration_seconds'),
+    ).join(User, User.id == logs.c.user_id), logs.c) \
+        .order_by(logs.c.timestamp.desc(), logs.c.id.desc()) \
+        .limit(per_page).offset((page - 1) * per_page).all()
+
+    # The total doesn't need the window; it is an index range count
+    counted = db.session.query(func.count(ActivityLog.id)).filter(ActivityLog.timestamp >= lower)
+    if user_id:
+        counted = counted.filter(ActivityLog.user_id == user_id)
+    total = filtered(counted, ActivityLog).scalar()
+
+    items = [{
+        'id': row.id,
+        'timestamp': (row.timestamp + IST_OFFSET).strftime('%Y-%m-%d %H:%M:%S'),
+        'user_id': row.user_id,
+        'username': row.username,
+        'action': row.action,
+        'details': row.details,
+        'duration_seconds': None if row.duration_seconds is None else round(float(row.duration_seconds), 3),
+        'duration': format_duration(row.action, row.duration_seconds),
+    } for row in rows]
+    return {'page': page, 'per_page': per_page, 'total': total, 'items': items}
 
 # --- Routes ---
 
@@ -79,9 +249,7 @@ from flask import session
 def login():
     if current_user.is_authenticated:
         # Log the auto-logout
-        log = ActivityLog(user_id=current_user.id, action='LOGOUT', details='Auto-logout via Login Page Navigation')
-        db.session.add(log)
-        db.session.commit()
+        activity_writer.record(current_user.id, 'LOGOUT', 'Auto-logout via Login Page Navigation')
         
         logout_user()
         flash('You have been logged out.', 'info')
@@ -96,9 +264,7 @@ def login():
             session.permanent = True  # Enable 5-minute timeout
             
             # Log Activity
-            log = ActivityLog(user_id=user.id, action='LOGIN', details='User logged in via Web UI')
-            db.session.add(log)
-            db.session.commit()
+            activity_writer.record(user.id, 'LOGIN', 'User logged in via Web UI')
             
             if user.role == 'admin':
                 return redirect(url_for('admin_dashboard'))
@@ -134,9 +300,7 @@ def register():
 @app.route('/logout')
 @login_required
 def logout():
-    log = ActivityLog(user_id=current_user.id, action='LOGOUT', details='User logged out')
-    db.session.add(log)
-    db.session.commit()
+    activity_writer.record(current_user.id, 'LOGOUT', 'User logged out')
     
     logout_user()
     return redirect(url_for('index'))
@@ -153,79 +317,139 @@ def admin_dashboard():
         flash('Access Denied. Admins only.', 'danger')
         return redirect(url_for('dashboard'))
         
-    users = User.query.all()
-    
-    # Filter logs to last 3 months
-    cutoff_date = datetime.utcnow() - timedelta(days=90)
-    
-    # Fetch logs sorted by user and time ASC to calculate duration
-    all_logs_asc = ActivityLog.query.filter(ActivityLog.timestamp >= cutoff_date).order_by(ActivityLog.user_id, ActivityLog.timestamp.asc()).all()
-    
-    display_logs = []
-    
-    # Group logs by user to calculate durations
-    from collections import defaultdict
-    user_logs = defaultdict(list)
-    for log in all_logs_asc:
-        user_logs[log.user_id].append(log)
-        
-    for uid, u_logs in user_logs.items():
-        for i in range(len(u_logs)):
-            current_log = u_logs[i]
-            ist_time = current_log.timestamp + timedelta(hours=5, minutes=30)
-            
-            duration = "Active"
-            if i < len(u_logs) - 1:
-                next_log = u_logs[i+1]
-                diff = next_log.timestamp - current_log.timestamp
-                
-                # Format duration
-                total_seconds = int(diff.total_seconds())
-                minutes = total_seconds // 60
-                seconds = total_seconds % 60
-                duration = f"{minutes}m {seconds}s"
-            
-            if current_log.action == 'LOGOUT':
-                duration = "Session Ended"
-                
-            display_logs.append({
-                'timestamp': ist_time,
-                'user': current_log.user,
-                'action': current_log.action,
-                'details': current_log.details,
-                'duration': duration
-            })
-            
-    # Sort for final display (Newest First)
-    display_logs.sort(key=lambda x: x['timestamp'], reverse=True)
-    
-    return render_template('admin_dashboard.html', user=current_user, users=users, logs=display_logs)
+    users = User.query.order_by(User.id).all()
+    return render_template('admin_dashboard.html', user=current_user, users=users,
+                           actions=ACTIVITY_ACTIONS, per_page=ADMIN_LOGS_PER_PAGE)
+
+@app.route('/admin/api/logs')
+@login_required
+def admin_logs_api():
+    """One page of activity logs (newest first) with session durations; see activity_page()."""
+    if current_user.role != 'admin':
+        return jsonify({"status": "error", "message": "Admins only"}), 403
+
+    # Include events still waiting in the activity queue
+    activity_writer.flush()
+    try:
+        filters = activity_filters(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify(activity_page(page=request.args.get('page', 1, type=int),
+                                 per_page=request.args.get('per_page', ADMIN_LOGS_PER_PAGE, type=int),
+                                 **filters))
+
+@app.route('/admin/api/activity_summary')
+@login_required
+def admin_activity_summary_api():
+    """Per-user and per-day event counts from the daily rollups (no raw log scan)."""
+    if current_user.role != 'admin':
+        return jsonify({"status": "error", "message": "Admins only"}), 403
+
+    activity_writer.flush()
+    days = min(max(request.args.get('days', LOG_WINDOW_DAYS, type=int), 1), 3650)
+    first_day = rollup_day(datetime.utcnow()) - timedelta(days=days - 1)
+
+    per_user = {}
+    for user_id, username, action, events, last_day in db.session.query(
+            ActivityRollup.user_id, User.username, ActivityRollup.action,
+            func.sum(ActivityRollup.events), func.max(ActivityRollup.day)) \
+            .join(User, User.id == ActivityRollup.user_id) \
+            .filter(ActivityRollup.day >= first_day) \
+            .group_by(ActivityRollup.user_id, User.username, ActivityRollup.action):
+        entry = per_user.setdefault(user_id, {'user_id': user_id, 'username': username, 'actions': {},
+                                              'total': 0, 'last_active': None})
+        entry['actions'][action] = int(events)
+        entry['total'] += int(events)
+        if entry['last_active'] is None or last_day.isoformat() > entry['last_active']:
+            entry['last_active'] = last_day.isoformat()
+
+    per_day = {}
+    for day, action, events in db.session.query(
+            ActivityRollup.day, ActivityRollup.action, func.sum(ActivityRollup.events)) \
+            .filter(ActivityRollup.day >= first_day) \
+            .group_by(ActivityRollup.day, ActivityRollup.action):
+        per_day.setdefault(day.isoformat(), {})[action] = int(events)
+
+    return jsonify({
+        'days': days,
+        'from': first_day.isoformat(),
+        'users': sorted(per_user.values(), key=lambda u: -u['total']),
+        'daily': [{'day': day, 'actions': per_day[day]} for day in sorted(per_day)],
+    })
+
+@app.cli.command('archive-activity')
+@click.option('--days', type=int, default=None, help='Archive raw logs older than this (default ACTIVITY_RETENTION_DAYS).')
+@click.option('--rebuild-rollups', is_flag=True, help='Recompute the daily rollups from the raw logs first.')
+def archive_activity_command(days, rebuild_rollups):
+    """Archive old activity logs to gzipped JSON lines and delete them from the database."""
+    if rebuild_rollups:
+        click.echo(f"Rebuilt {activity_writer.rebuild_rollups()} rollup row(s)")
+    archived = activity_writer.archive_old_events(days)
+    click.echo(f"Archived {archived} row(s) to {activity_writer.archive_dir}")
 
 import csv
-from flask import Response
+import zlib
+from flask import Response, stream_with_context
 from io import StringIO
 
+EXPORT_BATCH_ROWS = 1000
+
+def activity_export_rows(user_id=None, action=None, start=None, end=None, q=None):
+    """Logs for the CSV export, newest first, fetched EXPORT_BATCH_ROWS at a time (server-side cursor where supported)."""
+    query = db.session.query(
+        ActivityLog.id, ActivityLog.timestamp, User.username, ActivityLog.action, ActivityLog.details,
+    ).join(User, User.id == ActivityLog.user_id).filter(ActivityLog.timestamp >= _window_start(start))
+    if user_id:
+        query = query.filter(ActivityLog.user_id == user_id)
+    query = _filter_activity(query, ActivityLog, action, end, q)
+    return query.order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc()).yield_per(EXPORT_BATCH_ROWS)
+
+def generate_logs_csv(rows, compress=False):
+    """Yield the CSV in pieces of about EXPORT_BATCH_ROWS rows, optionally as one gzip stream."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits 31 = gzip container
+    si = StringIO()
+    cw = csv.writer(si)
+
+    def piece():
+        data = si.getvalue().encode('utf-8')
+        si.seek(0)
+        si.truncate(0)
+        return gz.compress(data) if gz else data
+
+    cw.writerow(['ID', 'Timestamp (IST)', 'User', 'Action', 'Details'])
+    for count, log in enumerate(rows, 1):
+        ist_time = log.timestamp + IST_OFFSET
+        cw.writerow([log.id, ist_time.strftime('%Y-%m-%d %H:%M:%S'), log.username, log.action, log.details])
+        if count % EXPORT_BATCH_ROWS == 0:
+            data = piece()
+            if data:
+                yield data
+    data = piece()
+    if gz:
+        data += gz.flush()
+    if data:
+        yield data
+
 @app.route('/admin/download_logs')
 @login_required
 def download_logs():
     if current_user.role != 'admin':
         return redirect(url_for('dashboard'))
-        
-    # Filter logs to last 3 months
-    cutoff_date = datetime.utcnow() - timedelta(days=90)
-    logs = ActivityLog.query.filter(ActivityLog.timestamp >= cutoff_date).order_by(ActivityLog.timestamp.desc()).all()
-    
-    # Generate CSV
-    si = StringIO()
-    cw = csv.writer(si)
-    cw.writerow(['ID', 'Timestamp (IST)', 'User', 'Action', 'Details'])
-    
-    for log in logs:
-        ist_time = log.timestamp + timedelta(hours=5, minutes=30)
-        cw.writerow([log.id, ist_time.strftime('%Y-%m-%d %H:%M:%S'), log.user.username, log.action, log.details])
-        
-    output = si.getvalue()
-    return Response(output, mimetype="text/csv", headers={"Content-Disposition": "attachment;filename=activity_logs_3months.csv"})
+
+    # Include events still waiting in the activity queue
+    activity_writer.flush()
+    try:
+        filters = activity_filters(request.args)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin_dashboard'))
+    compress = request.args.get('gzip') in ('1', 'true', 'yes')
+
+    filename = "activity_logs_3months.csv" + (".gz" if compress else "")
+    rows = activity_export_rows(**filters)
+    return Response(stream_with_context(generate_logs_csv(rows, compress)),
+                    mimetype="application/gzip" if compress else "text/csv",
+                    headers={"Content-Disposition": f"attachment;filename={filename}"})
 
 @app.route('/tools')
 @login_required
@@ -245,34 +469,25 @@ def tools_category(category):
 @app.route('/tools/nmap')
 @login_required
 def tool_nmap():
-    # Log Access
-    log = ActivityLog(user_id=current_user.id, action='TOOL_ACCESS', details='Accessed Nmap Scanner')
-    db.session.add(log)
-    db.session.commit()
+    activity_writer.record(current_user.id, 'TOOL_ACCESS', 'Accessed Nmap Scanner')
     return render_template('tool_nmap.html', user=current_user)
 
 @app.route('/tools/wireshark')
 @login_required
 def tool_wireshark():
-    log = ActivityLog(user_id=current_user.id, action='TOOL_ACCESS', details='Accessed Wireshark Analyzer')
-    db.session.add(log)
-    db.session.commit()
+    activity_writer.record(current_user.id, 'TOOL_ACCESS', 'Accessed Wireshark Analyzer')
     return render_template('tool_wireshark.html', user=current_user)
 
 @app.route('/tools/mobile')
 @login_required
 def tool_mobile():
-    log = ActivityLog(user_id=current_user.id, action='TOOL_ACCESS', details='Accessed Mobile Forensics')
-    db.session.add(log)
-    db.session.commit()
+    activity_writer.record(current_user.id, 'TOOL_ACCESS', 'Accessed Mobile Forensics')
     return render_template('tool_mobile.html', user=current_user)
 
 @app.route('/tools/ram')
 @login_required
 def tool_ram():
-    log = ActivityLog(user_id=current_user.id, action='TOOL_ACCESS', details='Accessed RAM Forensics')
-    db.session.add(log)
-    db.session.commit()
+    activity_writer.record(current_user.id, 'TOOL_ACCESS', 'Accessed RAM Forensics')
     return render_template('tool_ram.html', user=current_user)
 
 @app.route('/profile')
@@ -281,7 +496,5 @@ def profile():
     return render_template('profile.html', user=current_user)
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
     socketio.run(app, host="0.0.0.0", port=5000, debug=False)
 
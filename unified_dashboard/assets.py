@@ -0,0 +1,139 @@
+import os
+import gzip
+import hashlib
+import threading
+import mimetypes
+
+from flask import request, g, send_file, Response
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# -------------------------
+# Static asset pipeline
+# -------------------------
+# Every static endpoint (the app's and each blueprint's) is served from here.
+# url_for(<static endpoint>, filename=...) gets a `?v=<content hash>`
+# argument automatically, and a request carrying the file's current hash is
+# cached by browsers for a year as immutable; a new build changes the hash
+# and so the URL. Unversioned requests revalidate via ETag. Text assets are
+# compressed once per content version (gzip, and brotli when the package is
+# installed) and the best variant the client accepts is sent.
+#
+# Responses from here are marked on `g`, so the app's no-store policy for
+# dynamic pages leaves them alone.
+
+VERSION_ARG = "v"
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE = (".css", ".js", ".html", ".svg", ".json", ".txt", ".map")
+MIN_COMPRESS_SIZE = 1024
+
+
+def _is_static_endpoint(endpoint):
+    return endpoint == "static" or endpoint.endswith(".static")
+
+
+class AssetPipeline:
+    def __init__(self):
+        self.app = None
+        self.lock = threading.Lock()
+        self.entries = {}   # abs path -> {"mtime", "size", "hash", "mimetype", "variants": {encoding: bytes}}
+        self.folders = {}   # static endpoint -> folder
+
+    def init_app(self, app):
+        """Take over the static endpoints registered so far (call after registering blueprints)."""
+        self.app = app
+        for rule in app.url_map.iter_rules():
+            if not _is_static_endpoint(rule.endpoint) or rule.endpoint in self.folders:
+                continue
+            if rule.endpoint == "static":
+                folder = app.static_folder
+            else:
+                folder = app.blueprints[rule.endpoint.rsplit(".", 1)[0]].static_folder
+            if folder:
+                self.folders[rule.endpoint] = folder
+                app.view_functions[rule.endpoint] = self._static_view(folder)
+        app.url_defaults(self._add_version)
+        self.warm()
+
+    def warm(self):
+        """Hash and compress every static file up front, so no request pays for it."""
+        for folder in set(self.folders.values()):
+            for root, _dirs, files in os.walk(folder):
+                for name in files:
+                    self._entry(os.path.join(root, name))
+
+    def _static_view(self, folder):
+        def view(filename):
+            return self.send(folder, filename)
+        return view
+
+    def _add_version(self, endpoint, values):
+        folder = self.folders.get(endpoint)
+        if folder is None or "filename" not in values or VERSION_ARG in values:
+            return
+        path = safe_join(folder, values["filename"])
+        if path and os.path.isfile(path):
+            values[VERSION_ARG] = self._entry(path)["hash"]
+
+    def _entry(self, path):
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                return entry
+        with open(path, "rb") as f:
+            data = f.read()
+        variants = {}
+        if path.endswith(COMPRESSIBLE) and len(data) >= MIN_COMPRESS_SIZE:
+            variants["gzip"] = gzip.compress(data, 9, mtime=0)
+            if brotli:
+                variants["br"] = brotli.compress(data, quality=11)
+        entry = {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "hash": hashlib.sha256(data).hexdigest()[:16],
+            "mimetype": mimetypes.guess_type(path)[0] or "application/octet-stream",
+            # Only keep variants that are actually smaller
+            "variants": {enc: body for enc, body in variants.items() if len(body) < len(data)},
+        }
+        with self.lock:
+            self.entries[path] = entry
+        return entry
+
+    def _pick_encoding(self, entry):
+        for encoding in ("br", "gzip"):
+            if encoding in entry["variants"] and request.accept_encodings[encoding] > 0:
+                return encoding
+        return None
+
+    def send(self, folder, filename):
+        """Serve `filename` from `folder` with fingerprint-aware caching and precompressed variants."""
+        path = safe_join(folder, filename)
+        if path is None or not os.path.isfile(path):
+            raise NotFound()
+        entry = self._entry(path)
+        encoding = self._pick_encoding(entry)
+        if encoding:
+            response = Response(entry["variants"][encoding], mimetype=entry["mimetype"])
+            response.headers["Content-Encoding"] = encoding
+            response.set_etag(f"{entry['hash']}-{encoding}")
+            response.last_modified = entry["mtime"]
+            response.make_conditional(request)
+        else:
+            response = send_file(path, mimetype=entry["mimetype"], etag=entry["hash"], conditional=True)
+        response.vary.add("Accept-Encoding")
+        response.headers.pop("Expires", None)
+        if request.args.get(VERSION_ARG) == entry["hash"]:
+            response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            response.headers["Cache-Control"] = "public, no-cache"
+        g.asset_response = True
+        return response
+
+
+assets = AssetPipeline()
@@ -0,0 +1,104 @@
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import event, text
+
+from unified_dashboard.extensions import db
+
+try:
+    import fcntl
+except ImportError:  # Windows: startup is not serialized across processes
+    fcntl = None
+
+# -------------------------
+# Database backend
+# -------------------------
+# DATABASE_URL selects the backend (default: SQLite file in the instance
+# folder). PostgreSQL gets a sized, pre-pinged connection pool. SQLite is
+# switched to WAL so readers never block the writer, waits on a busy lock
+# instead of failing with "database is locked", and syncs at NORMAL (safe in
+# WAL mode). The schema is created/updated when the app starts, under a lock,
+# so several workers can start at once.
+
+DEFAULT_DATABASE_URI = 'sqlite:///users.db'
+SQLITE_BUSY_TIMEOUT_MS = 30000
+SCHEMA_LOCK_ID = 0x5CAFE  # pg_advisory_lock key for schema setup
+
+
+def database_uri():
+    uri = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URI)
+    # Heroku/Render style URLs; SQLAlchemy only accepts the postgresql:// scheme
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def engine_options(uri):
+    if uri.startswith('sqlite'):
+        return {
+            # Connections are used from the activity writer and job threads too
+            'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000, 'check_same_thread': False},
+        }
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # before server/proxy idle timeouts
+        'pool_pre_ping': True,
+    }
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def configure(app):
+    """Set the URI and engine options on `app` (call before db.init_app)."""
+    uri = database_uri()
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(uri))
+
+
+def install_listeners(app):
+    """Per-connection setup for the app's engine (call after db.init_app)."""
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite' and db.engine.url.database not in (None, '', ':memory:'):
+            event.listen(db.engine, 'connect', _sqlite_pragmas)
+
+
+@contextmanager
+def _schema_lock(app):
+    """Serialize schema setup between workers: advisory lock on Postgres, a lock file otherwise."""
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {'key': SCHEMA_LOCK_ID})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': SCHEMA_LOCK_ID})
+        return
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(os.path.join(app.instance_path, '.schema.lock'), 'w') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def init_schema(app, after=None):
+    """
+    Create missing tables, then missing indexes on existing tables
+    (create_all() only adds indexes together with their table). `after` runs
+    under the same lock, for one-off data setup.
+    """
+    with app.app_context(), _schema_lock(app):
+        db.create_all()
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+        if after:
+            after()
@@ -0,0 +1,84 @@
+import time
+import threading
+from collections import OrderedDict
+
+from flask.sessions import SecureCookieSessionInterface
+
+# -------------------------
+# Request identity
+# -------------------------
+# Flask-Login resolves the logged-in user once per request; UserCache keeps
+# those users for a short TTL (LRU-bounded) so consecutive requests from the
+# same session don't each SELECT the user row. Cached users are detached from
+# any DB session. Entries are dropped as soon as the user row changes in this
+# process; other processes see the change when their entry expires.
+#
+# Static assets never need a session or a user, so StaticSessionInterface
+# hands them a null session: no cookie parsing, no Set-Cookie refresh on
+# every asset response.
+
+USER_CACHE_TTL = 60        # seconds
+USER_CACHE_SIZE = 1024
+
+
+class UserCache:
+    def __init__(self, ttl=USER_CACHE_TTL, maxsize=USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # user_id -> (expires_at, user)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, loader):
+        """The cached user for `user_id`, or `loader(user_id)` (cached unless None)."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        user = loader(user_id)
+        if user is not None:
+            with self.lock:
+                self.entries[user_id] = (now + self.ttl, user)
+                self.entries.move_to_end(user_id)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id=None):
+        """Forget one user (or everyone)."""
+        with self.lock:
+            if user_id is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(user_id, None)
+
+    def stats(self):
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+class StaticSessionInterface(SecureCookieSessionInterface):
+    """Cookie sessions, except for requests under a static URL prefix."""
+
+    def __init__(self):
+        self._prefixes = None
+
+    def static_prefixes(self, app):
+        # URL prefixes of the app's and blueprints' static routes, e.g. /static/ and /tools/ram/static/
+        if self._prefixes is None:
+            prefixes = set()
+            for rule in app.url_map.iter_rules():
+                if rule.endpoint == "static" or rule.endpoint.endswith(".static"):
+                    prefixes.add(rule.rule.split("<", 1)[0])
+            self._prefixes = tuple(sorted(prefixes))
+        return self._prefixes
+
+    def open_session(self, app, request):
+        if request.path.startswith(self.static_prefixes(app)):
+            return self.make_null_session(app)
+        return super().open_session(app, request)
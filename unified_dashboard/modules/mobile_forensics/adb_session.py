@@ -0,0 +1,225 @@
+import time
+import uuid
+import queue
+import threading
+import subprocess
+from unified_dashboard.extensions import socketio
+
+# -------------------------
+# ADB session layer
+# -------------------------
+# AdbShell keeps one `adb shell` process per device and runs batches of
+# commands over its stdin, so a batch costs one round trip instead of one
+# adb process per command. DeviceMonitor follows `adb track-devices` in a
+# single background thread, caches the device status and pushes changes to
+# browsers over Socket.IO, so pages no longer need to poll /device-status.
+
+STATUS_EVENT = "mobile_device_status"
+RETRY_SECONDS = 5
+FIRST_STATUS_SECONDS = 5  # how long get_status(wait=True) waits for the monitor's first update
+BATCH_TIMEOUT = 120  # seconds a whole batch may take before the session is dropped
+
+
+class AdbShell:
+    """A long-lived `adb shell` for one device. Thread-safe; commands are serialized."""
+
+    def __init__(self, serial=None):
+        self.serial = serial
+        self.lock = threading.Lock()
+        self.proc = None
+        self.lines = None
+
+    def _start(self):
+        args = ["adb"] + (["-s", self.serial] if self.serial else []) + ["shell"]
+        # stdin is a pipe, so adb doesn't allocate a PTY and output isn't mangled
+        self.proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                     text=True, encoding="utf-8", errors="replace", bufsize=1)
+        # Output is read on a separate thread so run_batch can wait with a deadline
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_loop, args=(self.proc.stdout, self.lines), daemon=True).start()
+
+    @staticmethod
+    def _read_loop(stdout, lines):
+        for line in stdout:
+            lines.put(line)
+        lines.put(None)  # EOF
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+    def _close(self):
+        if self.proc and self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+            except Exception:
+                pass
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+        self.lines = None
+
+    def run_batch(self, commands, timeout=BATCH_TIMEOUT):
+        """
+        Run several shell command strings in one round trip.
+        Returns a list of (returncode, output) with stderr merged into output.
+        If the batch takes longer than `timeout` seconds, the session is dropped and
+        TimeoutError is raised.
+        """
+        with self.lock:
+            if self.proc is None or self.proc.poll() is not None:
+                self._start()
+            marker = f"__ADB_END_{uuid.uuid4().hex}__"
+            # The marker is printed after a newline, so it starts a line even when the
+            # command's output doesn't end with one; that newline is stripped again below
+            script = "".join(f"{{ {cmd} ; }} </dev/null 2>&1; printf '\\n%s %d\\n' {marker} $?\n" for cmd in commands)
+            deadline = time.monotonic() + timeout
+            try:
+                self.proc.stdin.write(script)
+                self.proc.stdin.flush()
+                results = []
+                for _ in commands:
+                    lines = []
+                    while True:
+                        try:
+                            line = self.lines.get(timeout=max(0, deadline - time.monotonic()))
+                        except queue.Empty:
+                            raise TimeoutError(f"ADB shell batch timed out after {timeout} seconds")
+                        if line is None:
+                            raise RuntimeError("ADB shell session closed unexpectedly")
+                        if line.startswith(marker):
+                            output = "".join(lines)
+                            results.append((int(line.split()[-1]), output[:-1] if output.endswith("\n") else output))
+                            break
+                        lines.append(line)
+                return results
+            except Exception:
+                # Drop the session; the next call starts a fresh one
+                self._close()
+                raise
+
+    def run(self, command):
+        return self.run_batch([command])[0]
+
+
+_shells = {}
+_shells_lock = threading.Lock()
+
+
+def get_shell(serial=None):
+    """Shared AdbShell for a device (default device if serial is None)."""
+    with _shells_lock:
+        if serial not in _shells:
+            _shells[serial] = AdbShell(serial)
+        return _shells[serial]
+
+
+def drop_shell(serial=None):
+    with _shells_lock:
+        shell = _shells.pop(serial, None)
+    if shell:
+        shell.close()
+
+
+def parse_device_list(payload):
+    """'serial<TAB>state' lines -> {serial: state}"""
+    devices = {}
+    for line in payload.splitlines():
+        parts = line.strip().split("\t")
+        if len(parts) == 2:
+            devices[parts[0]] = parts[1]
+    return devices
+
+
+def summarize_devices(adb_available, devices):
+    """Build the status dict served by /device-status and pushed over Socket.IO."""
+    authorized = [s for s, state in devices.items() if state == "device"]
+    unauthorized = [s for s, state in devices.items() if state == "unauthorized"]
+    if not adb_available:
+        message = "ADB not found. Install Android Platform Tools and ensure 'adb' is in PATH."
+    elif authorized:
+        message = "Device connected and authorized"
+    elif unauthorized:
+        message = "Device unauthorized. Accept USB debugging on phone."
+    elif devices:
+        message = "No authorized device found."
+    else:
+        message = "No device attached."
+    return {
+        "adb_available": adb_available,
+        "device_connected": bool(authorized),
+        "authorized": not unauthorized,
+        "serial": authorized[0] if authorized else None,
+        "devices": devices,
+        "message": message,
+    }
+
+
+class DeviceMonitor:
+    """Single background watcher of `adb track-devices`; caches status and broadcasts changes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = summarize_devices(False, {})
+        self.thread = None
+        self.ready = threading.Event()  # set once the first real status is known
+
+    def start(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self.thread.start()
+
+    def get_status(self, wait=False):
+        """
+        The cached status. With `wait`, a monitor that was only just started gets up to
+        FIRST_STATUS_SECONDS to report before the placeholder status is returned.
+        """
+        if wait:
+            self.ready.wait(FIRST_STATUS_SECONDS)
+        with self.lock:
+            return dict(self.status)
+
+    def _publish(self, status):
+        with self.lock:
+            changed = status != self.status
+            self.status = status
+        self.ready.set()
+        if changed:
+            # Serials that went away lose their cached shell
+            with _shells_lock:
+                gone = set(_shells) - set(status["devices"]) - {None}
+            for serial in gone:
+                drop_shell(serial)
+            if not status["device_connected"]:
+                drop_shell(None)
+            socketio.emit(STATUS_EVENT, status)
+
+    def _monitor_loop(self):
+        while True:
+            try:
+                proc = subprocess.Popen(["adb", "track-devices"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            except OSError:
+                self._publish(summarize_devices(False, {}))
+                time.sleep(RETRY_SECONDS)
+                continue
+            try:
+                # Each update is a 4-hex-digit length followed by the device list
+                while True:
+                    header = proc.stdout.read(4)
+                    if len(header) < 4:
+                        break
+                    payload = proc.stdout.read(int(header, 16)).decode("utf-8", errors="replace")
+                    self._publish(summarize_devices(True, parse_device_list(payload)))
+            except ValueError:
+                pass
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+                proc.wait()
+            # adb server restarted or went away; reconnect after a pause
+            time.sleep(RETRY_SECONDS)
+
+
+device_monitor = DeviceMonitor()
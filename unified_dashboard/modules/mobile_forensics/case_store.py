@@ -0,0 +1,255 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# -------------------------
+# Local case database
+# -------------------------
+# Every extraction is persisted to an indexed SQLite database so results
+# outlive the in-memory job state and can be searched across cases.
+# SMS bodies are indexed with FTS5 for full-text search.
+
+DB_PATH = os.path.join("extracted_data", "cases.db")
+DATE_FORMAT = "%d-%m-%Y %H:%M:%S"  # format produced by the extractors (UTC)
+BATCH_SIZE = 1000
+MAX_PER_PAGE = 500
+
+# Stored columns per artifact category (anything else lands in the JSON `extra` column)
+CATEGORY_COLUMNS = {
+    "calls": ["number", "name", "date", "duration", "type"],
+    "sms": ["address", "date", "body", "type"],
+    "contacts": ["name", "number", "type", "label"],
+    "apps": ["package", "path", "type"],
+    "browser": ["title", "url", "date", "source"],
+    "photos": ["filename", "path", "size", "size_bytes", "date", "type"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    case_name TEXT NOT NULL,
+    case_number TEXT NOT NULL,
+    device_serial TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cases_name ON cases (case_name, case_number);
+CREATE INDEX IF NOT EXISTS ix_cases_device ON cases (device_serial);
+
+-- Incremental acquisition: last case and high-water marks reached per device and provider
+CREATE TABLE IF NOT EXISTS device_state (
+    serial TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    case_id INTEGER NOT NULL REFERENCES cases(id) ON DELETE CASCADE,
+    max_id INTEGER,
+    max_date INTEGER,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (serial, provider)
+);
+"""
+
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _table_sql(category):
+    cols = ", ".join(f'"{c}" TEXT' for c in CATEGORY_COLUMNS[category])
+    return f"""
+CREATE TABLE IF NOT EXISTS {category} (
+    id INTEGER PRIMARY KEY,
+    case_id INTEGER NOT NULL REFERENCES cases(id) ON DELETE CASCADE,
+    ts INTEGER,
+    {cols},
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_{category}_case_ts ON {category} (case_id, ts);
+"""
+
+
+FTS_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS sms_fts USING fts5(body, address, content='sms', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS sms_fts_ai AFTER INSERT ON sms BEGIN
+    INSERT INTO sms_fts(rowid, body, address) VALUES (new.id, new.body, new.address);
+END;
+CREATE TRIGGER IF NOT EXISTS sms_fts_ad AFTER DELETE ON sms BEGIN
+    INSERT INTO sms_fts(sms_fts, rowid, body, address) VALUES ('delete', old.id, old.body, old.address);
+END;
+"""
+
+
+def connect(db_path=DB_PATH):
+    """Open a connection (one per thread/request); creates the schema on first use."""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    with _init_lock:
+        if db_path not in _initialized:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA + "".join(_table_sql(c) for c in CATEGORY_COLUMNS) + FTS_SQL)
+            _initialized.add(db_path)
+    return conn
+
+
+def parse_ts(date_str):
+    """Epoch seconds for an extractor date string (UTC), or None; for rows without a raw `ts`."""
+    try:
+        return int(datetime.strptime(date_str, DATE_FORMAT).replace(tzinfo=timezone.utc).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def create_case(conn, case_name, case_number, device_serial=None):
+    cur = conn.execute(
+        "INSERT INTO cases (case_name, case_number, device_serial, created_at) VALUES (?, ?, ?, ?)",
+        (case_name, case_number, device_serial, datetime.utcnow().isoformat(timespec="seconds")))
+    conn.commit()
+    return cur.lastrowid
+
+
+def get_case(conn, case_id):
+    row = conn.execute("SELECT * FROM cases WHERE id = ?", (case_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def clear_category(conn, case_id, category):
+    """Drop a category's rows for a case (snapshot categories are replaced, not merged)."""
+    with conn:
+        conn.execute(f"DELETE FROM {category} WHERE case_id = ?", (case_id,))
+
+
+def get_device_state(conn, serial):
+    """Return {provider: {"case_id", "max_id", "max_date"}} for a device serial."""
+    rows = conn.execute("SELECT provider, case_id, max_id, max_date FROM device_state WHERE serial = ?",
+                        (serial,)).fetchall()
+    return {r["provider"]: {"case_id": r["case_id"], "max_id": r["max_id"], "max_date": r["max_date"]} for r in rows}
+
+
+def save_device_marks(conn, serial, provider, case_id, marks):
+    """Store the marks reached for one provider; marks only ever move forward."""
+    with conn:
+        conn.execute("""
+            INSERT INTO device_state (serial, provider, case_id, max_id, max_date, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (serial, provider) DO UPDATE SET
+                case_id = excluded.case_id,
+                max_id = MAX(COALESCE(device_state.max_id, 0), COALESCE(excluded.max_id, 0)),
+                max_date = MAX(COALESCE(device_state.max_date, 0), COALESCE(excluded.max_date, 0)),
+                updated_at = excluded.updated_at
+        """, (serial, provider, case_id, marks.get("max_id"), marks.get("max_date"),
+              datetime.utcnow().isoformat(timespec="seconds")))
+
+
+class CategoryWriter:
+    """Buffered inserter for one category of a case; use `add` as an extractor sink."""
+
+    def __init__(self, conn, case_id, category):
+        self.conn = conn
+        self.case_id = case_id
+        self.category = category
+        self.columns = CATEGORY_COLUMNS[category]
+        self.buffer = []
+        col_sql = ", ".join(f'"{c}"' for c in self.columns)
+        marks = ", ".join("?" for _ in range(len(self.columns) + 3))
+        self.sql = f"INSERT INTO {category} (case_id, ts, {col_sql}, extra) VALUES ({marks})"
+
+    def add(self, row):
+        # `ts` is the provider's own epoch value (seconds) when the extractor has one
+        extra = {k: v for k, v in row.items() if k not in self.columns and k != "ts"}
+        ts = row.get("ts")
+        values = [self.case_id, ts if ts is not None else parse_ts(row.get("date"))]
+        values += [None if row.get(c) is None else str(row.get(c)) for c in self.columns]
+        values.append(json.dumps(extra) if extra else None)
+        self.buffer.append(values)
+        if len(self.buffer) >= BATCH_SIZE:
+            self.flush()
+
+    def add_many(self, rows):
+        for row in rows or []:
+            self.add(row)
+        self.flush()
+
+    def flush(self):
+        if self.buffer:
+            with self.conn:
+                self.conn.executemany(self.sql, self.buffer)
+            self.buffer = []
+
+
+def _row_to_dict(row):
+    d = dict(row)
+    extra = d.pop("extra", None)
+    if extra:
+        d.update(json.loads(extra))
+    return d
+
+
+def _page_args(page, per_page):
+    page = max(1, int(page or 1))
+    per_page = min(MAX_PER_PAGE, max(1, int(per_page or 50)))
+    return page, per_page, (page - 1) * per_page
+
+
+def _date_bound(value, end=False):
+    """'YYYY-MM-DD' (UTC) -> epoch seconds (start of day, or end of day if `end`)."""
+    if not value:
+        return None
+    day = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(day.timestamp()) + (86399 if end else 0)
+
+
+def list_cases(conn, page=1, per_page=50):
+    page, per_page, offset = _page_args(page, per_page)
+    total = conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+    counts = ", ".join(f"(SELECT COUNT(*) FROM {c} WHERE case_id = cases.id) AS {c}" for c in CATEGORY_COLUMNS)
+    rows = conn.execute(f"SELECT cases.*, {counts} FROM cases ORDER BY id DESC LIMIT ? OFFSET ?",
+                        (per_page, offset)).fetchall()
+    return {"page": page, "per_page": per_page, "total": total, "items": [dict(r) for r in rows]}
+
+
+def query_category(conn, category, case_id=None, q=None, date_from=None, date_to=None,
+                   filters=None, page=1, per_page=50):
+    """
+    Paginated, filterable query over one artifact category (optionally across all cases).
+    `q` is a full-text query for SMS and a substring match on text columns elsewhere.
+    `filters` maps column -> exact value (only known columns are honoured).
+    """
+    if category not in CATEGORY_COLUMNS:
+        raise ValueError(f"Unknown category: {category}")
+    page, per_page, offset = _page_args(page, per_page)
+    where, params = [], []
+    table = category
+
+    if case_id is not None:
+        where.append(f"{table}.case_id = ?")
+        params.append(int(case_id))
+    lo, hi = _date_bound(date_from), _date_bound(date_to, end=True)
+    if lo is not None:
+        where.append(f"{table}.ts >= ?")
+        params.append(lo)
+    if hi is not None:
+        where.append(f"{table}.ts <= ?")
+        params.append(hi)
+    for col, val in (filters or {}).items():
+        if col in CATEGORY_COLUMNS[category] and val not in (None, ""):
+            where.append(f'{table}."{col}" = ?')
+            params.append(val)
+
+    join = ""
+    if q:
+        if category == "sms":
+            join = "JOIN sms_fts ON sms_fts.rowid = sms.id"
+            where.append("sms_fts MATCH ?")
+            params.append(q)
+        else:
+            like = " OR ".join(f'{table}."{c}" LIKE ?' for c in CATEGORY_COLUMNS[category])
+            where.append(f"({like})")
+            params += [f"%{q}%"] * len(CATEGORY_COLUMNS[category])
+
+    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+    total = conn.execute(f"SELECT COUNT(*) FROM {table} {join} {where_sql}", params).fetchone()[0]
+    rows = conn.execute(
+        f"SELECT {table}.* FROM {table} {join} {where_sql} ORDER BY {table}.ts DESC, {table}.id LIMIT ? OFFSET ?",
+        params + [per_page, offset]).fetchall()
+    return {"page": page, "per_page": per_page, "total": total, "items": [_row_to_dict(r) for r in rows]}
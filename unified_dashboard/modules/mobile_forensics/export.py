@@ -0,0 +1,140 @@
+import os
+import csv
+import json
+import shutil
+import zipfile
+import xlsxwriter
+
+# -------------------------
+# Streaming case export
+# -------------------------
+# Rows are written as the extractors produce them, so memory use does not grow
+# with case size. XLSX uses xlsxwriter's constant_memory mode (each row is
+# flushed to a temp file once the next row starts). CSV and JSONL write one
+# file per sheet and are zipped together when the export is closed.
+
+EXPORT_FORMATS = ("xlsx", "csv", "jsonl")
+
+# Fixed columns for the sheets that are streamed row by row
+SHEET_COLUMNS = {
+    "Calls": ["number", "name", "date", "duration", "type"],
+    "SMS": ["address", "date", "body", "type"],
+    "Contacts": ["name", "number", "type", "label"],
+    "Photos Index": ["filename", "path", "size", "size_bytes", "date", "type"],
+}
+
+XLSX_MAX_CELL = 32767  # Excel's per-cell character limit
+
+
+class SheetWriter:
+    """Append-only writer for one sheet of a CaseExporter."""
+
+    def __init__(self, exporter, name, columns):
+        self.exporter = exporter
+        self.name = name
+        self.columns = list(columns)
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._ws = None
+
+        if exporter.fmt == "xlsx":
+            self._ws = exporter.workbook.add_worksheet(name[:31])
+            self._ws.write_row(0, 0, self.columns, exporter.header_format)
+        else:
+            path = os.path.join(exporter.work_dir, f"{name.replace(' ', '_').lower()}.{exporter.fmt}")
+            exporter.parts.append(path)
+            self._file = open(path, "w", encoding="utf-8", newline="")
+            if exporter.fmt == "csv":
+                self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+                self._writer.writeheader()
+
+    def write(self, row):
+        self.rows += 1
+        if self._ws is not None:
+            values = []
+            for col in self.columns:
+                val = row.get(col, "")
+                if isinstance(val, (dict, list)):
+                    val = json.dumps(val)
+                if isinstance(val, str) and len(val) > XLSX_MAX_CELL:
+                    val = val[:XLSX_MAX_CELL]
+                values.append(val)
+            self._ws.write_row(self.rows, 0, values)
+        elif self._writer is not None:
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class CaseExporter:
+    """
+    Export a case as it is extracted.
+    Use `sheet(name)` to get a streaming SheetWriter, or `write_rows(name, rows)` for small
+    already-built lists. `close()` finalizes the file and returns its basename.
+    """
+
+    def __init__(self, out_dir, base_name, fmt="xlsx"):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.fmt = fmt
+        self.out_dir = out_dir
+        self.base_name = base_name
+        self.sheets = {}
+        self.parts = []
+        os.makedirs(out_dir, exist_ok=True)
+
+        if fmt == "xlsx":
+            self.filename = f"{base_name}.xlsx"
+            self.workbook = xlsxwriter.Workbook(os.path.join(out_dir, self.filename), {
+                "constant_memory": True,
+                # Extracted text is evidence, never formulas/links (e.g. an SMS starting with '=')
+                "strings_to_formulas": False,
+                "strings_to_urls": False,
+            })
+            self.header_format = self.workbook.add_format({"bold": True})
+        else:
+            self.filename = f"{base_name}_{fmt}.zip"
+            self.workbook = None
+            self.work_dir = os.path.join(out_dir, f"{base_name}_{fmt}")
+            os.makedirs(self.work_dir, exist_ok=True)
+
+    def sheet(self, name, columns=None):
+        if name not in self.sheets:
+            self.sheets[name] = SheetWriter(self, name, columns or SHEET_COLUMNS[name])
+        return self.sheets[name]
+
+    def sink(self, name):
+        """Return a row callback for extractors; the sheet is only created once a row arrives."""
+        return lambda row: self.sheet(name).write(row)
+
+    def write_rows(self, name, rows):
+        """Write a small in-memory list; columns are the union of all row keys in first-seen order."""
+        if not rows:
+            return
+        columns = []
+        for row in rows:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+        writer = self.sheet(name, columns)
+        for row in rows:
+            writer.write(row)
+
+    def close(self):
+        for writer in self.sheets.values():
+            writer.close()
+        if self.workbook is not None:
+            self.workbook.close()
+        else:
+            with zipfile.ZipFile(os.path.join(self.out_dir, self.filename), "w", zipfile.ZIP_DEFLATED) as zf:
+                for path in self.parts:
+                    zf.write(path, arcname=os.path.basename(path))
+            # The per-sheet files only exist to be zipped
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        return self.filename
@@ -0,0 +1,347 @@
+import os
+import json
+import shlex
+import tarfile
+import hashlib
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# -------------------------
+# Media acquisition engine
+# -------------------------
+# Files listed by the MediaStore index are streamed with `adb exec-out cat`
+# (or `tail -c +N` to resume a partial file) so each one can be hashed while
+# it is written. Completed files are recorded in a per-case manifest, which
+# is what lets a re-run skip files that are already on disk. exec-out merges
+# the device's stderr into the data, so remote commands silence it; only a
+# clean short read (recorded in `<file>.part.json`) is ever resumed.
+
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_NAME = "media_manifest.json"
+DEFAULT_WORKERS = 4
+MANIFEST_CHECKPOINT = 50
+
+# Folders acquired by the bulk (tar) transfer mode, relative to the device root
+BULK_TARGETS = ["sdcard/DCIM", "sdcard/Pictures", "sdcard/Download"]
+
+
+def local_path_for(case_dir, device_path):
+    """Mirror the device path under the case directory (e.g. case/storage/emulated/0/DCIM/x.jpg)."""
+    rel = os.path.normpath(device_path.lstrip("/"))
+    if rel.startswith(".."):
+        raise ValueError(f"Refusing unsafe device path: {device_path}")
+    return os.path.join(case_dir, rel)
+
+
+def sha256_file(path, limit=None):
+    """Return a SHA-256 hash object over a local file (optionally only its first `limit` bytes)."""
+    h = hashlib.sha256()
+    remaining = limit
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return h
+
+
+def load_manifest(case_dir):
+    path = os.path.join(case_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {entry["source"]: entry for entry in json.load(f)}
+    except Exception:
+        return {}
+
+
+def save_manifest(case_dir, entries):
+    path = os.path.join(case_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sorted(entries.values(), key=lambda e: e["source"]), f, indent=2)
+    os.replace(tmp, path)
+
+
+def _load_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class MediaPuller:
+    """
+    Pull a list of device files concurrently with a bounded worker pool.
+    Progress is reported through `on_progress(files_done, files_total, bytes_done, bytes_total)`.
+    """
+
+    def __init__(self, case_dir, workers=DEFAULT_WORKERS, on_progress=None):
+        self.case_dir = case_dir
+        self.workers = max(1, int(workers))
+        self.on_progress = on_progress
+        self.lock = threading.Lock()
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+
+    def _advance(self, nbytes=0, files=0):
+        with self.lock:
+            self.bytes_done += nbytes
+            self.files_done += files
+            snapshot = (self.files_done, self.files_total, self.bytes_done, self.bytes_total)
+        if self.on_progress:
+            self.on_progress(*snapshot)
+
+    def _pull_one(self, source, size, previous):
+        dest = local_path_for(self.case_dir, source)
+        entry = {"source": source, "destination": dest, "size": size}
+
+        # Already acquired: same size and same hash as recorded last time
+        if os.path.exists(dest) and (size is None or os.path.getsize(dest) == size):
+            digest = sha256_file(dest).hexdigest()
+            if previous and previous.get("sha256") == digest:
+                self._advance(os.path.getsize(dest), 1)
+                entry.update(size=os.path.getsize(dest), sha256=digest, status="Skipped (Verified)")
+                return entry
+
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        part = dest + ".part"
+        marker = part + ".json"
+
+        # Resume a partial transfer: re-hash what we have and ask the device for the rest.
+        # Only parts recorded as a clean short read of this same file are trusted.
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset and _load_json(marker) != {"source": source, "size": size}:
+            offset = 0
+        if size is None or offset >= size:
+            offset = 0
+        h = sha256_file(part, limit=offset) if offset else hashlib.sha256()
+        # exec-out has no separate stderr channel: device errors must not end up in the file
+        if offset:
+            self._advance(offset)
+            remote_cmd = f"tail -c +{offset + 1} {shlex.quote(source)} 2>/dev/null"
+        else:
+            remote_cmd = f"cat {shlex.quote(source)} 2>/dev/null"
+
+        proc = subprocess.Popen(["adb", "exec-out", remote_cmd], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        written = offset
+        try:
+            with open(part, "ab" if offset else "wb") as out:
+                out.truncate(offset)
+                while True:
+                    chunk = proc.stdout.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    h.update(chunk)
+                    written += len(chunk)
+                    self._advance(len(chunk))
+            proc.wait()
+            err = proc.stderr.read().decode("utf-8", errors="replace").strip()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            proc.stderr.close()
+
+        received = written - offset
+        if proc.returncode != 0 or (size is not None and written != size) or (received == 0 and size != 0):
+            if size is not None and offset < written < size:
+                # A clean short read (e.g. device dropped off): keep it so the next run can resume
+                _save_json(marker, {"source": source, "size": size})
+            else:
+                # Nothing arrived, size unknown or too many bytes: the part can't be trusted
+                _remove(part)
+                _remove(marker)
+            if received == 0 and not err:
+                err = "no data received (file missing or unreadable on the device)"
+            entry.update(status="Partial/Fail", bytes=written, details=(err or f"got {written} of {size} bytes")[:200])
+            self._advance(files=1)
+            return entry
+
+        os.replace(part, dest)
+        _remove(marker)
+        entry.update(size=written, sha256=h.hexdigest(), status="Success")
+        self._advance(files=1)
+        return entry
+
+    def pull(self, files):
+        """
+        Pull `files` (iterable of (device_path, size_in_bytes_or_None)).
+        Returns a list of per-file log entries; the case manifest is updated as files complete.
+        """
+        files = [(src, size) for src, size in files if src]
+        manifest = load_manifest(self.case_dir)
+        with self.lock:
+            self.files_total = len(files)
+            self.bytes_total = sum(size or 0 for _, size in files)
+
+        log = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._pull_one, src, size, manifest.get(src)): src for src, size in files}
+            for fut in as_completed(futures):
+                try:
+                    entry = fut.result()
+                except Exception as e:
+                    entry = {"source": futures[fut], "status": "Error", "details": str(e)}
+                    self._advance(files=1)
+                log.append(entry)
+                if entry.get("sha256"):
+                    manifest[entry["source"]] = entry
+                    # Checkpoint periodically so an interrupted run can resume
+                    if len(log) % MANIFEST_CHECKPOINT == 0:
+                        save_manifest(self.case_dir, manifest)
+        save_manifest(self.case_dir, manifest)
+
+        log.sort(key=lambda e: e["source"])
+        return log
+
+
+class _HashingReader:
+    """File-like wrapper that hashes and counts every byte read from the adb stream."""
+
+    def __init__(self, raw, on_read=None):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+        self.on_read = on_read
+        self._reported = 0
+
+    def read(self, n=-1):
+        data = self.raw.read(n)
+        if data:
+            self.sha256.update(data)
+            self.bytes_read += len(data)
+            # tarfile reads in small records; only report every CHUNK_SIZE bytes
+            if self.on_read and self.bytes_read - self._reported >= CHUNK_SIZE:
+                self._reported = self.bytes_read
+                self.on_read(self.bytes_read)
+        return data
+
+
+class _EndAwareTarInfo(tarfile.TarInfo):
+    """Notes on the TarFile when the end-of-archive zero block is read (a cut stream just stops)."""
+
+    @classmethod
+    def fromtarfile(cls, tarfile_):
+        try:
+            return super().fromtarfile(tarfile_)
+        except tarfile.EOFHeaderError:
+            tarfile_.end_of_archive = True
+            raise
+
+
+def stream_tar(case_dir, targets=None, compress=False, on_progress=None):
+    """
+    Bulk-acquire whole folders by streaming an on-device `tar` through `adb exec-out`.
+    Avoids per-file round trips for small-file-heavy folders. The archive is never
+    written to disk: members are unpacked and hashed as they arrive, and each file is
+    added to the case manifest. `on_progress(files_done, bytes_read)` reports stream progress.
+    Returns (log_entries, summary) where summary holds the archive SHA-256 and byte count,
+    and `complete` is True only if the archive arrived intact up to its end marker.
+    """
+    targets = targets or BULK_TARGETS
+    flags = "-czf" if compress else "-cf"
+    # exec-out merges stderr into the archive stream, so tar's warnings are silenced and
+    # only folders that exist are passed to it
+    folders = " ".join(shlex.quote(t.lstrip("/")) for t in targets)
+    remote_cmd = (f'cd / && set -- && for d in {folders}; do [ -d "$d" ] && set -- "$@" "$d"; done; '
+                  f'[ $# -gt 0 ] && tar {flags} - "$@" 2>/dev/null')
+
+    manifest = load_manifest(case_dir)
+    log = []
+    files_done = 0
+
+    proc = subprocess.Popen(["adb", "exec-out", remote_cmd], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    reader = _HashingReader(proc.stdout, on_read=lambda n: on_progress(files_done, n) if on_progress else None)
+    complete = False
+    err = ""
+    try:
+        with tarfile.open(fileobj=reader, mode="r|gz" if compress else "r|", tarinfo=_EndAwareTarInfo) as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                source = "/" + os.path.normpath(member.name).lstrip("/")
+                try:
+                    dest = local_path_for(case_dir, source)
+                except ValueError as e:
+                    log.append({"source": source, "status": "Skipped (Unsafe path)", "details": str(e)})
+                    continue
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                h = hashlib.sha256()
+                src = archive.extractfile(member)
+                try:
+                    with open(dest, "wb") as out:
+                        while True:
+                            chunk = src.read(CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            out.write(chunk)
+                            h.update(chunk)
+                except tarfile.TarError:
+                    _remove(dest)  # cut off mid-member
+                    raise
+                if member.mtime:
+                    os.utime(dest, (member.mtime, member.mtime))
+                entry = {"source": source, "destination": dest, "size": member.size,
+                         "sha256": h.hexdigest(), "status": "Success (Bulk)"}
+                manifest[source] = entry
+                log.append(entry)
+                files_done += 1
+                if files_done % MANIFEST_CHECKPOINT == 0:
+                    save_manifest(case_dir, manifest)
+            complete = getattr(archive, "end_of_archive", False)
+        # Drain the record padding so the stream hash covers everything that was sent
+        while reader.read(CHUNK_SIZE):
+            pass
+        proc.wait()
+        err = proc.stderr.read().decode("utf-8", errors="replace").strip()
+        if not complete:
+            err = err or "Archive stream ended before the end-of-archive marker"
+    except tarfile.ReadError as e:
+        if reader.bytes_read == 0:
+            err = "Empty archive stream: none of the target folders exist on the device, or tar failed"
+        else:
+            err = f"Archive stream error: {e}"
+    except tarfile.TarError as e:
+        err = f"Archive stream error: {e}"
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+        save_manifest(case_dir, manifest)
+
+    summary = {
+        "targets": ", ".join(targets),
+        "compressed": bool(compress),
+        "files": files_done,
+        "stream_bytes": reader.bytes_read,
+        "stream_sha256": reader.sha256.hexdigest(),
+        # adb exec-out doesn't pass tar's exit status through; the archive's end marker is the check
+        "complete": complete,
+        "details": err[:500],
+    }
+    return log, summary
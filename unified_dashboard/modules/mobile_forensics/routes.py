@@ -1,11 +1,15 @@
 from flask import Blueprint, render_template, request, jsonify, send_file
-import threading, time, os, subprocess, re
+import threading, time, os, subprocess, re, shlex, sqlite3, uuid
 from datetime import datetime
-import pandas as pd
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet
+from .media import MediaPuller, stream_tar
+from .export import CaseExporter, EXPORT_FORMATS
+from . import case_store
+from .adb_session import get_shell, device_monitor
+from unified_dashboard.progress import progress_channel
 
 # Define Blueprint
 mobile_bp = Blueprint('mobile', __name__, url_prefix='/tools/mobile', template_folder='templates', static_folder='static')
@@ -21,34 +25,18 @@ progress = {
 }
 progress_lock = threading.Lock()
 
+def set_progress(**fields):
+    """Update the shared job state and publish it on the progress channel (result stays server-side)."""
+    with progress_lock:
+        progress.update(fields)
+        job_id = progress.get("job_id")
+    fields.pop("result", None)
+    progress_channel.update(job_id, **fields)
+
 
 # -------------------------
 # Helper utilities (ADB)
 # -------------------------
-def adb_check():
-    try:
-        subprocess.run(["adb", "version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-        return True
-    except Exception:
-        return False
-
-def adb_devices():
-    try:
-        proc = subprocess.run(["adb", "devices"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        out = proc.stdout.decode("utf-8", errors="replace")
-        lines = [ln.strip() for ln in out.splitlines() if ln.strip()]
-        if len(lines) <= 1:
-            return False, "No device attached."
-        # look for any line ending with <tab>device
-        for ln in lines[1:]:
-            if ln.endswith("\tdevice"):
-                return True, "Device connected."
-            if "unauthorized" in ln:
-                return False, "Device unauthorized. Accept USB debugging on phone."
-        return False, "No authorized device found."
-    except Exception as e:
-        return False, f"ADB error: {e}"
-
 def run_adb(args):
     """
     Run adb command (list form) and return stdout string decoded as utf-8 (replace errors).
@@ -61,56 +49,180 @@ def run_adb(args):
         raise RuntimeError(f"ADB returned code {proc.returncode}. stderr: {err.strip()}")
     return out
 
+def adb_shell(command):
+    """
+    Run a device shell command string over the persistent ADB session (no new adb process).
+    Returns stdout (stderr merged); raises RuntimeError on non-zero exit status.
+    """
+    rc, out = get_shell().run(command)
+    if rc != 0:
+        raise RuntimeError(f"ADB shell command returned code {rc}: {out.strip()[:200]}")
+    return out
+
+def adb_serial():
+    """Serial number of the attached device ('' if unavailable)."""
+    cached = device_monitor.get_status().get("serial")
+    if cached:
+        return cached
+    try:
+        out = run_adb(["adb", "get-serialno"]).strip()
+    except Exception:
+        return ""
+    return "" if out == "unknown" else out
+
+def stream_adb(args):
+    """
+    Run adb command (list form) and yield stdout lines as they arrive, decoded as utf-8 (replace errors).
+    Nothing is buffered beyond the current line. Raises RuntimeError on non-zero return code.
+    """
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, encoding="utf-8", errors="replace")
+    try:
+        for line in proc.stdout:
+            yield line
+        proc.wait()
+        if proc.returncode != 0:
+            err = proc.stderr.read()
+            raise RuntimeError(f"ADB returned code {proc.returncode}. stderr: {err.strip()}")
+    finally:
+        # Consumer stopped early (or error): don't leave adb running
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
 
 # -------------------------
 # Parsing content query output
 # -------------------------
-def parse_content_line_to_dict(line):
+ROW_PREFIX_RE = re.compile(r"^Row:\s*\d+\s?")
+CONTENT_KEY_RE = re.compile(r"(?:^|, )([A-Za-z_][A-Za-z0-9_]*)=")
+
+def parse_content_row(text):
     """
-    Parse a single 'content query' line into a dict.
-    Logic:
-      - Split line into tokens by whitespace.
-      - Token containing '=' begins a new key; token without '=' is continuation of previous value.
-      This preserves values that contain spaces (e.g. SMS body).
+    Parse the body of one 'content query' row (without the 'Row: N' prefix) into a dict.
+    Output format is 'key1=value1, key2=value2, ...'; a value runs until the next ', key='
+    so spaces and embedded newlines (e.g. SMS body) are preserved.
     """
+    matches = list(CONTENT_KEY_RE.finditer(text))
+    if not matches:
+        return {"raw": text.strip()}
     data = {}
-    tokens = line.strip().split()
-    current_key = None
-    for tok in tokens:
-        if '=' in tok:
-            k, v = tok.split('=', 1)
-            current_key = k
-            # Strip trailing commas and whitespace from value
-            data[k] = v.rstrip(',').strip()
-        else:
-            # continuation of previous value
-            if current_key:
-                data[current_key] = data[current_key] + ' ' + tok.rstrip(',').strip()
-            else:
-                # no key yet; store under raw_accum (unlikely)
-                data.setdefault("_raw", "")
-                data["_raw"] += " " + tok.rstrip(',').strip()
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        end = nxt.start() if nxt else len(text)
+        data[m.group(1)] = text[m.end():end]
     return data
 
+def iter_content_rows(lines):
+    """
+    Incrementally turn 'content query' output lines into row dicts (generator).
+    A new row starts at each 'Row: N' line; following lines that don't start a row
+    are continuations of a multi-line value and are joined back with newlines.
+    Non-row lines before the first row (e.g. 'No result found.') are yielded as {"raw": line}.
+    """
+    buf = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.startswith("Row:"):
+            if buf is not None:
+                yield parse_content_row("\n".join(buf))
+            buf = [ROW_PREFIX_RE.sub("", line, count=1)]
+        elif buf is not None:
+            buf.append(line)
+        elif line.strip():
+            yield {"raw": line.strip()}
+    if buf is not None:
+        yield parse_content_row("\n".join(buf))
+
 def parse_content_query_output(raw):
     """
     Convert content query raw output into list of dicts.
-    Each non-empty line becomes one dict (tolerant).
+    Kept for small, already-buffered outputs; large providers should use iter_content_query.
     """
-    rows = []
     if not raw:
-        return rows
-    for line in raw.splitlines():
-        line = line.strip()
-        if not line:
+        return []
+    return list(iter_content_rows(raw.splitlines()))
+
+def content_query_args(uri, projection=None, where=None, sort=None):
+    """
+    Build the adb argument list for 'content query'.
+    adb joins shell arguments into one command line for the device shell, so --where/--sort
+    values (which contain '>', spaces, quotes) are shell-quoted.
+    """
+    args = ["adb", "shell", "content", "query", "--uri", uri]
+    if projection:
+        args += ["--projection", ":".join(projection)]
+    if where:
+        args += ["--where", shlex.quote(where)]
+    if sort:
+        args += ["--sort", shlex.quote(sort)]
+    return args
+
+def join_where(*clauses):
+    """AND together the non-empty SQL predicates (None if there are none)."""
+    clauses = [c for c in clauses if c]
+    if not clauses:
+        return None
+    return " AND ".join(f"({c})" for c in clauses)
+
+def _newer_than(row, key, floor, strict=False):
+    """False only if row[key] parses as an int below (or, if strict, at) `floor`."""
+    try:
+        value = int(row.get(key))
+    except (TypeError, ValueError):
+        return True
+    return value > floor if strict else value >= floor
+
+def iter_content_query(uri, projection=None, where=None, sort=None, min_date=None, date_key="date",
+                       since_id=None, on_row=None, push_down=True):
+    """
+    Stream rows of `adb shell content query --uri <uri>` as dicts without buffering the output.
+    `projection` (list of columns), `where` (SQL predicate) and `sort` (ORDER BY clause) are pushed
+    down to the content provider so the device only sends the rows and columns needed.
+    `since_id` restricts the query to rows with a larger `_id` (incremental acquisition).
+    Rows older than `min_date` (same unit as `date_key`) or not newer than `since_id` are also dropped
+    while streaming, which keeps results correct if a provider rejects the pushed-down query and we
+    fall back to a plain one. Rows without a parseable value are kept. Status lines (no key=value) are skipped.
+    `on_row(count)` is called for every row received from the device.
+    """
+    if push_down:
+        args = content_query_args(uri, projection, join_where(where, f"_id>{int(since_id)}" if since_id else None), sort)
+    else:
+        args = content_query_args(uri)
+    count = 0
+    try:
+        rows = iter_content_rows(stream_adb(args))
+        for row in rows:
+            if "raw" in row and len(row) == 1:
+                continue
+            count += 1
+            if on_row:
+                on_row(count)
+            if min_date and not _newer_than(row, date_key, min_date):
+                continue
+            if since_id and not _newer_than(row, "_id", int(since_id), strict=True):
+                continue
+            yield row
+    except RuntimeError:
+        # Some OEM providers reject unknown projection columns or where clauses.
+        # Retry once without push-down if nothing was streamed yet.
+        if count or not push_down or not (projection or where or sort or since_id):
+            raise
+        yield from iter_content_query(uri, min_date=min_date, date_key=date_key, since_id=since_id,
+                                      on_row=on_row, push_down=False)
+
+def track_marks(marks, row, date_key="date"):
+    """Raise the high-water marks (max `_id` / max date) in `marks` with one provider row."""
+    if marks is None:
+        return
+    for mark, key in (("max_id", "_id"), ("max_date", date_key)):
+        try:
+            value = int(row.get(key))
+        except (TypeError, ValueError):
             continue
-        # skip 'Rows:' or similar header lines if present
-        if line.lower().startswith("row") or "=" in line:
-            d = parse_content_line_to_dict(line)
-            rows.append(d)
-        else:
-            rows.append({"raw": line})
-    return rows
+        if value > (marks.get(mark) or 0):
+            marks[mark] = value
 
 
 # -------------------------
@@ -126,78 +238,151 @@ CALL_TYPE_MAP = {
     '7': 'Answered Externally',
 }
 
-def extract_call_logs_structured(days):
-    # run adb and parse
-    out = run_adb(["adb", "shell", "content", "query", "--uri", "content://call_log/calls/"])
-    parsed = parse_content_query_output(out)
-
-    # try to filter by date field (ms)
+# Columns requested from each provider (--projection)
+CALL_LOG_COLUMNS = ["_id", "number", "formatted_number", "name", "date", "duration", "type"]
+SMS_COLUMNS = ["_id", "address", "date", "body", "type"]
+PHOTO_COLUMNS = ["_id", "_display_name", "_data", "_size", "datetaken", "date_modified", "date_added", "mime_type"]
+
+# Rows kept in memory per category for the job result; the rest are only in the case store
+PREVIEW_ROWS = 50
+
+class RowSummary:
+    """Row count, first PREVIEW_ROWS rows and (optionally) counts per value of one column."""
+
+    def __init__(self, group_by=None):
+        self.count = 0
+        self.preview = []
+        self.group_by = group_by
+        self.groups = {}
+
+    def add(self, entry):
+        self.count += 1
+        if len(self.preview) < PREVIEW_ROWS:
+            self.preview.append(entry)
+        if self.group_by:
+            value = entry.get(self.group_by) or "Unknown"
+            self.groups[value] = self.groups.get(value, 0) + 1
+
+    def as_dict(self):
+        summary = {"count": self.count, "preview": self.preview}
+        if self.group_by:
+            summary[f"by_{self.group_by}"] = self.groups
+        return summary
+
+def summarize_rows(rows):
+    """RowSummary dict of a small in-memory list (apps, browser, logs)."""
+    summary = RowSummary()
+    for row in rows or []:
+        summary.add(row)
+    return summary.as_dict()
+
+def epoch_seconds(value, per_second=1):
+    """
+    Epoch seconds from a provider's raw epoch value (`per_second` = its units per second,
+    1000 for ms), or None. Entries carry this as `ts`, which the case store indexes as is.
+    """
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value // per_second if value > 0 else None
+
+def date_threshold_ms(days):
+    """Return the epoch-ms cutoff for a 'last N days' range (0 = all time)."""
+    if int(days) == 0:
+        return 0
     now_ms = int(datetime.utcnow().timestamp() * 1000)
-    threshold = now_ms - int(days) * 24 * 3600 * 1000
-    result = []
-    for row in parsed:
-        date_raw = row.get("date") or row.get("_id")
+    return now_ms - int(days) * 24 * 3600 * 1000
+
+def extract_call_logs_structured(days, on_row=None, sink=None, since_id=None, marks=None):
+    """
+    Extract call logs newer than `days`.
+    `on_row(count)` is called after each parsed row so callers can report progress;
+    `sink(entry)` receives each structured entry as it is produced (streaming export).
+    For incremental acquisition, `since_id` skips rows already acquired and `marks`
+    (dict) is updated with the new high-water marks.
+    Returns a RowSummary dict (count, preview, by_type); the rows themselves go to `sink`.
+    """
+    # stream rows, filtering by date field (ms) as they arrive
+    threshold = date_threshold_ms(days)
+    summary = RowSummary(group_by="type")
+    rows = iter_content_query("content://call_log/calls/",
+                              projection=CALL_LOG_COLUMNS,
+                              where=f"date>={threshold}" if threshold else None,
+                              sort="date DESC",
+                              min_date=threshold, since_id=since_id, on_row=on_row)
+    for row in rows:
+        track_marks(marks, row)
+        ts = epoch_seconds(row.get("date"), 1000)
         try:
-            ts = int(row.get("date"))
-            if ts < threshold:
-                continue
-            date_str = datetime.utcfromtimestamp(ts/1000).strftime("%d-%m-%Y %H:%M:%S")
+            date_str = datetime.utcfromtimestamp(int(row.get("date"))/1000).strftime("%d-%m-%Y %H:%M:%S")
         except Exception:
             date_str = row.get("date", "")
         type_code = str(row.get("type", "")).strip()
         type_str = CALL_TYPE_MAP.get(type_code, type_code)
-        result.append({
+        entry = {
             "number": row.get("number", row.get("formatted_number", "")),
             "name": row.get("name", ""),
             "date": date_str,
+            "ts": ts,
             "duration": row.get("duration", ""),
             "type": type_str
-        })
-    return result
-
-def extract_sms_structured(days):
-    out = run_adb(["adb", "shell", "content", "query", "--uri", "content://sms/"])
-    parsed = parse_content_query_output(out)
-    now_ms = int(datetime.utcnow().timestamp() * 1000)
-    threshold = now_ms - int(days) * 24 * 3600 * 1000
-    result = []
-    for row in parsed:
+        }
+        summary.add(entry)
+        if sink:
+            sink(entry)
+    return summary.as_dict()
+
+def extract_sms_structured(days, on_row=None, sink=None, since_id=None, marks=None):
+    threshold = date_threshold_ms(days)
+    summary = RowSummary()
+    rows = iter_content_query("content://sms/",
+                              projection=SMS_COLUMNS,
+                              where=f"date>={threshold}" if threshold else None,
+                              sort="date DESC",
+                              min_date=threshold, since_id=since_id, on_row=on_row)
+    for row in rows:
+        track_marks(marks, row)
         # some rows may be metadata-only; try to obtain address/body/date
         date_str = ""
+        ts = epoch_seconds(row.get("date"), 1000)
         try:
-            ts = int(row.get("date"))
-            if ts < threshold:
-                continue
-            date_str = datetime.utcfromtimestamp(ts/1000).strftime("%d-%m-%Y %H:%M:%S")
+            date_str = datetime.utcfromtimestamp(int(row.get("date"))/1000).strftime("%d-%m-%Y %H:%M:%S")
         except Exception:
             date_str = row.get("date", "")
-        result.append({
+        entry = {
             "address": row.get("address", ""),
             "date": date_str,
+            "ts": ts,
             "body": row.get("body", row.get("snippet", row.get("raw", ""))),
             "type": row.get("type", "")
-        })
-    return result
-
-def extract_contacts_structured():
-    out = run_adb(["adb", "shell", "content", "query", "--uri", "content://contacts/phones/"])
-    parsed = parse_content_query_output(out)
-    result = []
-    for row in parsed:
-        result.append({
+        }
+        summary.add(entry)
+        if sink:
+            sink(entry)
+    return summary.as_dict()
+
+def extract_contacts_structured(on_row=None, sink=None, since_id=None, marks=None):
+    summary = RowSummary()
+    for row in iter_content_query("content://contacts/phones/", since_id=since_id, on_row=on_row):
+        track_marks(marks, row)
+        entry = {
             "name": row.get("display_name", row.get("name", "")),
             "number": row.get("number", row.get("data1", "")),
             "type": row.get("data2", ""),  # phone type (mobile, home, work, etc.)
             "label": row.get("data3", "")  # custom label
-        })
-    return result
+        }
+        summary.add(entry)
+        if sink:
+            sink(entry)
+    return summary.as_dict()
 
 def extract_apps_structured():
     """Extract installed applications information"""
     apps = []
     try:
         # primary method: list with paths
-        out = run_adb(["adb", "shell", "pm", "list", "packages", "-f", "-3"])
+        out = adb_shell("pm list packages -f -3")
         for line in out.splitlines():
             line = line.strip()
             if not line: continue
@@ -214,7 +399,7 @@ def extract_apps_structured():
         
         # fallback: if no apps found, try without -f (some devices restrict path visibility)
         if not apps:
-            out = run_adb(["adb", "shell", "pm", "list", "packages", "-3"])
+            out = adb_shell("pm list packages -3")
             for line in out.splitlines():
                 line = line.strip()
                 if line.startswith("package:"):
@@ -229,7 +414,7 @@ def extract_browser_history():
     """Extract browser history (Chrome/Default) - Best Effort"""
     try:
         # Method 1: Try legacy browser content provider (older Android)
-        out = run_adb(["adb", "shell", "content", "query", "--uri", "content://browser/bookmarks"])
+        out = adb_shell("content query --uri content://browser/bookmarks")
         parsed = parse_content_query_output(out)
         
         valid_results = []
@@ -245,6 +430,7 @@ def extract_browser_history():
                          "title": title,
                          "url": url,
                          "date": row.get("date", ""),
+                         "ts": epoch_seconds(row.get("date"), 1000),
                          "source": "Stock Browser Provider"
                      })
         
@@ -256,18 +442,21 @@ def extract_browser_history():
         pass
 
     try:
-        # Method 2: Try accessing Chrome db directly (requires root/debuggable)
-        proc = subprocess.run(["adb", "shell", "run-as", "com.android.chrome", "ls", "/data/data/com.android.chrome/databases/"], 
-                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if proc.returncode == 0 and b"History" in proc.stdout:
-             return [{"note": "Chrome database found. Full extraction requires pulling the 'History' DB file via 'adb pull' which needs root access."}]
+        # Methods 2 and 3 are independent probes: run both in one round trip
+        (chrome_rc, chrome_out), (_, out) = get_shell().run_batch([
+            "run-as com.android.chrome ls /data/data/com.android.chrome/databases/",
+            "dumpsys activity activities",
+        ])
     except Exception:
-        pass
+        chrome_rc, chrome_out, out = 1, "", ""
+
+    # Method 2: Try accessing Chrome db directly (requires root/debuggable)
+    if chrome_rc == 0 and "History" in chrome_out:
+        return [{"note": "Chrome database found. Full extraction requires pulling the 'History' DB file via 'adb pull' which needs root access."}]
 
     try:
         # Method 3: Live/Recent Activity Inspection (dumpsys)
         # Slower but works on non-rooted devices to get OPEN tabs/intents
-        out = run_adb(["adb", "shell", "dumpsys", "activity", "activities"])
         # look for http/https links in Intent data
         import re
         # Regex to find URLs in the dumpsys output (often in Intent { data=... })
@@ -301,14 +490,16 @@ def extract_browser_history():
 
 
 
-def extract_photos_metadata(days):
-    """Extract photo metadata using MediaStore"""
+def extract_photos_metadata(days, sink=None, since_id=None, marks=None, targets=None):
+    """
+    Extract photo metadata using MediaStore.
+    Returns a RowSummary dict; (path, size_bytes) of each indexed file is appended to
+    `targets` for the media pull.
+    """
+    summary = RowSummary()
     try:
         # Query MediaStore for images
         # using datetaken (EXIF time in ms) and date_modified (file time in s)
-        out = run_adb(["adb", "shell", "content", "query", "--uri", "content://media/external/images/media", "--projection", "_display_name:_data:_size:datetaken:date_modified:mime_type"])
-        parsed = parse_content_query_output(out)
-        photos = []
         
         now_ts = int(datetime.utcnow().timestamp())
         threshold = now_ts - (int(days) * 24 * 3600)
@@ -317,11 +508,21 @@ def extract_photos_metadata(days):
         if int(days) == 0:
             threshold = 0
 
-        for row in parsed:
+        # Same rule as the Python-side filter below: datetaken (ms) if set, else date_modified (s)
+        where = None
+        if threshold:
+            where = (f"datetaken>={threshold * 1000} OR "
+                     f"((datetaken IS NULL OR datetaken=0) AND date_modified>={threshold})")
+        rows = iter_content_query("content://media/external/images/media",
+                                  projection=PHOTO_COLUMNS, where=where, sort="datetaken DESC",
+                                  since_id=since_id)
+
+        for row in rows:
+            track_marks(marks, row, date_key="datetaken")
             try:
                 # 1. Try DATE TAKEN (EXIF) - usually in Milliseconds
                 ts_ms = row.get("datetaken")
-                if ts_ms and str(ts_ms).isdigit():
+                if ts_ms and str(ts_ms).isdigit() and int(ts_ms) > 0:
                     ts = int(ts_ms) / 1000.0  # convert to seconds
                 else:
                     # 2. Fallback to DATE MODIFIED - usually in Seconds
@@ -330,75 +531,72 @@ def extract_photos_metadata(days):
                          ts = int(ts_mod)
                     else:
                         ts = 0
+                # 3. DATE ADDED (seconds) only dates the row in the case store; the date
+                # filter below stays the same as the provider-side WHERE clause
+                stored_ts = epoch_seconds(ts) or epoch_seconds(row.get("date_added"))
 
                 # Filter by date
                 if ts < threshold:
                     continue
 
-                date_str = datetime.fromtimestamp(ts).strftime("%d-%m-%Y %H:%M:%S") if ts > 0 else "Unknown"
+                # UTC, like the call and SMS dates
+                date_str = datetime.utcfromtimestamp(ts).strftime("%d-%m-%Y %H:%M:%S") if ts > 0 else "Unknown"
                 
                 # Convert size to MB
                 size_bytes = int(row.get("_size", 0))
                 size_str = f"{size_bytes / (1024*1024):.2f} MB"
                 
-                photos.append({
+                entry = {
                     "filename": row.get("_display_name", ""),
                     "path": row.get("_data", ""),
                     "size": size_str,
+                    "size_bytes": size_bytes,
                     "date": date_str,
+                    "ts": stored_ts,
                     "type": row.get("mime_type", "")
-                })
+                }
+                summary.add(entry)
+                if sink:
+                    sink(entry)
+                if targets is not None and entry["path"]:
+                    targets.append((entry["path"], size_bytes))
             except:
                 continue
-        return photos
     except Exception as e:
-        return [{"error": f"Failed to extract photo metadata: {str(e)}"}]
+        summary.add({"error": f"Failed to extract photo metadata: {str(e)}"})
+    return summary.as_dict()
 
 
 # -------------------------
 # Background job runner (with progress updates)
 # -------------------------
-def run_job(case_name, case_number, time_range, selections):
+def run_job(job_id, case_name, case_number, time_range, selections, transfer_mode="indexed", export_format="xlsx",
+            incremental=False):
+    """
+    Run one extraction job. With `incremental`, the device's last case (by serial) is reused:
+    only provider rows past the stored high-water marks and media not yet acquired are pulled,
+    and they are merged into that case.
+    """
+    exporter = None
+    store = None
     with progress_lock:
-        progress.update({"running": True, "percent": 0, "message": "Starting extraction...", "result": None, "error": None, "excel_file": None})
+        progress.update({"job_id": job_id, "running": True, "percent": 0, "stage": "starting", "message": "Starting extraction...",
+                         "result": None, "error": None, "excel_file": None, "pdf_file": None, "case_id": None,
+                         "bytes_done": None, "bytes_total": None})
+    progress_channel.start(job_id, stage="starting", message="Starting extraction...")
 
     try:
-        if not adb_check():
-            raise RuntimeError("ADB not found. Install Android Platform Tools and ensure 'adb' is in PATH.")
-        connected, msg = adb_devices()
-        if not connected:
-            raise RuntimeError(msg)
-
-        # Pre-parse counts to allow per-item progress
-        counts = {}
-        total_items = 0
-
-        # For each selection, get raw count quickly by running command and counting lines
-        if "calls" in selections:
-            raw = run_adb(["adb", "shell", "content", "query", "--uri", "content://call_log/calls/"])
-            parsed = parse_content_query_output(raw)
-            counts["calls"] = len(parsed)
-            total_items += counts["calls"]
-        if "sms" in selections:
-            raw = run_adb(["adb", "shell", "content", "query", "--uri", "content://sms/"])
-            parsed = parse_content_query_output(raw)
-            counts["sms"] = len(parsed)
-            total_items += counts["sms"]
-        if "contacts" in selections:
-            raw = run_adb(["adb", "shell", "content", "query", "--uri", "content://contacts/phones/"])
-            parsed = parse_content_query_output(raw)
-            counts["contacts"] = len(parsed)
-            total_items += counts["contacts"]
-        if "apps" in selections:
-            counts["apps"] = 1  # Apps extraction is counted as one step
-            total_items += counts["apps"]
-        if "browser" in selections:
-            counts["browser"] = 1  # Browser extraction is counted as one step
-            total_items += counts["browser"]
-        if "photos" in selections:
-            # Photos = 1 for indexing + 3 for folders (DCIM, Pictures, Download)
-            counts["photos"] = 4
-            total_items += counts["photos"]
+        # The device monitor already tracks adb and the attached devices; no extra adb processes per job
+        device_monitor.start()
+        status = device_monitor.get_status(wait=True)
+        if not status["device_connected"]:
+            raise RuntimeError(status["message"])
+
+        # Each selected category is one query against the device. Progress is
+        # weighted per stage; row-based stages report the live row count.
+        stage_weights = {"calls": 1, "sms": 1, "contacts": 1, "apps": 1, "browser": 1,
+                         "photos": 4}  # Photos = 1 for indexing + 3 for the media pull
+        total_items = sum(stage_weights[s] for s in selections if s in stage_weights)
 
         # if nothing to count, set total_items = number of categories to still show progress
         if total_items == 0:
@@ -407,162 +605,198 @@ def run_job(case_name, case_number, time_range, selections):
         processed = 0
         result = {}
 
-        # Extract and update progress per-row
+        # Incremental acquisition: resume from the high-water marks of this device's last case
+        serial = adb_serial()
+        store = case_store.connect()
+        state = case_store.get_device_state(store, serial) if (incremental and serial) else {}
+        base_case = case_store.get_case(store, max(v["case_id"] for v in state.values())) if state else None
+        if base_case:
+            case_id = base_case["id"]
+            case_name, case_number = base_case["case_name"], base_case["case_number"]
+            export_base = f"{case_name}_{case_number}_delta_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        else:
+            case_id = case_store.create_case(store, case_name, case_number, serial or None)
+            export_base = f"{case_name}_{case_number}"
+        set_progress(case_id=case_id)
+
+        marks = {provider: {} for provider in ("calls", "sms", "contacts", "photos")}
+
+        def since(provider):
+            return (state.get(provider) or {}).get("max_id") if base_case else None
+
+        def save_marks(provider):
+            # Rows must be committed before the marks that skip them next time
+            for writer in writers:
+                writer.flush()
+            if serial:
+                case_store.save_device_marks(store, serial, provider, case_id, marks[provider])
+
+        # Rows are exported and stored in the case database as they are extracted (constant memory)
+        exporter = CaseExporter("extracted_data", export_base, export_format)
+
+        def sinks(sheet, category):
+            writer = case_store.CategoryWriter(store, case_id, category)
+            writers.append(writer)
+            export_sink = exporter.sink(sheet)
+
+            def sink(row):
+                export_sink(row)
+                writer.add(row)
+            return sink
+
+        def store_rows(category, rows):
+            if base_case:
+                # Snapshot categories are replaced rather than merged
+                case_store.clear_category(store, case_id, category)
+            case_store.CategoryWriter(store, case_id, category).add_many(rows)
+
+        writers = []
+
+        def row_reporter(label):
+            def report(count):
+                # Throttle lock traffic on large providers
+                if count % 250 == 0:
+                    set_progress(message=f"Extracting {label}... ({count} rows parsed)")
+            return report
+
+        def finish_stage(weight=1):
+            nonlocal processed
+            processed += weight
+            set_progress(percent=int((processed / total_items) * 100))
+
         if "calls" in selections:
-            with progress_lock:
-                progress["message"] = "Extracting call logs..."
-            rows = extract_call_logs_structured(int(time_range))
-            processed += len(rows)
-            for i in range(len(rows)):
-                with progress_lock:
-                    progress["percent"] = int((processed / total_items) * 100)
-                time.sleep(0.001)
-            result["calls"] = rows
+            set_progress(stage="calls", message="Extracting call logs...")
+            result["calls"] = extract_call_logs_structured(int(time_range), on_row=row_reporter("call logs"),
+                                                           sink=sinks("Calls", "calls"),
+                                                           since_id=since("calls"), marks=marks["calls"])
+            save_marks("calls")
+            finish_stage()
 
         if "sms" in selections:
-            with progress_lock:
-                progress["message"] = "Extracting SMS..."
-            rows = extract_sms_structured(int(time_range))
-            processed += len(rows)
-            for i in range(len(rows)):
-                with progress_lock:
-                    progress["percent"] = int((processed / total_items) * 100)
-                time.sleep(0.001)
-            result["sms"] = rows
+            set_progress(stage="sms", message="Extracting SMS...")
+            result["sms"] = extract_sms_structured(int(time_range), on_row=row_reporter("SMS"),
+                                                   sink=sinks("SMS", "sms"),
+                                                   since_id=since("sms"), marks=marks["sms"])
+            save_marks("sms")
+            finish_stage()
 
         if "contacts" in selections:
-            with progress_lock:
-                progress["message"] = "Extracting contacts..."
-            rows = []
-            raw = run_adb(["adb", "shell", "content", "query", "--uri", "content://contacts/phones/"])
-            parsed = parse_content_query_output(raw)
-            for r in parsed:
-                rows.append({
-                    "name": r.get("display_name", r.get("name", "")),
-                    "number": r.get("number", r.get("data1", "")),
-                    "type": r.get("data2", ""),
-                    "label": r.get("data3", "")
-                })
-                processed += 1
-                with progress_lock:
-                    progress["percent"] = int((processed / total_items) * 100)
-                time.sleep(0.005)
-            result["contacts"] = rows
+            set_progress(stage="contacts", message="Extracting contacts...")
+            result["contacts"] = extract_contacts_structured(on_row=row_reporter("contacts"),
+                                                             sink=sinks("Contacts", "contacts"),
+                                                             since_id=since("contacts"), marks=marks["contacts"])
+            save_marks("contacts")
+            finish_stage()
 
         if "apps" in selections:
-            with progress_lock:
-                progress["message"] = "Extracting installed applications..."
-            result["apps"] = extract_apps_structured()
-            processed += 1
-            with progress_lock:
-                progress["percent"] = int((processed / total_items) * 100)
+            set_progress(stage="apps", message="Extracting installed applications...")
+            apps = extract_apps_structured()
+            exporter.write_rows("Apps", apps)
+            store_rows("apps", apps)
+            result["apps"] = summarize_rows(apps)
+            finish_stage()
 
         if "browser" in selections:
-            with progress_lock:
-                progress["message"] = "Extracting browser history..."
-            result["browser"] = extract_browser_history()
-            processed += 1
-            with progress_lock:
-                progress["percent"] = int((processed / total_items) * 100)
+            set_progress(stage="browser", message="Extracting browser history...")
+            browser = extract_browser_history()
+            exporter.write_rows("Browser", browser)
+            store_rows("browser", browser)
+            result["browser"] = summarize_rows(browser)
+            finish_stage()
 
         # photos: do at the end (coarse-grained)
         if "photos" in selections:
-            with progress_lock:
-                progress["message"] = "Indexing photo metadata..."
+            set_progress(stage="photos", message="Indexing photo metadata...")
             
             # 1. Get Metadata List (Professional Index)
-            photo_metadata = extract_photos_metadata(int(time_range))
-            result["photos_list"] = photo_metadata
-            
-            processed += 1
-            with progress_lock:
-                progress["percent"] = int((processed / total_items) * 100)
+            # Only (path, size) of each file is kept for the pull; the index rows are in the case store
+            pull_targets = []
+            result["photos_list"] = extract_photos_metadata(int(time_range), sink=sinks("Photos Index", "photos"),
+                                                            since_id=since("photos"), marks=marks["photos"],
+                                                            targets=pull_targets)
+            finish_stage()
             
-            # 2. Physical Pull (Granular Updates)
+            # 2. Physical Pull of the indexed files (parallel, resumable, hashed)
             case_dir = os.path.join("extracted_data", f"{case_name}_{case_number}")
             os.makedirs(case_dir, exist_ok=True)
-            
-            pull_log = []
-            # Expanded targets
-            targets = ["/sdcard/DCIM", "/sdcard/Pictures", "/sdcard/Download"]
-            
-            for tgt in targets:
-                folder_name = os.path.basename(tgt)
-                with progress_lock:
-                    progress["message"] = f"Pulling {folder_name} (Large transfer, please wait)..."
-                
-                local_dest = os.path.join(case_dir, folder_name)
-                try:
-                    # check if source exists first to avoid noisy error
-                    check = subprocess.run(["adb", "shell", "ls", "-d", tgt], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    if check.returncode != 0:
-                        pull_log.append({"source": tgt, "status": "Skipped (Not found)"})
-                    else:
-                        proc = subprocess.run(["adb", "pull", tgt, local_dest], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                        if proc.returncode == 0:
-                            pull_log.append({"source": tgt, "destination": local_dest, "status": "Success"})
-                        else:
-                            output = proc.stdout.decode("utf-8") + proc.stderr.decode("utf-8")
-                            pull_log.append({"source": tgt, "status": "Partial/Fail", "details": output[:200]})
-                except Exception as e:
-                    pull_log.append({"source": tgt, "status": "Error", "details": str(e)})
-                
-                # Update progress after EACH folder
-                processed += 1
-                with progress_lock:
-                    progress["percent"] = int((processed / total_items) * 100)
-            
-            result["photos_pull_log"] = pull_log
+            pull_base = processed
+
+            def media_progress(files_done, files_total, bytes_done, bytes_total):
+                frac = (bytes_done / bytes_total) if bytes_total else (files_done / max(1, files_total))
+                set_progress(percent=int(((pull_base + 3 * frac) / total_items) * 100),
+                             bytes_done=bytes_done, bytes_total=bytes_total,
+                             message=(f"Pulling media: {files_done}/{files_total} files, "
+                                      f"{bytes_done / (1024*1024):.1f}/{bytes_total / (1024*1024):.1f} MB"))
+
+            summary = None
+            if transfer_mode in ("bulk", "bulk_gz"):
+                # Bulk mode: whole folders as one tar stream (no per-file round trips)
+                def bulk_progress(files_done, bytes_read):
+                    set_progress(bytes_done=bytes_read,
+                                 message=(f"Streaming media archive: {files_done} files, "
+                                          f"{bytes_read / (1024*1024):.1f} MB received"))
+
+                set_progress(stage="media", message="Streaming media archive...")
+                pull_log, summary = stream_tar(case_dir, compress=(transfer_mode == "bulk_gz"), on_progress=bulk_progress)
+                result["photos_bulk_summary"] = summarize_rows([summary])
+            else:
+                set_progress(stage="media", message="Pulling media files...")
+                puller = MediaPuller(case_dir, on_progress=media_progress)
+                pull_log = puller.pull(pull_targets)
+            pull_targets = None
+            finish_stage(3)
+            # Only advance past photos once every indexed file is safely on disk (and a bulk
+            # stream arrived complete); otherwise the next incremental run re-indexes them and
+            # the manifest skips the ones already verified
+            stream_ok = summary is None or summary["complete"]
+            if stream_ok and not any(entry.get("status") in ("Partial/Fail", "Error") for entry in pull_log):
+                save_marks("photos")
+
+            # Keep the failures up front in the preview; the full log is in the export
+            pull_log.sort(key=lambda entry: entry.get("status") == "Success")
+            result["photos_pull_log"] = summarize_rows(pull_log)
+            exporter.write_rows("Photos Log", pull_log)
+            if summary:
+                exporter.write_rows("Photos Bulk", [summary])
+            pull_log = None
 
         # finalize and save excel
-        with progress_lock:
-            progress["message"] = "Saving reports (Excel + PDF)..."
+        set_progress(stage="reports", message="Saving reports (Excel + PDF)...")
 
-        # Excel
-        excel_filename = f"{case_name}_{case_number}.xlsx"
-        excel_path = os.path.join("extracted_data", excel_filename)
-        
+        for writer in writers:
+            writer.flush()
+        store.close()
+        store = None
+
+        # Excel / CSV / JSONL (rows were streamed during extraction)
+        excel_filename = None
         try:
-            with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-                if result.get("calls"):
-                    pd.DataFrame(result["calls"]).to_excel(writer, sheet_name="Calls", index=False)
-                if result.get("sms"):
-                    pd.DataFrame(result["sms"]).to_excel(writer, sheet_name="SMS", index=False)
-                if result.get("contacts"):
-                    pd.DataFrame(result["contacts"]).to_excel(writer, sheet_name="Contacts", index=False)
-                if result.get("apps"):
-                    pd.DataFrame(result["apps"]).to_excel(writer, sheet_name="Apps", index=False)
-                if result.get("browser"):
-                    pd.DataFrame(result["browser"]).to_excel(writer, sheet_name="Browser", index=False)
-                if result.get("photos_list"):
-                    pd.DataFrame(result["photos_list"]).to_excel(writer, sheet_name="Photos Index", index=False)
-                if result.get("photos_pull_log"):
-                    pd.DataFrame(result["photos_pull_log"]).to_excel(writer, sheet_name="Photos Log", index=False)
+            excel_filename = exporter.close()
         except Exception as e:
-            print(f"Error saving Excel: {e}")
+            print(f"Error saving export: {e}")
+        exporter = None
 
         # PDF Report
-        pdf_filename = f"{case_name}_{case_number}_Report.pdf"
+        pdf_filename = f"{export_base}_Report.pdf"
         pdf_path = os.path.join("extracted_data", pdf_filename)
         try:
             generate_pdf_case_report(result, case_name, case_number, pdf_path)
-            progress["pdf_file"] = pdf_filename
         except Exception as e:
             print(f"Error saving PDF: {e}")
+            pdf_filename = None
 
-        with progress_lock:
-            progress["running"] = False
-            progress["percent"] = 100
-            progress["message"] = "Extraction Complete."
-            progress["result"] = result
-            progress["excel_file"] = excel_filename
-            progress["pdf_file"] = pdf_filename
+        set_progress(running=False, percent=100, stage="done", message="Extraction Complete.",
+                     result=result, excel_file=excel_filename, pdf_file=pdf_filename)
     
     except Exception as e:
-        with progress_lock:
-            progress["running"] = False
-            progress["error"] = str(e)
-            progress["result"] = None
+        if exporter:
+            try:
+                exporter.close()
+            except Exception:
+                pass
+        if store:
+            store.close()
+        set_progress(running=False, stage="error", error=str(e), result=None)
 
 
 def generate_pdf_case_report(result_data, case_name, case_number, filename):
@@ -590,9 +824,9 @@ def generate_pdf_case_report(result_data, case_name, case_number, filename):
     
     summary_data = [["Category", "Items Extracted"]]
     for key in ["calls", "sms", "contacts", "apps", "browser", "photos_list"]:
-        items = result_data.get(key, [])
+        count = (result_data.get(key) or {}).get("count", 0)
         label = "Photos" if key == "photos_list" else key.capitalize()
-        summary_data.append([label, str(len(items))])
+        summary_data.append([label, str(count)])
         
     t_summary = Table(summary_data, colWidths=[200, 100])
     t_summary.setStyle(TableStyle([
@@ -609,11 +843,11 @@ def generate_pdf_case_report(result_data, case_name, case_number, filename):
     
     # Detailed Sections (Preview)
     for key, label in [("calls", "Call Logs"), ("sms", "SMS Messages"), ("contacts", "Contacts")]:
-        items = result_data.get(key, [])
+        items = (result_data.get(key) or {}).get("preview", [])
         if not items:
             continue
             
-        story.append(Paragraph(f"<b>{label} (First 50 items)</b>", styles['Heading2']))
+        story.append(Paragraph(f"<b>{label} (First {len(items)} items)</b>", styles['Heading2']))
         story.append(Spacer(1, 12))
         
         # Create table data
@@ -642,6 +876,7 @@ def generate_pdf_case_report(result_data, case_name, case_number, filename):
 # -------------------------
 @mobile_bp.route("/")
 def index_route():
+    device_monitor.start()
     return render_template("mobile_index.html")
 
 @mobile_bp.route("/start", methods=["POST"])
@@ -655,21 +890,31 @@ def start_route():
     case_number = form.get("case_number", "001")
     time_range = form.get("time_range", "10")
     selections = request.form.getlist("data_types")
-
-    # start background thread
-    t = threading.Thread(target=run_job, args=(case_name, case_number, time_range, selections), daemon=True)
+    transfer_mode = form.get("transfer_mode", "indexed")
+    export_format = form.get("export_format", "xlsx")
+    incremental = form.get("incremental") == "1"
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"status": "error", "message": f"Unsupported export format: {export_format}"}), 400
+
+    # start background thread; progress is pushed on the Socket.IO 'job_progress' channel for job_id
+    job_id = uuid.uuid4().hex
+    t = threading.Thread(target=run_job, args=(job_id, case_name, case_number, time_range, selections, transfer_mode, export_format, incremental), daemon=True)
     t.start()
-    return jsonify({"status": "started", "message": "Job started"})
+    return jsonify({"status": "started", "message": "Job started", "job_id": job_id})
 
 @mobile_bp.route("/progress")
 def progress_route():
+    """Polling fallback for clients without Socket.IO; the UI subscribes to 'job_progress' instead."""
     with progress_lock:
         return jsonify({
+            "job_id": progress.get("job_id"),
             "running": progress["running"],
             "percent": progress["percent"],
+            "stage": progress.get("stage"),
             "message": progress["message"],
             "error": progress.get("error"),
-            "excel_file": progress.get("excel_file")
+            "excel_file": progress.get("excel_file"),
+            "pdf_file": progress.get("pdf_file")
         })
 
 @mobile_bp.route("/result")
@@ -677,9 +922,46 @@ def result_route():
     with progress_lock:
         return jsonify({
             "result": progress.get("result"),
-            "error": progress.get("error")
+            "error": progress.get("error"),
+            "case_id": progress.get("case_id")
         })
 
+@mobile_bp.route("/cases")
+def cases_route():
+    """Paginated list of stored cases with per-category counts."""
+    conn = case_store.connect()
+    try:
+        return jsonify(case_store.list_cases(conn, request.args.get("page"), request.args.get("per_page")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        conn.close()
+
+@mobile_bp.route("/cases/<int:case_id>/<category>")
+@mobile_bp.route("/search/<category>")
+def case_query_route(category, case_id=None):
+    """
+    Paginated, filterable artifact query within one case, or across all cases via /search/<category>.
+    Query args: q (full-text for sms), date_from/date_to (YYYY-MM-DD), page, per_page,
+    and any column name of the category as an exact-match filter.
+    """
+    args = request.args
+    reserved = {"q", "date_from", "date_to", "page", "per_page"}
+    filters = {k: v for k, v in args.items() if k not in reserved}
+    conn = case_store.connect()
+    try:
+        return jsonify(case_store.query_category(
+            conn, category, case_id=case_id, q=args.get("q"),
+            date_from=args.get("date_from"), date_to=args.get("date_to"),
+            filters=filters, page=args.get("page"), per_page=args.get("per_page")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except sqlite3.OperationalError as e:
+        # e.g. malformed FTS query syntax
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    finally:
+        conn.close()
+
 @mobile_bp.route("/download/<path:filename>")
 def download_file(filename):
     # Security check: ensure no path traversal
@@ -690,21 +972,12 @@ def download_file(filename):
 
 @mobile_bp.route("/device-status")
 def device_status_route():
-    """Return current device connection status"""
-    adb_available = adb_check()
-    device_connected = False
-    authorized = False
-    
-    if adb_available:
-        connected, msg = adb_devices()
-        device_connected = connected
-        authorized = "unauthorized" not in msg.lower()
-    
-    return jsonify({
-        "adb_available": adb_available,
-        "device_connected": device_connected,
-        "authorized": authorized,
-        "message": msg if not adb_available else ("Device connected and authorized" if authorized else "Device not properly connected")
-    })
+    """
+    Return the cached device connection status.
+    One background monitor follows `adb track-devices` and pushes changes to clients over
+    Socket.IO ('mobile_device_status'); this route only serves the initial state.
+    """
+    device_monitor.start()
+    return jsonify(device_monitor.get_status())
 
 # Blueprint does not have main block
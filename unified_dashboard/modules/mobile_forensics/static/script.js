@@ -1,6 +1,7 @@
 // Global state
 let currentJob = null;
 let statusCheckInterval = null;
+let socket = null; // Socket.IO connection (device status + job progress), null if unavailable
 
 // Utility functions
 function showAlert(message, type = 'error') {
@@ -18,24 +19,26 @@ function showAlert(message, type = 'error') {
   }, 5000);
 }
 
+function renderDeviceStatus(data) {
+  const adbStatus = document.getElementById('adbStatus');
+  const deviceStatus = document.getElementById('deviceStatus');
+  const authStatus = document.getElementById('authStatus');
+
+  // Update Text
+  adbStatus.textContent = data.adb_available ? 'ONLINE' : 'OFFLINE';
+  deviceStatus.textContent = data.device_connected ? 'CONNECTED' : 'DISCONNECTED';
+  authStatus.textContent = data.authorized ? 'AUTHORIZED' : 'UNAUTHORIZED';
+
+  // Update Classes (Green/Red badges)
+  adbStatus.className = `status-badge ${data.adb_available ? 'connected' : 'disconnected'}`;
+  deviceStatus.className = `status-badge ${data.device_connected ? 'connected' : 'disconnected'}`;
+  authStatus.className = `status-badge ${data.authorized ? 'connected' : 'disconnected'}`;
+}
+
 function updateDeviceStatus() {
   fetch('/tools/mobile/device-status')
     .then(response => response.json())
-    .then(data => {
-      const adbStatus = document.getElementById('adbStatus');
-      const deviceStatus = document.getElementById('deviceStatus');
-      const authStatus = document.getElementById('authStatus');
-
-      // Update Text
-      adbStatus.textContent = data.adb_available ? 'ONLINE' : 'OFFLINE';
-      deviceStatus.textContent = data.device_connected ? 'CONNECTED' : 'DISCONNECTED';
-      authStatus.textContent = data.authorized ? 'AUTHORIZED' : 'UNAUTHORIZED';
-
-      // Update Classes (Green/Red badges)
-      adbStatus.className = `status-badge ${data.adb_available ? 'connected' : 'disconnected'}`;
-      deviceStatus.className = `status-badge ${data.device_connected ? 'connected' : 'disconnected'}`;
-      authStatus.className = `status-badge ${data.authorized ? 'connected' : 'disconnected'}`;
-    })
+    .then(renderDeviceStatus)
     .catch(error => {
       console.error('Error checking device status:', error);
       // Don't show alert constantly for background checks
@@ -67,6 +70,16 @@ function updateProgressBar(percent, message) {
   }
 }
 
+// Job results hold per-category summaries ({count, preview}); full rows live in the case store
+function countOf(summary) {
+  return summary ? summary.count : 0;
+}
+
+// Result keys -> case store categories
+const CASE_CATEGORIES = {
+  calls: 'calls', sms: 'sms', contacts: 'contacts', apps: 'apps', browser: 'browser', photos_list: 'photos'
+};
+
 function updateStatistics(result) {
   const statsGrid = document.getElementById('statsGrid');
   const callsCount = document.getElementById('callsCount');
@@ -79,12 +92,12 @@ function updateStatistics(result) {
   if (result && Object.keys(result).length > 0) {
     statsGrid.style.display = 'grid';
 
-    callsCount.textContent = result.calls ? result.calls.length : 0;
-    smsCount.textContent = result.sms ? result.sms.length : 0;
-    contactsCount.textContent = result.contacts ? result.contacts.length : 0;
-    photosCount.textContent = result.photos_list ? result.photos_list.length : 0;
-    appsCount.textContent = result.apps ? result.apps.length : 0;
-    browserCount.textContent = result.browser ? result.browser.length : 0;
+    callsCount.textContent = countOf(result.calls);
+    smsCount.textContent = countOf(result.sms);
+    contactsCount.textContent = countOf(result.contacts);
+    photosCount.textContent = countOf(result.photos_list);
+    appsCount.textContent = countOf(result.apps);
+    browserCount.textContent = countOf(result.browser);
   } else {
     statsGrid.style.display = 'none';
   }
@@ -136,12 +149,7 @@ function renderDashboard(result) {
   section.style.display = 'block';
 
   // 1. Calls Analysis (Pie/Doughnut)
-  const calls = result.calls || [];
-  const callTypes = {};
-  calls.forEach(c => {
-    let t = c.type || 'Unknown';
-    callTypes[t] = (callTypes[t] || 0) + 1;
-  });
+  const callTypes = (result.calls && result.calls.by_type) || {};
 
   const ctxCalls = document.getElementById('callsChart').getContext('2d');
   if (callsChartInstance) callsChartInstance.destroy();
@@ -173,11 +181,11 @@ function renderDashboard(result) {
   const labels = [];
   const counts = [];
 
-  if (result.sms) { labels.push('SMS'); counts.push(result.sms.length); }
-  if (result.contacts) { labels.push('Contacts'); counts.push(result.contacts.length); }
-  if (result.photos_list) { labels.push('Photos'); counts.push(result.photos_list.length); }
-  if (result.apps) { labels.push('Apps'); counts.push(result.apps.length); }
-  if (result.browser) { labels.push('Browser'); counts.push(result.browser.length); }
+  if (result.sms) { labels.push('SMS'); counts.push(countOf(result.sms)); }
+  if (result.contacts) { labels.push('Contacts'); counts.push(countOf(result.contacts)); }
+  if (result.photos_list) { labels.push('Photos'); counts.push(countOf(result.photos_list)); }
+  if (result.apps) { labels.push('Apps'); counts.push(countOf(result.apps)); }
+  if (result.browser) { labels.push('Browser'); counts.push(countOf(result.browser)); }
 
   const ctxData = document.getElementById('dataChart').getContext('2d');
   if (dataChartInstance) dataChartInstance.destroy();
@@ -203,7 +211,7 @@ function renderDashboard(result) {
   });
 }
 
-function renderResults(data) {
+function renderResults(data, caseId) {
   const container = document.getElementById('tablesContainer');
   const emptyState = document.getElementById('emptyState');
   container.innerHTML = '';
@@ -215,14 +223,24 @@ function renderResults(data) {
 
   emptyState.style.display = 'none';
 
-  for (const [key, items] of Object.entries(data)) {
+  for (const [key, summary] of Object.entries(data)) {
     // Skip internal keys or empty
+    const items = summary ? summary.preview : null;
     if (!items || items.length === 0 || key === 'photos_pull_log') continue;
 
     // Create Section Divider
     const section = document.createElement('div');
     section.className = 'section-divider';
-    section.innerHTML = `<i class="fas fa-folder"></i> ${key.toUpperCase()} <span style="font-size:0.8em; opacity:0.6; margin-left:5px;">(${items.length})</span>`;
+    section.innerHTML = `<i class="fas fa-folder"></i> ${key.toUpperCase()} <span style="font-size:0.8em; opacity:0.6; margin-left:5px;">(${summary.count})</span>`;
+    if (summary.count > items.length && caseId && CASE_CATEGORIES[key]) {
+      // Only a preview is sent with the result; the full rows are queried from the case store
+      const more = document.createElement('a');
+      more.href = `/tools/mobile/cases/${caseId}/${CASE_CATEGORIES[key]}`;
+      more.target = '_blank';
+      more.style.cssText = 'font-size:0.8em; margin-left:10px;';
+      more.textContent = `showing first ${items.length}, all rows`;
+      section.appendChild(more);
+    }
 
     // Create Table Wrapper
     const wrapper = document.createElement('div');
@@ -247,7 +265,7 @@ function renderResults(data) {
 
     // Body
     const tbody = document.createElement('tbody');
-    items.slice(0, 100).forEach(item => { // Limit render to 100 for performance in DOM
+    items.forEach(item => {
       const tr = document.createElement('tr');
       headers.forEach(h => {
         const td = document.createElement('td');
@@ -324,14 +342,56 @@ async function pollProgress(onUpdate) {
   }
 }
 
+// Resolve with the final progress state of a job, using pushed updates when Socket.IO is available
+function watchProgress(jobId, onUpdate) {
+  if (!socket || !jobId) return pollProgress(onUpdate);
+
+  return new Promise((resolve, reject) => {
+    const subscribe = () => socket.emit('progress_subscribe', { job_id: jobId });
+    const cleanup = () => {
+      socket.off('job_progress', handler);
+      socket.off('connect', subscribe);
+      socket.emit('progress_unsubscribe', { job_id: jobId });
+    };
+    const handler = (j) => {
+      if (j.job_id !== jobId) return;
+      onUpdate(j);
+      if (j.error) {
+        cleanup();
+        reject(new Error(j.error));
+      } else if (!j.running) {
+        cleanup();
+        resolve(j);
+      }
+    };
+
+    socket.on('job_progress', handler);
+    socket.on('connect', subscribe); // re-join the room after reconnects
+    if (socket.connected) subscribe();
+  });
+}
+
+function formatEta(seconds) {
+  if (seconds === null || seconds === undefined) return '';
+  const m = Math.floor(seconds / 60);
+  const s = seconds % 60;
+  return m > 0 ? ` (ETA ${m}m ${s}s)` : ` (ETA ${s}s)`;
+}
+
 // Event handlers
 document.addEventListener('DOMContentLoaded', function () {
   // Initial device status check
   updateDeviceStatus();
   setupSearch();
 
-  // Set up periodic status checks
-  statusCheckInterval = setInterval(updateDeviceStatus, 5000); // Check every 5 seconds for snappier feeling
+  // Device status is pushed by the server when it changes; fall back to polling without Socket.IO
+  if (typeof io !== 'undefined') {
+    socket = io();
+    socket.on('mobile_device_status', renderDeviceStatus);
+    socket.on('connect', updateDeviceStatus); // resync after reconnects
+  } else {
+    statusCheckInterval = setInterval(updateDeviceStatus, 5000);
+  }
 
   // Form submission
   document.getElementById("form").addEventListener("submit", async function (e) {
@@ -356,16 +416,16 @@ document.addEventListener('DOMContentLoaded', function () {
 
     try {
       const res = await postStart(e.target);
+      const started = await res.json().catch(() => ({ message: "Unknown error" }));
       if (!res.ok) {
-        const j = await res.json().catch(() => ({ message: "Unknown error" }));
-        throw new Error(j.message || `HTTP ${res.status}`);
+        throw new Error(started.message || `HTTP ${res.status}`);
       }
 
       updateProgressBar(0, "Establishing connection...");
 
-      // Poll for progress
-      const finalResult = await pollProgress((j) => {
-        updateProgressBar(j.percent, j.message);
+      // Progress is pushed by the server (falls back to polling without Socket.IO)
+      const finalResult = await watchProgress(started.job_id, (j) => {
+        updateProgressBar(j.percent, (j.message || '') + (j.running ? formatEta(j.eta_seconds) : ''));
       });
 
       // Fetch final result
@@ -383,7 +443,7 @@ document.addEventListener('DOMContentLoaded', function () {
       // Render Dashboard & Tables
       updateStatistics(jr.result);
       renderDashboard(jr.result);
-      renderResults(jr.result);
+      renderResults(jr.result, jr.case_id);
 
       // Show export button
       exportBtn.style.display = 'inline-flex';
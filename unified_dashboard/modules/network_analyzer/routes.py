@@ -1,6 +1,6 @@
 # routes.py
 import json
-from flask import Blueprint, request, jsonify, send_from_directory, send_file
+from flask import Blueprint, request, jsonify, send_file, render_template, redirect, url_for
 from werkzeug.utils import secure_filename
 from collections import Counter, defaultdict
 from scapy.all import rdpcap, sniff, wrpcap, IP, TCP, UDP, ICMP, ARP, DNS, DNSQR, Raw, get_if_list
@@ -24,7 +24,8 @@ logging.basicConfig(level=logging.INFO)
 # Define Blueprint
 # static_folder='frontend' means it will serve files from ./frontend at /tools/wireshark/static/
 # But the original app served from root. We need to serve index.html via route.
-network_bp = Blueprint('network', __name__, url_prefix='/tools/wireshark', static_folder='frontend')
+network_bp = Blueprint('network', __name__, url_prefix='/tools/wireshark', static_folder='frontend',
+                       template_folder='frontend')
 
 # ... (Insert Helpers Here: geo_cache, is_public_ip, get_geoip, scan_for_secrets, load_config, hexdump, get_packet_info, analyze_packets) ...
 # To avoid huge diff, I will assume Helpers are present and just change the app definition and routes. 
@@ -319,13 +320,13 @@ def analyze_packets(packets):
 # --------- Routes ---------
 @network_bp.route("/")
 def index():
-    # Serve index.html from the Blueprints' static folder
-    return send_from_directory(network_bp.static_folder, "wireshark_index.html")
+    # Rendered, so asset URLs carry their content fingerprint
+    return render_template("wireshark_index.html")
 
 @network_bp.route("/<path:path>")
 def static_proxy(path):
-    # Serve other static files (js, css)
-    return send_from_directory(network_bp.static_folder, path)
+    # Old asset URLs; the static route adds the content fingerprint
+    return redirect(url_for('network.static', filename=path))
 
 @network_bp.route("/api/interfaces", methods=["GET"])
 def get_interfaces():
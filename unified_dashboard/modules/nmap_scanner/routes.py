@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, send_from_directory, send_file
+from flask import Blueprint, request, jsonify, send_file
 import os
 import sys
 
@@ -14,7 +14,7 @@ from .analysis import calculate_risk_score, explain_service, get_geoip_data, che
 from .sentry import sentry_instance
 from .reporting import generate_pdf
 
-from flask import render_template
+from flask import render_template, redirect, url_for
 
 # Define Blueprint
 nmap_bp = Blueprint('nmap', __name__, 
@@ -31,7 +31,8 @@ def index():
 
 @nmap_bp.route("/<path:path>")
 def static_files(path):
-    return send_from_directory(nmap_bp.static_folder, path)
+    # Old asset URLs; the static route adds the content fingerprint
+    return redirect(url_for('nmap.static', filename=path))
 
 def run_async_scan(target, scan_type, extra):
     """
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import hashlib
+import subprocess
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    from . import jobs, results
+except ImportError:  # running as a script (main.py)
+    import jobs
+    import results
+
+# ================= STREAMING ACQUISITION =================
+# `dd` on the device is piped through `adb exec-out` straight into the host
+# file, so the device needs no free space and the data is copied once. The
+# raw stream is cut into fixed-size chunks; each chunk is hashed, optionally
+# compressed as its own zstd/lz4 frame (frames concatenate into a valid
+# stream) and appended to `<dump>.part`. A `<dump>.acq.json` state file is
+# checkpointed after every chunk, so an interrupted transfer resumes at the
+# next chunk index with `dd skip=`.
+
+CHUNK_SIZE = 16 * 1024 * 1024
+READ_SIZE = 1024 * 1024
+DD_BLOCK = 1024 * 1024  # dd bs; CHUNK_SIZE must be a multiple of it
+COMPRESSORS = ("none", "zstd", "lz4")
+SUFFIXES = {"none": "", "zstd": ".zst", "lz4": ".lz4"}
+
+
+def available_compressors():
+    return [c for c in COMPRESSORS if c == "none" or (c == "zstd" and zstandard) or (c == "lz4" and lz4_frame)]
+
+
+def _compressor(codec):
+    if codec == "zstd":
+        if not zstandard:
+            raise RuntimeError("zstd compression needs the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=3, threads=-1).compress
+    if codec == "lz4":
+        if not lz4_frame:
+            raise RuntimeError("lz4 compression needs the 'lz4' package")
+        return lz4_frame.compress
+    return None
+
+
+def _decompress_stream(codec, f):
+    """Iterate raw bytes of a (possibly compressed) local file."""
+    if codec == "zstd":
+        reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+    elif codec == "lz4":
+        reader = lz4_frame.LZ4FrameFile(f, "rb")
+    else:
+        reader = f
+    return iter(lambda: reader.read(READ_SIZE), b"")
+
+
+def state_path(dump_path):
+    return dump_path + ".acq.json"
+
+
+def load_state(dump_path):
+    try:
+        with open(state_path(dump_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(dump_path, state):
+    tmp = state_path(dump_path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, state_path(dump_path))
+
+
+def _resume_hash(part_path, state):
+    """Rebuild the running SHA-256 over the chunks already on disk."""
+    h = hashlib.sha256()
+    with open(part_path, "rb") as f:
+        for block in _decompress_stream(state["codec"], _Limited(f, state["file_offset"])):
+            h.update(block)
+    return h
+
+
+class _Limited:
+    """Read-only view of the first `limit` bytes of a file (ignores a torn trailing chunk)."""
+
+    def __init__(self, f, limit):
+        self.f = f
+        self.remaining = limit
+
+    def read(self, n=-1):
+        if self.remaining <= 0:
+            return b""
+        n = self.remaining if n is None or n < 0 else min(n, self.remaining)
+        data = self.f.read(n)
+        self.remaining -= len(data)
+        return data
+
+    def readable(self):
+        return True
+
+
+def stream_dd(adb_path, dump_path, codec="none", source="/dev/mem", resume=False):
+    """
+    Acquire `source` from the device into `dump_path` (suffix added for compression).
+    Generator yielding progress lines; the final file is only renamed into place
+    once the stream ends cleanly.
+    """
+    part_path = dump_path + ".part"
+    state = load_state(dump_path) if resume else None
+    if state and (state.get("chunk_size") != CHUNK_SIZE or not os.path.exists(part_path)):
+        yield "[!] Existing partial acquisition can't be resumed; starting over.\n"
+        state = None
+    if state:
+        codec = state["codec"]  # a resumed file keeps its original compression
+
+    if codec not in COMPRESSORS:
+        yield f"[-] Error: Unknown compression '{codec}'. Use one of: {', '.join(COMPRESSORS)}\n"
+        return
+    try:
+        compress = _compressor(codec)
+    except RuntimeError as e:
+        yield f"[-] Error: {e}\n"
+        return
+
+    if state:
+        yield f"[*] Resuming at chunk {state['chunks_done']} ({state['chunks_done'] * CHUNK_SIZE} bytes)...\n"
+        h = _resume_hash(part_path, state)
+        with open(part_path, "r+b") as f:
+            f.truncate(state["file_offset"])  # drop a chunk that was only partly written
+    else:
+        state = {"source": source, "codec": codec, "chunk_size": CHUNK_SIZE, "chunks_done": 0,
+                 "file_offset": 0, "raw_bytes": 0, "chunk_sha256": [], "started_at": time.time()}
+        h = hashlib.sha256()
+        open(part_path, "wb").close()
+        _save_state(dump_path, state)
+
+    skip_blocks = state["chunks_done"] * (CHUNK_SIZE // DD_BLOCK)
+    # stderr silenced on the device: exec-out would mix dd's summary into the data
+    remote = f"su -c 'dd if={source} bs={DD_BLOCK} skip={skip_blocks} 2>/dev/null'"
+    yield f"[*] Streaming {source} via adb exec-out ({'no compression' if codec == 'none' else codec})...\n"
+
+    started = time.time()
+    received = 0
+    buffer = bytearray()
+
+    def flush_chunk(out, data):
+        h.update(data)
+        state["chunk_sha256"].append(hashlib.sha256(data).hexdigest())
+        out.write(compress(bytes(data)) if compress else data)
+        out.flush()
+        os.fsync(out.fileno())
+        state["chunks_done"] += 1
+        state["raw_bytes"] += len(data)
+        state["file_offset"] = out.tell()
+        _save_state(dump_path, state)
+
+    with open(part_path, "ab") as out, \
+            jobs.managed_process([adb_path, "exec-out", remote], stdout=subprocess.PIPE,
+                                 stderr=subprocess.DEVNULL) as proc:
+        while True:
+            block = proc.stdout.read(READ_SIZE)
+            if not block:
+                break
+            buffer += block
+            received += len(block)
+            if len(buffer) >= CHUNK_SIZE:
+                flush_chunk(out, buffer[:CHUNK_SIZE])
+                del buffer[:CHUNK_SIZE]
+                rate = received / max(time.time() - started, 0.001) / (1024 * 1024)
+                yield f"[*] Chunk {state['chunks_done']}: {state['raw_bytes']} bytes acquired ({rate:.1f} MiB/s)\n"
+        proc.wait()
+        # adb exits non-zero when the device drops off; the tail of the buffer is then untrustworthy
+        if jobs.cancelled() or proc.returncode != 0:
+            yield f"\n[!] Acquisition interrupted at chunk {state['chunks_done']}; it can be resumed.\n"
+            return
+        if buffer:
+            # The final, short chunk
+            flush_chunk(out, buffer)
+
+    total = state["raw_bytes"]
+    if total == 0:
+        yield "[-] Error: No data received. Is the device rooted and is /dev/mem readable?\n"
+        return
+
+    final_path = dump_path + SUFFIXES[codec]
+    os.replace(part_path, final_path)
+    state.update(completed_at=time.time(), sha256=h.hexdigest(), stored_bytes=os.path.getsize(final_path))
+    _save_state(dump_path, state)
+    if final_path != dump_path:
+        os.replace(state_path(dump_path), state_path(final_path))
+    else:
+        # Analyses of this dump can skip hashing it again
+        results.remember_sha256(final_path, state["sha256"])
+
+    elapsed = max(time.time() - started, 0.001)
+    yield f"[+] Acquired {total} bytes in {elapsed:.1f}s ({received / elapsed / (1024 * 1024):.1f} MiB/s)\n"
+    yield f"[+] SHA-256 (raw): {state['sha256']}\n"
+    if codec != "none":
+        yield f"[+] Stored {state['stored_bytes']} bytes ({codec}); decompress before running Volatility.\n"
+    yield f"[+] Android RAM dump saved as {final_path}\n"
+
+
+def pending(folder):
+    """Interrupted acquisitions in `folder` that can be resumed: [{"name", "chunks_done", "codec", ...}]"""
+    entries = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".acq.json"):
+            continue
+        dump_path = os.path.join(folder, name[:-len(".acq.json")])
+        state = load_state(dump_path)
+        if state and not state.get("completed_at") and os.path.exists(dump_path + ".part"):
+            entries.append({"name": os.path.basename(dump_path), "chunks_done": state["chunks_done"],
+                            "raw_bytes": state.get("raw_bytes", 0), "codec": state["codec"]})
+    return entries
@@ -0,0 +1,241 @@
+import os
+import re
+import json
+import time
+import queue
+import shutil
+import sqlite3
+import hashlib
+import threading
+
+# ================= EVIDENCE CATALOG =================
+# Dumps and reports live in a managed evidence directory (not next to the
+# source code) and are described by a SQLite catalog: size, mtime, SHA-256,
+# platform and the reports produced from each dump. Generators register files
+# as they write them; listings run a cheap scandir reconciliation (at most
+# every RESCAN_SECONDS) to pick up files added or removed by hand. Hashes are
+# computed once by a single background worker.
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+EVIDENCE_DIR = os.environ.get("RAM_EVIDENCE_DIR", os.path.join(MODULE_DIR, "evidence"))
+DB_PATH = os.path.join(EVIDENCE_DIR, "catalog.db")
+RESCAN_SECONDS = 10
+HASH_CHUNK = 4 * 1024 * 1024
+MAX_PER_PAGE = 500
+
+DUMP_SUFFIXES = (".raw", ".raw.zst", ".raw.lz4")
+REPORT_SUFFIXES = (".txt",)
+PLATFORM_RE = re.compile(r"_(windows|android)_")
+# Files the tool used to write into the module directory
+LEGACY_RE = re.compile(r"^(memory_dump_.*\.raw(\.zst|\.lz4)?|report_.*\.txt)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,              -- dump | report
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    platform TEXT,
+    sha256 TEXT,                     -- of the stored file; NULL until hashed
+    raw_sha256 TEXT,                 -- of the uncompressed data, for compressed acquisitions
+    source_dump TEXT,                -- reports: the dump they were produced from
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_files_kind_mtime ON files (kind, mtime);
+CREATE INDEX IF NOT EXISTS ix_files_source ON files (source_dump);
+"""
+
+_lock = threading.Lock()
+_state = {"initialized": False, "last_scan": 0.0}
+_hash_queue = queue.Queue()
+_hash_pending = set()  # names queued or being hashed; guarded by _lock
+_hash_worker = None
+
+
+def evidence_path(name):
+    """Absolute path of an evidence file; absolute paths (CLI) are used as given."""
+    return os.path.join(EVIDENCE_DIR, name)
+
+
+def classify(name):
+    if name.endswith(DUMP_SUFFIXES):
+        return "dump"
+    if name.endswith(REPORT_SUFFIXES):
+        return "report"
+    return None
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init():
+    """Create the evidence directory and catalog; move legacy files out of the module directory."""
+    with _lock:
+        if _state["initialized"]:
+            return
+        os.makedirs(EVIDENCE_DIR, exist_ok=True)
+        for name in os.listdir(MODULE_DIR):
+            if LEGACY_RE.match(name) and not os.path.exists(evidence_path(name)):
+                shutil.move(os.path.join(MODULE_DIR, name), evidence_path(name))
+                for sidecar in (".sha256.json", ".triage.json", ".acq.json"):
+                    if os.path.exists(os.path.join(MODULE_DIR, name + sidecar)):
+                        shutil.move(os.path.join(MODULE_DIR, name + sidecar), evidence_path(name + sidecar))
+        with _connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+        _state["initialized"] = True
+    rescan(force=True)
+
+
+def _platform_for(name):
+    m = PLATFORM_RE.search(name)
+    return m.group(1) if m else None
+
+
+def _raw_sha256(path):
+    """Known hash of the uncompressed data (from an acquisition state file), if any."""
+    try:
+        with open(path + ".acq.json", "r", encoding="utf-8") as f:
+            return json.load(f).get("sha256")
+    except (OSError, ValueError):
+        return None
+
+
+def _known_sha256(path, stat):
+    """Hash already computed by another component (analysis/triage/acquisition) for this exact file."""
+    try:
+        with open(path + ".sha256.json", "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("size") == stat.st_size and cached.get("mtime") == stat.st_mtime:
+            return cached["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def register(name, source_dump=None, platform=None):
+    """Add or refresh one file in the catalog (called by whoever just wrote it)."""
+    init()
+    path = evidence_path(name)
+    kind = classify(name)
+    if kind is None or not os.path.isfile(path):
+        return
+    stat = os.stat(path)
+    sha = _known_sha256(path, stat)
+    with _connect() as conn:
+        row = conn.execute("SELECT size, mtime, sha256 FROM files WHERE name = ?", (name,)).fetchone()
+        unchanged = row and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime
+        conn.execute("""
+            INSERT INTO files (name, kind, size, mtime, platform, sha256, raw_sha256, source_dump, added_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                size = excluded.size,
+                mtime = excluded.mtime,
+                platform = COALESCE(excluded.platform, files.platform),
+                sha256 = COALESCE(excluded.sha256, CASE WHEN ? THEN files.sha256 END),
+                raw_sha256 = COALESCE(excluded.raw_sha256, files.raw_sha256),
+                source_dump = COALESCE(excluded.source_dump, files.source_dump)
+        """, (name, kind, stat.st_size, stat.st_mtime, platform or _platform_for(name), sha,
+              _raw_sha256(path), source_dump, time.time(), 1 if unchanged else 0))
+        needs_hash = not sha and not (unchanged and row["sha256"])
+    if needs_hash:
+        _enqueue_hash(name)
+
+
+def rescan(force=False):
+    """Reconcile the catalog with the directory (new, changed and deleted files)."""
+    if not force and time.time() - _state["last_scan"] < RESCAN_SECONDS:
+        return
+    _state["last_scan"] = time.time()
+    on_disk = {}
+    with os.scandir(EVIDENCE_DIR) as it:
+        for entry in it:
+            if entry.is_file() and classify(entry.name):
+                st = entry.stat()
+                on_disk[entry.name] = (st.st_size, st.st_mtime)
+    with _connect() as conn:
+        known = {r["name"]: (r["size"], r["mtime"], r["sha256"])
+                 for r in conn.execute("SELECT name, size, mtime, sha256 FROM files")}
+        gone = [name for name in known if name not in on_disk]
+        if gone:
+            conn.executemany("DELETE FROM files WHERE name = ?", [(n,) for n in gone])
+    for name, (size, mtime) in on_disk.items():
+        old = known.get(name)
+        if not old or old[:2] != (size, mtime) or not old[2]:
+            register(name)
+
+
+def _enqueue_hash(name):
+    global _hash_worker
+    with _lock:
+        # rescan re-registers unhashed files every time; queue each name only once
+        if name in _hash_pending:
+            return
+        _hash_pending.add(name)
+        _hash_queue.put(name)
+        if _hash_worker is None or not _hash_worker.is_alive():
+            _hash_worker = threading.Thread(target=_hash_loop, daemon=True)
+            _hash_worker.start()
+
+
+def _hash_loop():
+    while True:
+        name = _hash_queue.get()
+        path = evidence_path(name)
+        try:
+            stat = os.stat(path)
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                    h.update(chunk)
+                    time.sleep(0)  # let other (green) threads run between chunks
+            if os.stat(path).st_mtime != stat.st_mtime:
+                continue  # still being written; the next register/rescan queues it again
+            digest = h.hexdigest()
+            with open(path + ".sha256.json", "w", encoding="utf-8") as f:
+                json.dump({"size": stat.st_size, "mtime": stat.st_mtime, "sha256": digest}, f)
+            with _connect() as conn:
+                conn.execute("UPDATE files SET sha256 = ? WHERE name = ? AND size = ? AND mtime = ?",
+                             (digest, name, stat.st_size, stat.st_mtime))
+        except OSError:
+            pass
+        finally:
+            with _lock:
+                _hash_pending.discard(name)
+
+
+def list_files(kind=None, page=1, per_page=100):
+    """Paginated catalog listing, newest first; dumps include their linked reports."""
+    init()
+    rescan()
+    page = max(1, int(page or 1))
+    per_page = min(MAX_PER_PAGE, max(1, int(per_page or 100)))
+    where, params = "", []
+    if kind in ("dump", "report"):
+        where, params = "WHERE kind = ?", [kind]
+    with _connect() as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM files {where}", params).fetchone()[0]
+        rows = [dict(r) for r in conn.execute(
+            f"SELECT * FROM files {where} ORDER BY mtime DESC, name LIMIT ? OFFSET ?",
+            params + [per_page, (page - 1) * per_page])]
+        dumps = [r["name"] for r in rows if r["kind"] == "dump"]
+        reports = {}
+        if dumps:
+            marks = ",".join("?" for _ in dumps)
+            for r in conn.execute(f"SELECT name, source_dump FROM files WHERE source_dump IN ({marks})", dumps):
+                reports.setdefault(r["source_dump"], []).append(r["name"])
+    for row in rows:
+        row["type"] = row["kind"]  # field name the UI has always used
+        if row["kind"] == "dump":
+            row["reports"] = sorted(reports.get(row["name"], []))
+    return {"page": page, "per_page": per_page, "total": total, "items": rows}
+
+
+def get(name):
+    init()
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM files WHERE name = ?", (name,)).fetchone()
+    return dict(row) if row else None
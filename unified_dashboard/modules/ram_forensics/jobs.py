@@ -0,0 +1,260 @@
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import threading
+import subprocess
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+# ================= JOB MANAGER =================
+# Acquisitions and analyses run as background jobs identified by an ID, so
+# several can run at once and a browser can detach and reattach to a job's
+# output. Every subprocess a job starts goes through `managed_process`, which
+# puts it in its own process group (so cancelling also kills its children)
+# and, for Volatility, takes a slot from a global cap shared by all jobs.
+#
+# Output lines are numbered. The newest RING_SIZE stay in memory; every line
+# is also appended to job_logs/<id>.log, so a client that reconnects with
+# Last-Event-ID gets exactly the lines it missed. Producers only append and
+# notify; they never wait on a reader. A job's log is deleted when the job is
+# pruned from the manager.
+
+MAX_VOL_PROCESSES = int(os.environ.get("RAM_MAX_VOL_PROCESSES", os.cpu_count() or 2))
+KEEP_FINISHED = 50
+KILL_GRACE_SECONDS = 2
+RING_SIZE = 2000
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_logs")
+
+_vol_slots = threading.BoundedSemaphore(MAX_VOL_PROCESSES)
+
+# The job whose code is running; set for the job's thread and copied into pool workers
+current_job = contextvars.ContextVar("ram_current_job", default=None)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def cancelled():
+    """True if the job running the calling code has been cancelled."""
+    job = current_job.get()
+    return bool(job and job.cancel_event.is_set())
+
+
+def kill_tree(proc):
+    """Terminate a process and everything in its process group."""
+    if proc.poll() is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGTERM)
+            try:
+                proc.wait(timeout=KILL_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+    except (OSError, ProcessLookupError):
+        pass
+
+
+@contextmanager
+def managed_process(cmd, vol=False, **popen_kwargs):
+    """
+    Popen `cmd` in a new process group, registered with the current job.
+    `vol=True` waits for a global Volatility slot first. The process is killed
+    on exit if it is still running.
+    """
+    job = current_job.get()
+    if vol:
+        while not _vol_slots.acquire(timeout=0.5):
+            if cancelled():
+                raise JobCancelled()
+    try:
+        if sys.platform == "win32":
+            popen_kwargs.setdefault("creationflags", subprocess.CREATE_NEW_PROCESS_GROUP)
+        else:
+            popen_kwargs.setdefault("start_new_session", True)
+        proc = subprocess.Popen(cmd, **popen_kwargs)
+        if job:
+            job.attach(proc)
+        try:
+            yield proc
+        finally:
+            kill_tree(proc)
+            proc.wait()
+            if job:
+                job.detach(proc)
+    finally:
+        if vol:
+            _vol_slots.release()
+
+
+class RamJob:
+    def __init__(self, kind, label, owner=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.label = label
+        self.owner = owner
+        self.status = "running"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.ring = deque(maxlen=RING_SIZE)  # (seq, line)
+        self.seq = 0
+        self.cond = threading.Condition()
+        os.makedirs(LOG_DIR, exist_ok=True)
+        self.log_path = os.path.join(LOG_DIR, f"{self.id}.log")
+        self.log = open(self.log_path, "a", encoding="utf-8")
+        self.processes = set()
+        self.cancel_event = threading.Event()
+
+    @property
+    def done(self):
+        return self.status != "running"
+
+    def attach(self, proc):
+        with self.cond:
+            self.processes.add(proc)
+        if self.cancel_event.is_set():
+            kill_tree(proc)
+
+    def detach(self, proc):
+        with self.cond:
+            self.processes.discard(proc)
+
+    def append(self, line):
+        with self.cond:
+            self.seq += 1
+            self.ring.append((self.seq, line))
+            self.log.write(json.dumps([self.seq, line]) + "\n")
+            self.cond.notify_all()
+
+    def finish(self, status):
+        with self.cond:
+            self.status = status
+            self.finished_at = time.time()
+            self.log.close()
+            self.cond.notify_all()
+
+    def read(self, since, timeout=15):
+        """
+        Lines numbered after `since` as (seq, line) pairs, waiting up to `timeout`
+        for new ones. Returns (entries, done).
+        """
+        with self.cond:
+            if self.seq <= since and not self.done:
+                self.cond.wait(timeout)
+            if self.seq <= since:
+                return [], self.done
+            if self.ring and self.ring[0][0] <= since + 1:
+                return [e for e in self.ring if e[0] > since], self.done
+            # Reader fell behind the ring; replay from the log
+            if not self.log.closed:
+                self.log.flush()
+            upto, done = self.seq, self.done
+        return self._replay(since, upto), done
+
+    def _replay(self, since, upto):
+        entries = []
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for raw in f:
+                    try:
+                        seq, line = json.loads(raw)
+                    except ValueError:
+                        break  # half-written last line; everything up to `upto` was before it
+                    if seq > upto:
+                        break
+                    if seq > since:
+                        entries.append((seq, line))
+        except OSError:
+            pass  # job pruned meanwhile
+        return entries
+
+    def cancel(self):
+        self.cancel_event.set()
+        with self.cond:
+            procs = list(self.processes)
+        for proc in procs:
+            kill_tree(proc)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "lines": self.seq,
+            "processes": len(self.processes),
+        }
+
+
+class JobManager:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def start(self, kind, label, generator_func, *args, owner=None):
+        """Run a stream_* generator in the background; its lines become the job's output."""
+        job = RamJob(kind, label, owner)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune()
+        ctx = contextvars.copy_context()
+        threading.Thread(target=ctx.run, args=(self._run, job, generator_func, args), daemon=True).start()
+        return job
+
+    def _run(self, job, generator_func, args):
+        current_job.set(job)
+        status = "finished"
+        gen = generator_func(*args)
+        try:
+            for line in gen:
+                job.append(line)
+                if job.cancel_event.is_set():
+                    break
+        except JobCancelled:
+            pass
+        except Exception as e:
+            job.append(f"[-] Error: {e}\n")
+            status = "failed"
+        finally:
+            gen.close()
+        if job.cancel_event.is_set():
+            job.append("\n[!] Job cancelled by user.\n")
+            status = "cancelled"
+        job.finish(status)
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self, owner=None):
+        with self.lock:
+            jobs = [j for j in self.jobs.values() if owner is None or j.owner == owner]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def cancel_all(self, owner=None):
+        """Cancel every running job (of one owner, if given); returns how many were cancelled."""
+        running = [j for j in self.list(owner) if not j.done]
+        for job in running:
+            job.cancel()
+        return len(running)
+
+    def _prune(self):
+        finished = sorted((j for j in self.jobs.values() if j.done), key=lambda j: j.created_at)
+        for job in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+            del self.jobs[job.id]
+            try:
+                os.remove(job.log_path)
+            except OSError:
+                pass
+
+
+manager = JobManager()
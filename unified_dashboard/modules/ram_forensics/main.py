@@ -1,5 +1,7 @@
 import os
+import sys
 import utils
+import symbols
 import time
 
 def run_generator(gen_func, *args):
@@ -21,6 +23,9 @@ def main_menu():
         print("3. [Android] Extract RAM")
         print("4. [Android] Analyze RAM Dump")
         print("5. [Web]     Start Web Interface")
+        print("6. [Symbols] Warm Up Symbol Cache for a Dump")
+        print("7. [Symbols] Import Offline Symbol Pack (.zip)")
+        print("8. [Triage]  Quick Triage of a Dump")
         print("0. Exit")
         
         choice = input("\nSelect option: ").strip()
@@ -34,7 +39,7 @@ def main_menu():
                 file_path += ".raw"
                 
             if os.path.exists(file_path):
-                run_generator(utils.stream_analyze, file_path, "windows")
+                run_generator(utils.stream_analyze, os.path.abspath(file_path), "windows")
             else:
                 print("[-] File not found.")
                 
@@ -47,7 +52,7 @@ def main_menu():
                 file_path += ".raw"
 
             if os.path.exists(file_path):
-                run_generator(utils.stream_analyze, file_path, "android")
+                run_generator(utils.stream_analyze, os.path.abspath(file_path), "android")
             else:
                 print("[-] File not found.")
         
@@ -55,6 +60,34 @@ def main_menu():
             print("[*] Launching Web Interface...")
             os.system("python app.py")
 
+        elif choice == "6":
+            file_path = input("Enter filename (e.g. dump.raw): ").strip('"').strip()
+            if not os.path.isfile(file_path) and os.path.isfile(file_path + ".raw"):
+                file_path += ".raw"
+
+            if os.path.exists(file_path):
+                run_generator(utils.stream_warm_symbols, os.path.abspath(file_path))
+            else:
+                print("[-] File not found.")
+
+        elif choice == "7":
+            pack_path = input("Enter symbol pack path (e.g. windows.zip): ").strip('"').strip()
+            try:
+                name = symbols.import_symbol_pack(pack_path)
+                print(f"[+] Imported {name} into {symbols.SYMBOLS_DIR}")
+            except (OSError, ValueError) as e:
+                print(f"[-] Import failed: {e}")
+
+        elif choice == "8":
+            file_path = input("Enter filename (e.g. dump.raw): ").strip('"').strip()
+            if not os.path.isfile(file_path) and os.path.isfile(file_path + ".raw"):
+                file_path += ".raw"
+
+            if os.path.exists(file_path):
+                run_generator(utils.stream_triage, os.path.abspath(file_path))
+            else:
+                print("[-] File not found.")
+
         elif choice == "0":
             print("[*] Exiting...")
             break
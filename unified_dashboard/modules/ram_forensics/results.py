@@ -0,0 +1,163 @@
+import os
+import json
+import hashlib
+import threading
+
+# ================= PLUGIN RESULT CACHE =================
+# Volatility runs with the JSON renderer and its rows are stored per dump,
+# keyed by (dump SHA-256, plugin name, plugin arguments). Re-analyzing the
+# same dump, or asking for one plugin's table, is then served from disk.
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(MODULE_DIR, "results_cache")
+HASH_CHUNK = 4 * 1024 * 1024
+MAX_PER_PAGE = 1000
+
+_hash_lock = threading.Lock()
+
+
+def known_sha256(path, stat=None):
+    """The dump's SHA-256 from its sidecar if still valid, else None (never hashes)."""
+    stat = stat or os.stat(path)
+    with _hash_lock:
+        try:
+            with open(path + ".sha256.json", "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("size") == stat.st_size and cached.get("mtime") == stat.st_mtime:
+                return cached["sha256"]
+        except (OSError, ValueError, KeyError):
+            pass
+    return None
+
+
+def dump_sha256(path):
+    """
+    SHA-256 of a dump, cached in a `<dump>.sha256.json` sidecar that is
+    reused while the dump's size and mtime are unchanged.
+    """
+    stat = os.stat(path)
+    digest = known_sha256(path, stat)
+    if digest:
+        return digest
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    remember_sha256(path, digest, stat)
+    return digest
+
+
+def remember_sha256(path, digest, stat=None):
+    """Store a hash computed elsewhere (e.g. during triage) so dump_sha256 can reuse it."""
+    stat = stat or os.stat(path)
+    with _hash_lock:
+        with open(path + ".sha256.json", "w", encoding="utf-8") as f:
+            json.dump({"size": stat.st_size, "mtime": stat.st_mtime, "sha256": digest}, f)
+
+
+def _result_path(dump_hash, plugin):
+    """plugin is a VOL_PLUGINS entry: [name, *args]"""
+    args_key = hashlib.sha1("\0".join(plugin[1:]).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(RESULTS_DIR, dump_hash, f"{plugin[0]}_{args_key}.json")
+
+
+def load(dump_hash, plugin):
+    path = _result_path(dump_hash, plugin)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save(dump_hash, plugin, columns, rows):
+    path = _result_path(dump_hash, plugin)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    result = {"plugin": plugin[0], "args": plugin[1:], "columns": columns, "rows": rows}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    os.replace(tmp, path)
+    return result
+
+
+def cached_plugins(dump_hash):
+    """Names of the plugins that have cached results for a dump."""
+    folder = os.path.join(RESULTS_DIR, dump_hash)
+    if not os.path.isdir(folder):
+        return []
+    return sorted({name.rsplit("_", 1)[0] for name in os.listdir(folder) if name.endswith(".json")})
+
+
+def parse_json_output(text):
+    """
+    Parse `vol -r json` output into (columns, rows).
+    Tree plugins (pstree) nest rows under `__children`; they are flattened and
+    each row gets a `__depth` so the hierarchy can still be shown.
+    """
+    data = json.loads(text)
+    columns, rows = [], []
+
+    def walk(items, depth):
+        for item in items:
+            row = {k: v for k, v in item.items() if k != "__children"}
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+            row["__depth"] = depth
+            rows.append(row)
+            walk(item.get("__children") or [], depth + 1)
+
+    walk(data if isinstance(data, list) else [data], 0)
+    return columns, rows
+
+
+def render_text(columns, rows):
+    """Tab-separated lines (header first), like Volatility's text renderer."""
+    yield "\t".join(columns) + "\n"
+    for row in rows:
+        indent = "*" * row.get("__depth", 0)
+        values = ["" if row.get(c) is None else str(row.get(c)) for c in columns]
+        if indent and values:
+            values[0] = f"{indent} {values[0]}"
+        yield "\t".join(values) + "\n"
+
+
+def _sort_key(value):
+    # None sorts first; numbers numerically; everything else as text
+    if value is None:
+        return (0, 0, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value, "")
+    return (2, 0, str(value).lower())
+
+
+def query(result, q=None, sort=None, desc=False, filters=None, page=1, per_page=100):
+    """Filter (substring over all columns and/or exact column values), sort and page a cached result."""
+    rows = result["rows"]
+    columns = result["columns"]
+    if q:
+        needle = q.lower()
+        rows = [r for r in rows if any(needle in str(r.get(c, "")).lower() for c in columns)]
+    for col, val in (filters or {}).items():
+        if col in columns and val not in (None, ""):
+            rows = [r for r in rows if str(r.get(col, "")) == val]
+    if sort in columns:
+        rows = sorted(rows, key=lambda r: _sort_key(r.get(sort)), reverse=bool(desc))
+
+    page = max(1, int(page or 1))
+    per_page = min(MAX_PER_PAGE, max(1, int(per_page or 100)))
+    start = (page - 1) * per_page
+    return {
+        "plugin": result["plugin"],
+        "args": result["args"],
+        "columns": columns,
+        "total": len(rows),
+        "page": page,
+        "per_page": per_page,
+        "rows": rows[start:start + per_page],
+    }
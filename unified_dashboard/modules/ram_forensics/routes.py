@@ -1,6 +1,8 @@
 from flask import Blueprint, render_template, Response, request, jsonify, send_file
+from flask_login import current_user
 import os
-from . import utils
+import tempfile
+from . import utils, results, symbols, triage, jobs, acquisition, catalog
 
 # Define Blueprint
 ram_bp = Blueprint('ram', __name__, url_prefix='/tools/ram', template_folder='templates', static_folder='static')
@@ -20,50 +22,221 @@ def status():
 
 @ram_bp.route('/api/files')
 def list_files():
-    files = []
-    # Use current directory of this module
-    cwd = os.path.dirname(os.path.abspath(__file__))
-    for f in os.listdir(cwd):
-        if f.endswith(".raw") or f.endswith(".txt"):
-            files.append({
-                "name": f,
-                "size": os.path.getsize(os.path.join(cwd, f)),
-                "type": "dump" if f.endswith(".raw") else "report"
-            })
-    return jsonify(files)
+    """Evidence catalog: ?type=dump|report, ?page=, ?per_page= (newest first)."""
+    return jsonify(catalog.list_files(
+        kind=request.args.get('type'),
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', 100, type=int),
+    ))
 
 @ram_bp.route('/api/download/<filename>')
 def download_file(filename):
-    cwd = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(cwd, filename)
+    filename = os.path.basename(filename)
+    if not catalog.get(filename):
+        return "File not found", 404
+    path = catalog.evidence_path(filename)
     if os.path.exists(path):
-        return send_file(path, as_attachment=True)
+        # conditional: honours Range / If-Range so multi-GB dumps can be fetched in parts and resumed
+        return send_file(path, as_attachment=True, conditional=True, etag=True)
     return "File not found", 404
 
+# Jobs are scoped to the logged-in user
+def job_owner():
+    return current_user.get_id() if current_user.is_authenticated else None
+
+def find_job(job_id):
+    job = jobs.manager.get(job_id)
+    if job is None or job.owner != job_owner():
+        return None
+    return job
+
 @ram_bp.route('/api/stop', methods=['POST'])
 def stop_process():
-    if utils.kill_process():
+    """Cancel one job (`job_id` in the JSON body) or, without it, all of this user's running jobs."""
+    job_id = (request.get_json(silent=True) or {}).get('job_id')
+    if job_id:
+        job = find_job(job_id)
+        if job is None or job.done:
+            return jsonify({"status": "no_process"})
+        job.cancel()
+        return jsonify({"status": "terminated"})
+    if jobs.manager.cancel_all(job_owner()):
         return jsonify({"status": "terminated"})
     return jsonify({"status": "no_process"})
 
+@ram_bp.route('/api/jobs')
+def list_jobs():
+    return jsonify([job.to_dict() for job in jobs.manager.list(job_owner())])
+
+@ram_bp.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = find_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    job.cancel()
+    return jsonify(job.to_dict())
+
 # Streaming Functions
-def generate_output(generator_func, *args):
-    for line in generator_func(*args):
-        yield f"data: {line}\n\n"
-    yield "data: [DONE]\n\n"
+def sse_event(data, event_id=None):
+    # Multi-line output needs one data: field per line
+    lines = "".join(f"data: {part}\n" for part in data.rstrip("\n").split("\n"))
+    return (f"id: {event_id}\n" if event_id is not None else "") + lines + "\n"
+
+def stream_job(job, since=0):
+    """
+    SSE view of a job's output. Every line carries its sequence number as the event id,
+    so a client that reconnects with Last-Event-ID resumes exactly where it stopped.
+    Disconnecting doesn't stop the job.
+    """
+    def generate():
+        yield f"event: job\ndata: {job.id}\n\n"
+        pos = since
+        while True:
+            entries, done = job.read(pos)
+            for seq, line in entries:
+                yield sse_event(line, seq)
+            if entries:
+                pos = entries[-1][0]
+            elif done:
+                break
+            else:
+                yield ": keepalive\n\n"
+        yield "data: [DONE]\n\n"
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+def start_job(kind, label, generator_func, *args):
+    return stream_job(jobs.manager.start(kind, label, generator_func, *args, owner=job_owner()))
+
+@ram_bp.route('/stream/jobs/<job_id>')
+def stream_existing_job(job_id):
+    """Reattach to a job. Resumes after Last-Event-ID (header, or ?last_event_id= for manual reconnects)."""
+    job = find_job(job_id)
+    if job is None:
+        return "Job not found", 404
+    since = request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or 0
+    try:
+        since = max(0, int(since))
+    except ValueError:
+        since = 0
+    return stream_job(job, since)
 
 @ram_bp.route('/stream/capture/windows')
 def stream_capture_windows():
-    return Response(generate_output(utils.stream_extract_windows), mimetype='text/event-stream')
+    return start_job("capture", "Windows capture", utils.stream_extract_windows)
 
 @ram_bp.route('/stream/capture/android')
 def stream_capture_android():
-    return Response(generate_output(utils.stream_extract_android), mimetype='text/event-stream')
+    # ?mode=stream|pull, ?compress=none|zstd|lz4, ?resume=<interrupted dump name>
+    mode = request.args.get('mode', 'stream')
+    compression = request.args.get('compress', 'none')
+    resume = request.args.get('resume') or None
+    return start_job("capture", "Android capture", utils.stream_extract_android, mode, compression, resume)
+
+@ram_bp.route('/api/capture/android/options')
+def android_capture_options():
+    """Compression codecs available here and interrupted acquisitions that can be resumed."""
+    catalog.init()
+    return jsonify({
+        "compressors": acquisition.available_compressors(),
+        "resumable": acquisition.pending(catalog.EVIDENCE_DIR),
+    })
 
 @ram_bp.route('/stream/analyze')
 def stream_analyze():
-    filename = request.args.get('filename')
+    filename = os.path.basename(request.args.get('filename', ''))
+    if not filename:
+        return "Filename required", 400
+    # Optional: ?plugin=windows.pslist (repeatable) to run a subset; ?refresh=1 to bypass the result cache
+    plugins = request.args.getlist('plugin')
+    refresh = request.args.get('refresh') == '1'
+    return start_job("analysis", f"Analysis of {filename}", utils.stream_analyze, filename, "windows", plugins, refresh)
+
+@ram_bp.route('/api/results')
+def plugin_results():
+    """
+    Cached plugin rows for a dump. Without `plugin`, lists the plugins that have results.
+    Query params: filename, plugin, q (substring filter), sort, desc=1, page, per_page,
+    and `f_<column>=value` for exact column filters.
+    """
+    filename = os.path.basename(request.args.get('filename', ''))
+    path = catalog.evidence_path(filename)
+    if not filename or not os.path.isfile(path):
+        return jsonify({"error": "File not found"}), 404
+    # Never hash a dump inside a request: use the catalog's or the sidecar's hash
+    stat = os.stat(path)
+    entry = catalog.get(filename)
+    if entry and entry["sha256"] and (entry["size"], entry["mtime"]) == (stat.st_size, stat.st_mtime):
+        dump_hash = entry["sha256"]
+    else:
+        dump_hash = results.known_sha256(path, stat)
+    if not dump_hash:
+        catalog.register(filename)  # queues it for the background hasher
+        return jsonify({"error": "Dump not hashed yet; try again shortly", "hashing": True}), 404
+
+    name = request.args.get('plugin')
+    if not name:
+        return jsonify({"sha256": dump_hash, "plugins": results.cached_plugins(dump_hash)})
+    plugin = utils.find_plugins([name])
+    result = results.load(dump_hash, plugin[0]) if plugin else None
+    if not result:
+        return jsonify({"error": f"No cached results for {name}; run the analysis first"}), 404
+
+    filters = {k[2:]: v for k, v in request.args.items() if k.startswith('f_')}
+    return jsonify(results.query(
+        result,
+        q=request.args.get('q'),
+        sort=request.args.get('sort'),
+        desc=request.args.get('desc') == '1',
+        filters=filters,
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', 100, type=int),
+    ))
+
+
+@ram_bp.route('/stream/symbols/warmup')
+def stream_warm_symbols():
+    filename = os.path.basename(request.args.get('filename', ''))
+    if not filename:
+        return "Filename required", 400
+    return start_job("symbols", f"Symbol warm-up for {filename}", utils.stream_warm_symbols, filename)
+
+@ram_bp.route('/api/symbols')
+def symbol_store():
+    return jsonify(symbols.store_status())
+
+@ram_bp.route('/api/symbols/import', methods=['POST'])
+def import_symbols():
+    """Upload an offline symbol pack (.zip of ISF files) into the managed store."""
+    upload = request.files.get('pack')
+    if not upload or not upload.filename:
+        return jsonify({"error": "No symbol pack uploaded"}), 400
+    fd, tmp_path = tempfile.mkstemp(suffix=".zip")
+    os.close(fd)
+    try:
+        upload.save(tmp_path)
+        name = symbols.import_symbol_pack(tmp_path, upload.filename)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        os.remove(tmp_path)
+    return jsonify({"status": "imported", "name": name})
+
+@ram_bp.route('/stream/triage')
+def stream_triage():
+    filename = os.path.basename(request.args.get('filename', ''))
     if not filename:
         return "Filename required", 400
-    return Response(generate_output(utils.stream_analyze, filename), mimetype='text/event-stream')
+    refresh = request.args.get('refresh') == '1'
+    return start_job("triage", f"Triage of {filename}", utils.stream_triage, filename, refresh)
 
+@ram_bp.route('/api/triage')
+def triage_index():
+    """Full triage index (entropy map, histogram, IOC hits) of an already triaged dump."""
+    filename = os.path.basename(request.args.get('filename', ''))
+    path = catalog.evidence_path(filename)
+    if not filename or not os.path.isfile(path):
+        return jsonify({"error": "File not found"}), 404
+    index = triage.load_index(path)
+    if not index:
+        return jsonify({"error": "Dump has not been triaged yet"}), 404
+    return jsonify(index)
@@ -1,6 +1,9 @@
 document.addEventListener('DOMContentLoaded', () => {
     checkStatus();
     loadFiles();
+    loadSymbolStore();
+    loadCaptureOptions();
+    reattachJob();
     setInterval(checkStatus, 10000); // Poll status every 10s
 });
 
@@ -56,8 +59,9 @@ function updateBadge(id, isOk) {
 
 async function loadFiles() {
     try {
-        const res = await fetch('/tools/ram/api/files');
-        const files = await res.json();
+        const res = await fetch('/tools/ram/api/files?per_page=500');
+        const data = await res.json();
+        const files = data.items;
 
         // --- Populate Analysis Dropdown (Capture Tab) ---
         const select = document.getElementById('analysis-file-select');
@@ -65,7 +69,8 @@ async function loadFiles() {
             const currentVal = select.value;
             select.innerHTML = '<option value="">-- Select .raw Image --</option>';
             files.forEach(f => {
-                if (f.type === 'dump') {
+                // Volatility needs the raw image; compressed acquisitions are for storage/transfer
+                if (f.type === 'dump' && f.name.endsWith('.raw')) {
                     const opt = document.createElement('option');
                     opt.value = f.name;
                     opt.textContent = `${f.name} (${formatBytes(f.size)})`;
@@ -81,11 +86,14 @@ async function loadFiles() {
             historyTbody.innerHTML = '';
             files.forEach(f => {
                 const tr = document.createElement('tr');
+                const linked = f.reports && f.reports.length ? `<br><small>Reports: ${f.reports.join(', ')}</small>` : '';
+                const source = f.source_dump ? `<br><small>From: ${f.source_dump}</small>` : '';
                 tr.innerHTML = `
-                    <td>${f.name}</td>
-                    <td><span class="tag">${f.type.toUpperCase()}</span></td>
+                    <td>${f.name}${linked}${source}</td>
+                    <td><span class="tag">${f.type.toUpperCase()}</span>${f.platform ? ` <span class="tag">${f.platform.toUpperCase()}</span>` : ''}</td>
                     <td>${formatBytes(f.size)}</td>
-                    <td><a href="/tools/ram/api/download/${f.name}" class="btn-download">DOWNLOAD</a></td>
+                    <td class="hash-cell">${f.sha256 ? f.sha256 : 'hashing...'}</td>
+                    <td><a href="/tools/ram/api/download/${encodeURIComponent(f.name)}" class="btn-download">DOWNLOAD</a></td>
                 `;
                 historyTbody.appendChild(tr);
             });
@@ -138,6 +146,11 @@ async function loadFiles() {
 
 // === STREAMING LOGIC ===
 let eventSource = null;
+let currentJobId = null; // server-side job behind the current stream
+let lastEventId = 0;      // last output line received, for resuming after a disconnect
+let reconnectTimer = null;
+let reconnectAttempts = 0;
+const MAX_RECONNECT_ATTEMPTS = 5;
 
 function startCapture(platform) {
     if (eventSource) eventSource.close();
@@ -145,10 +158,48 @@ function startCapture(platform) {
     clearTerminal();
     logToTerminal(`[INIT] Starting ${platform.toUpperCase()} Capture stream...`, "system");
 
-    const endpoint = `/tools/ram/stream/capture/${platform}`;
+    let endpoint = `/tools/ram/stream/capture/${platform}`;
+    if (platform === 'android') {
+        const params = new URLSearchParams({
+            mode: 'stream',
+            compress: document.getElementById('android-compress').value,
+            resume: document.getElementById('android-resume').value,
+        });
+        endpoint += `?${params}`;
+    }
     connectStream(endpoint);
 }
 
+async function loadCaptureOptions() {
+    try {
+        const res = await fetch('/tools/ram/api/capture/android/options');
+        const data = await res.json();
+
+        const compress = document.getElementById('android-compress');
+        const labels = { none: 'None (.raw)', zstd: 'zstd (.raw.zst)', lz4: 'lz4 (.raw.lz4)' };
+        const current = compress.value;
+        compress.innerHTML = '';
+        data.compressors.forEach(c => {
+            const opt = document.createElement('option');
+            opt.value = c;
+            opt.textContent = labels[c] || c;
+            compress.appendChild(opt);
+        });
+        if (data.compressors.includes(current)) compress.value = current;
+
+        const resume = document.getElementById('android-resume');
+        resume.innerHTML = '<option value="">-- New acquisition --</option>';
+        data.resumable.forEach(p => {
+            const opt = document.createElement('option');
+            opt.value = p.name;
+            opt.textContent = `${p.name} (${formatBytes(p.raw_bytes)}, ${p.codec})`;
+            resume.appendChild(opt);
+        });
+    } catch (e) {
+        console.error("Capture options failed", e);
+    }
+}
+
 function startAnalysis() {
     const filename = document.getElementById('analysis-file-select').value;
     if (!filename) {
@@ -165,44 +216,241 @@ function startAnalysis() {
     connectStream(endpoint);
 }
 
-function connectStream(url) {
+function startTriage() {
+    const filename = document.getElementById('analysis-file-select').value;
+    if (!filename) {
+        alert("Please select a memory dump first.");
+        return;
+    }
+
+    if (eventSource) eventSource.close();
+    clearTerminal();
+    logToTerminal(`[INIT] Quick triage of ${filename}...`, "system");
+    connectStream(`/tools/ram/stream/triage?filename=${encodeURIComponent(filename)}`);
+}
+
+function warmSymbols() {
+    const filename = document.getElementById('analysis-file-select').value;
+    if (!filename) {
+        alert("Please select a memory dump first.");
+        return;
+    }
+
+    if (eventSource) eventSource.close();
+    clearTerminal();
+    logToTerminal(`[INIT] Warming symbol cache for ${filename}...`, "system");
+    connectStream(`/tools/ram/stream/symbols/warmup?filename=${encodeURIComponent(filename)}`);
+}
+
+async function loadSymbolStore() {
+    try {
+        const res = await fetch('/tools/ram/api/symbols');
+        const data = await res.json();
+        const info = `${data.packs.length} PACK(S), ${Object.keys(data.warmed).length} WARM DUMP(S)`;
+        document.getElementById('symbol-store-info').textContent = data.offline ? `${info}, OFFLINE` : info;
+    } catch (e) {
+        console.error("Symbol store check failed", e);
+    }
+}
+
+async function importSymbolPack() {
+    const input = document.getElementById('symbol-pack-input');
+    if (!input.files.length) return;
+
+    const form = new FormData();
+    form.append('pack', input.files[0]);
+    logToTerminal(`[*] Importing symbol pack ${input.files[0].name}...`, "system");
+    try {
+        const res = await fetch('/tools/ram/api/symbols/import', { method: 'POST', body: form });
+        const data = await res.json();
+        if (res.ok) {
+            logToTerminal(`[+] Symbol pack imported: ${data.name}`, "success");
+        } else {
+            logToTerminal(`[-] Import failed: ${data.error}`, "error");
+        }
+    } catch (e) {
+        logToTerminal(`[-] Import failed: ${e}`, "error");
+    }
+    input.value = '';
+    loadSymbolStore();
+}
+
+function connectStream(url, resume = false) {
+    if (!resume) lastEventId = 0;
+    clearTimeout(reconnectTimer);
     eventSource = new EventSource(url);
 
+    // Jobs keep running server-side; remember the ID so a reload can reattach
+    eventSource.addEventListener('job', function (e) {
+        currentJobId = e.data;
+        localStorage.setItem('ramJobId', currentJobId);
+    });
+
     eventSource.onmessage = function (e) {
+        if (e.lastEventId) lastEventId = parseInt(e.lastEventId, 10);
+        reconnectAttempts = 0;
         if (e.data === "[DONE]") {
             logToTerminal(">>> PROCESS COMPLETE <<<", "success");
             eventSource.close();
             eventSource = null;
+            currentJobId = null;
+            localStorage.removeItem('ramJobId');
             loadFiles(); // Refresh file lists
+            loadResultPlugins();
+            loadSymbolStore();
+            loadCaptureOptions();
             return;
         }
         logToTerminal(e.data);
     };
 
     eventSource.onerror = function (e) {
-        logToTerminal(">>> CONNECTION CLOSED / ERROR <<<", "error");
         if (eventSource) {
             eventSource.close();
             eventSource = null;
         }
+        if (!currentJobId || reconnectAttempts >= MAX_RECONNECT_ATTEMPTS) {
+            logToTerminal(">>> CONNECTION CLOSED / ERROR <<<", "error");
+            return;
+        }
+        reconnectAttempts++;
+        // The job keeps running server-side; resume after the last line we got
+        logToTerminal(">>> CONNECTION LOST, RESUMING... <<<", "error");
+        const jobId = currentJobId;
+        reconnectTimer = setTimeout(() => {
+            connectStream(`/tools/ram/stream/jobs/${jobId}?last_event_id=${lastEventId}`, true);
+        }, 2000);
     };
 }
 
+// === PLUGIN RESULTS (served from the per-dump cache) ===
+const resultsState = { filename: '', page: 1, sort: '', desc: false, pages: 1 };
+
+async function loadResultPlugins() {
+    const filename = document.getElementById('analysis-file-select').value;
+    const select = document.getElementById('results-plugin-select');
+    if (!select || !filename) return;
+    resultsState.filename = filename;
+    try {
+        const res = await fetch(`/tools/ram/api/results?filename=${encodeURIComponent(filename)}`);
+        const data = await res.json();
+        const plugins = data.plugins || [];
+        const current = select.value;
+        const empty = data.hashing ? '-- Dump is still being hashed --' : '-- No cached results --';
+        select.innerHTML = plugins.length ? '' : `<option value="">${empty}</option>`;
+        plugins.forEach(name => {
+            const opt = document.createElement('option');
+            opt.value = name;
+            opt.textContent = name;
+            select.appendChild(opt);
+        });
+        if (plugins.includes(current)) select.value = current;
+        if (plugins.length) loadResults(1);
+    } catch (e) {
+        console.error("Result list failed", e);
+    }
+}
+
+async function loadResults(page) {
+    const plugin = document.getElementById('results-plugin-select').value;
+    if (!plugin || !resultsState.filename) return;
+    resultsState.page = Math.min(Math.max(1, page), resultsState.pages);
+
+    const params = new URLSearchParams({
+        filename: resultsState.filename,
+        plugin: plugin,
+        q: document.getElementById('results-filter').value,
+        page: resultsState.page,
+        per_page: 100,
+    });
+    if (resultsState.sort) {
+        params.set('sort', resultsState.sort);
+        if (resultsState.desc) params.set('desc', '1');
+    }
+
+    try {
+        const res = await fetch(`/tools/ram/api/results?${params}`);
+        const data = await res.json();
+        if (!res.ok) {
+            logToTerminal(data.error || "Result load failed", "error");
+            return;
+        }
+        renderResults(data);
+    } catch (e) {
+        console.error("Result load failed", e);
+    }
+}
+
+function renderResults(data) {
+    const table = document.getElementById('results-table');
+    const thead = table.querySelector('thead');
+    const tbody = table.querySelector('tbody');
+
+    const headRow = document.createElement('tr');
+    data.columns.forEach(col => {
+        const th = document.createElement('th');
+        const arrow = resultsState.sort === col ? (resultsState.desc ? ' ▼' : ' ▲') : '';
+        th.textContent = col + arrow;
+        th.onclick = () => {
+            resultsState.desc = resultsState.sort === col ? !resultsState.desc : false;
+            resultsState.sort = col;
+            loadResults(1);
+        };
+        headRow.appendChild(th);
+    });
+    thead.innerHTML = '';
+    thead.appendChild(headRow);
+
+    tbody.innerHTML = '';
+    data.rows.forEach(row => {
+        const tr = document.createElement('tr');
+        data.columns.forEach((col, i) => {
+            const td = document.createElement('td');
+            const value = row[col] === null || row[col] === undefined ? '' : String(row[col]);
+            td.textContent = i === 0 && row.__depth ? `${'*'.repeat(row.__depth)} ${value}` : value;
+            tr.appendChild(td);
+        });
+        tbody.appendChild(tr);
+    });
+
+    resultsState.pages = Math.max(1, Math.ceil(data.total / data.per_page));
+    document.getElementById('results-page-info').textContent =
+        `PAGE ${data.page} / ${resultsState.pages} (${data.total} rows)`;
+}
+
+async function reattachJob() {
+    const jobId = localStorage.getItem('ramJobId');
+    if (!jobId) return;
+    try {
+        const res = await fetch('/tools/ram/api/jobs');
+        const jobs = await res.json();
+        const job = jobs.find(j => j.id === jobId);
+        if (!job) {
+            localStorage.removeItem('ramJobId');
+            return;
+        }
+        clearTerminal();
+        logToTerminal(`[INIT] Reattaching to ${job.label} (${job.status})...`, "system");
+        connectStream(`/tools/ram/stream/jobs/${jobId}`);
+    } catch (e) {
+        console.error("Job reattach failed", e);
+    }
+}
+
 async function stopProcess() {
-    if (!eventSource) return;
+    if (!eventSource && !currentJobId) return;
 
     logToTerminal("[!] Sending termination signal...", "error");
     try {
-        await fetch('/tools/ram/api/stop', { method: 'POST' });
+        // The job's output (including the cancellation notice) keeps arriving on the stream
+        await fetch('/tools/ram/api/stop', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ job_id: currentJobId }),
+        });
     } catch (e) {
         console.error(e);
     }
-
-    if (eventSource) {
-        eventSource.close();
-        eventSource = null;
-        logToTerminal(">>> CONNECTION TERMINATED BY USER <<<", "error");
-    }
 }
 
 // === UTILS ===
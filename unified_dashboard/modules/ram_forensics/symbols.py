@@ -0,0 +1,168 @@
+import os
+import json
+import shutil
+import zipfile
+import datetime
+import subprocess
+import threading
+
+try:
+    from . import jobs
+except ImportError:  # running as a script (main.py)
+    import jobs
+
+# ================= SYMBOL / ISF STORE =================
+# Every Volatility run points at a managed symbol directory and cache path
+# instead of the per-user defaults. A dump can be warmed up once (windows.info
+# resolves and stores its kernel ISF), and symbol packs (the Volatility
+# windows.zip / linux.zip / mac.zip archives) can be imported from disk so
+# air-gapped hosts never need to download anything.
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+SYMBOLS_DIR = os.environ.get("RAM_SYMBOLS_DIR", os.path.join(MODULE_DIR, "symbols"))
+CACHE_DIR = os.environ.get("RAM_VOL_CACHE_DIR", os.path.join(MODULE_DIR, "vol_cache"))
+# Air-gapped hosts: never try to download symbols
+OFFLINE = os.environ.get("RAM_VOL_OFFLINE", "0") == "1"
+
+WARM_MANIFEST = os.path.join(SYMBOLS_DIR, "warm.json")
+ISF_SUFFIXES = (".json", ".json.xz", ".json.gz", ".json.bz2")
+# Volatility only loads symbol packs stored under these names
+PACK_OSES = ("windows", "linux", "mac")
+
+_manifest_lock = threading.Lock()
+
+
+def vol_args():
+    """Global Volatility options that route symbol lookup and caching to the managed store."""
+    os.makedirs(SYMBOLS_DIR, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    args = ["-s", SYMBOLS_DIR, "--cache-path", CACHE_DIR]
+    if OFFLINE:
+        args.append("--offline")
+    return args
+
+
+def _load_manifest():
+    try:
+        with open(WARM_MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def warm_entry(dump_hash):
+    """Warm-up record for a dump ({"symbols", "warmed_at", ...}) or None."""
+    with _manifest_lock:
+        return _load_manifest().get(dump_hash)
+
+
+def record_warm(dump_hash, entry):
+    with _manifest_lock:
+        manifest = _load_manifest()
+        manifest[dump_hash] = entry
+        os.makedirs(SYMBOLS_DIR, exist_ok=True)
+        tmp = WARM_MANIFEST + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, WARM_MANIFEST)
+
+
+def record_from_info(dump_hash, dump_name, info_lines):
+    """Record a dump as warm from windows.info output; returns the entry, or None if no symbols resolved."""
+    info = {}
+    for line in info_lines:
+        key, _, value = line.strip().partition("\t")
+        info[key] = value
+    if not info.get("Symbols"):
+        return None
+    entry = {
+        "dump": dump_name,
+        "symbols": info["Symbols"],
+        "kernel_base": info.get("Kernel Base"),
+        "warmed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    record_warm(dump_hash, entry)
+    return entry
+
+
+def stream_warmup(vol_path, dump_path, dump_hash):
+    """
+    Resolve and store the kernel symbols for a dump by running windows.info
+    against the managed store. Yields output lines like the other stream_* helpers.
+    """
+    yield f"[*] Warming symbol cache for {os.path.basename(dump_path)}\n"
+    yield f"[*] Symbol store: {SYMBOLS_DIR}{' (offline)' if OFFLINE else ''}\n"
+    abs_path = os.path.abspath(dump_path)
+    cmd = [vol_path] + vol_args() + ["-f", abs_path, "--single-location", f"file://{abs_path}", "windows.info"]
+
+    lines = []
+    try:
+        with jobs.managed_process(cmd, vol=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as proc:
+            for line in proc.stdout:
+                lines.append(line)
+                yield line
+            proc.wait()
+    except jobs.JobCancelled:
+        raise
+    except Exception as e:
+        yield f"[-] Warm-up error: {e}\n"
+        return
+
+    entry = record_from_info(dump_hash, os.path.basename(dump_path), lines) if proc.returncode == 0 else None
+    if not entry:
+        hint = "Import a symbol pack" if OFFLINE else "Check Internet access or import a symbol pack"
+        yield f"\n[!] Could not resolve kernel symbols. {hint}.\n"
+        return
+    yield f"\n[+] Symbols cached: {entry['symbols']}\n"
+
+
+def _pack_os(name, entries):
+    """Which OS a pack is for: from its file name (e.g. 'windows (1).zip'), else its top-level folder."""
+    stem = os.path.splitext(name)[0].lower()
+    matches = [os_name for os_name in PACK_OSES if os_name in stem]
+    if len(matches) == 1:
+        return matches[0]
+    tops = {entry.replace("\\", "/").split("/", 1)[0].lower()
+            for entry in entries if entry.lower().endswith(ISF_SUFFIXES)}
+    if len(tops) == 1 and tops <= set(PACK_OSES):
+        return tops.pop()
+    return None
+
+
+def import_symbol_pack(src_path, name=None):
+    """
+    Import an offline symbol pack into the store. Zip packs are copied as-is
+    (Volatility reads them directly); the archive must contain ISF files.
+    The pack is stored as windows.zip / linux.zip / mac.zip, the only names
+    Volatility loads, replacing the previous pack for that OS.
+    Returns the stored file name; raises ValueError for anything else.
+    """
+    name = os.path.basename(name or src_path)
+    if not name.lower().endswith(".zip") or not zipfile.is_zipfile(src_path):
+        raise ValueError("Symbol packs must be .zip archives")
+    with zipfile.ZipFile(src_path) as zf:
+        entries = zf.namelist()
+    if not any(entry.lower().endswith(ISF_SUFFIXES) for entry in entries):
+        raise ValueError("Archive contains no ISF (.json / .json.xz) symbol files")
+    os_name = _pack_os(name, entries)
+    if os_name is None:
+        raise ValueError("Cannot tell which OS the pack is for; name it windows.zip, linux.zip or mac.zip")
+    name = f"{os_name}.zip"
+
+    os.makedirs(SYMBOLS_DIR, exist_ok=True)
+    dest = os.path.join(SYMBOLS_DIR, name)
+    tmp = dest + ".tmp"
+    shutil.copyfile(src_path, tmp)
+    os.replace(tmp, dest)
+    return name
+
+
+def store_status():
+    """Summary of the symbol store for the status API."""
+    packs = []
+    if os.path.isdir(SYMBOLS_DIR):
+        packs = [{"name": f, "size": os.path.getsize(os.path.join(SYMBOLS_DIR, f))}
+                 for f in sorted(os.listdir(SYMBOLS_DIR)) if f.lower().endswith(".zip")]
+    with _manifest_lock:
+        warmed = _load_manifest()
+    return {"symbols_dir": SYMBOLS_DIR, "offline": OFFLINE, "packs": packs, "warmed": warmed}
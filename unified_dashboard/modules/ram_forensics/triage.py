@@ -0,0 +1,350 @@
+import os
+import re
+import json
+import mmap
+import time
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# ================= QUICK TRIAGE =================
+# Fast first look at a dump before any Volatility run. The file is mmap'd and
+# split into chunks that worker processes scan in parallel: per-block entropy,
+# a byte histogram and an IOC search (IPs, URLs, known bad strings, kernel
+# signatures). Hashes are computed alongside from the same mapping. Nothing is
+# read into memory wholesale; results go to a `<dump>.triage.json` sidecar
+# that is reused while the dump is unchanged.
+#
+# A regex run over every byte manages only a few MB/s, so the IOC search
+# never does that. Literal IOCs (bad strings in ASCII and UTF-16LE, kernel
+# signatures) are found with bytes.find on a lowercased copy of the chunk.
+# IPv4 and URL regexes only run on small windows around candidates: a
+# digit-dot-digit triple (found with NumPy) or "://". Each kind is searched
+# independently, so e.g. an IP inside a URL is reported under both kinds.
+
+CHUNK_SIZE = 64 * 1024 * 1024   # work unit per worker
+BLOCK_SIZE = 1024 * 1024        # entropy map resolution
+HASH_CHUNK = 16 * 1024 * 1024
+OVERLAP = 512                   # bytes re-scanned past a chunk end so matches can span chunks
+PREFILTER_BLOCK = 8 * 1024 * 1024  # NumPy candidate search granularity (bounds temporary arrays)
+MAX_HITS_PER_KIND = 500         # distinct values kept per IOC kind
+WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+IOC_FILE = os.path.join(MODULE_DIR, "ioc_strings.txt")
+
+# Used when ioc_strings.txt is absent; one string per line in that file otherwise
+DEFAULT_IOC_STRINGS = [
+    "mimikatz", "sekurlsa", "meterpreter", "metsrv", "cobaltstrike", "beacon.dll",
+    "invoke-mimikatz", "powersploit", "psexesvc", "lsadump", "reflectiveloader",
+]
+
+IPV4_RE = re.compile(rb"(?<![\d.])(?:(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)\.){3}(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(?![\d.])")
+URL_RE = re.compile(rb"(?:https?|ftp)://[A-Za-z0-9.\-]{3,253}(?::\d{1,5})?(?:/[\x21-\x7e]{0,200})?", re.IGNORECASE)
+# Candidate windows: an IPv4 address spans at most 12 bytes before its first dot and
+# 4 after its last one (plus one byte for the lookahead); a URL starts at most 5 bytes
+# before "://" and is at most 3 + 253 + 6 + 201 bytes long from there
+IPV4_WINDOW = (12, 6)
+URL_WINDOW = (5, 3 + 253 + 6 + 201 + 1)
+
+# name -> (lowercase literal to find, optional case-insensitive regex for the full value at the hit)
+KERNEL_SIGNATURES = {
+    "windows_kdbg": (b"\x00" * 8 + b"kdbg", None),
+    "windows_ntoskrnl": (b"ntoskrnl.exe", None),
+    "linux_banner": (b"linux version ", re.compile(rb"Linux version \d+\.\d+[\x20-\x7e]{0,200}", re.IGNORECASE)),
+}
+
+LOWER = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
+
+
+def load_ioc_strings():
+    if os.path.exists(IOC_FILE):
+        with open(IOC_FILE, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return list(DEFAULT_IOC_STRINGS)
+
+
+def build_literals(ioc_strings):
+    """(kind, lowercase needle, value regex or None) for every literal searched in a chunk."""
+    literals = [("bad_string", s.lower().encode("ascii"), None) for s in ioc_strings if s and s.isascii()]
+    for name, (needle, value_re) in KERNEL_SIGNATURES.items():
+        literals.append((name, needle, value_re))
+    return literals
+
+
+def _find_all(buf, needle, lo, hi):
+    """Start offsets of non-overlapping occurrences of `needle` starting in [lo, hi)."""
+    pos = buf.find(needle, lo)
+    while pos != -1 and pos < hi:
+        yield pos
+        pos = buf.find(needle, pos + len(needle))
+
+
+def _find_wide(lowered, halves, needle, lo, hi):
+    """
+    Offsets of the UTF-16LE form of an ASCII needle in [lo, hi). Rather than search for the
+    interleaved needle, search the plain one in the even and odd byte halves of the buffer
+    and check the bytes in between are zero.
+    """
+    zeros = b"\x00" * len(needle)
+    found = []
+    for parity, half in enumerate(halves):
+        for q in _find_all(half, needle, max(0, lo - parity) // 2, len(half)):
+            pos = 2 * q + parity
+            if pos >= hi:
+                break
+            if pos >= lo and lowered[pos + 1:pos + 2 * len(needle):2] == zeros:
+                found.append(pos)
+    return sorted(found)
+
+
+def _ipv4_candidates(buf, lo, hi):
+    """Offsets of digit-dot-digit triples (the dot) in [lo, hi), found block by block with NumPy."""
+    found = [np.zeros(0, dtype=np.int64)]
+    for block_lo in range(lo, hi, PREFILTER_BLOCK):
+        block_hi = min(hi, block_lo + PREFILTER_BLOCK)
+        # One byte of context on each side of the block
+        a = max(1, block_lo) - 1
+        d = np.frombuffer(buf, dtype=np.uint8, count=min(len(buf), block_hi + 1) - a, offset=a)
+        digit = (d - 48) < 10  # uint8 wraps, so this is '0' <= d <= '9'
+        dots = (d[1:-1] == 46) & digit[:-2] & digit[2:]
+        pos = np.flatnonzero(dots) + (a + 1)
+        found.append(pos[(pos >= block_lo) & (pos < block_hi)])
+    return np.concatenate(found)
+
+
+def _windowed_matches(regex, buf, candidates, window, lo, hi):
+    """
+    Matches of `regex` starting in [lo, hi), searched only in windows around candidate
+    offsets (ascending). Overlapping windows are merged, so each match is seen once.
+    """
+    candidates = np.asarray(candidates, dtype=np.int64)
+    if not candidates.size:
+        return
+    before, after = window
+    # A new window starts wherever the gap to the previous candidate is wider than a window
+    breaks = np.flatnonzero(np.diff(candidates) > before + after)
+    starts = np.concatenate(([candidates[0]], candidates[breaks + 1])) - before
+    ends = np.concatenate((candidates[breaks], [candidates[-1]])) + after
+    for win_lo, win_hi in zip(np.maximum(starts, 0).tolist(), np.minimum(ends, len(buf)).tolist()):
+        for m in regex.finditer(buf, win_lo, win_hi):
+            if lo <= m.start() < hi:
+                yield m
+
+
+def _entropy(counts, total):
+    """Shannon entropy in bits/byte from a byte histogram (rows = blocks)."""
+    p = counts / np.maximum(total, 1)[..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.where(p > 0, np.log2(p), 0.0)
+    return -(p * logs).sum(axis=-1) + 0.0  # + 0.0 turns -0.0 into 0.0
+
+
+def _scan_chunk(path, start, length, ioc_strings):
+    """Worker: scan one chunk of the dump. Runs in a separate process with its own mapping."""
+    literals = build_literals(ioc_strings)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8, count=length, offset=start)
+
+        # Per-block histograms -> entropy map; the chunk histogram is their sum
+        nblocks = -(-length // BLOCK_SIZE)
+        block_counts = np.zeros((nblocks, 256), dtype=np.int64)
+        block_sizes = np.zeros(nblocks, dtype=np.int64)
+        for i in range(nblocks):
+            block = data[i * BLOCK_SIZE:(i + 1) * BLOCK_SIZE]
+            block_counts[i] = np.bincount(block, minlength=256)
+            block_sizes[i] = block.size
+        entropy = _entropy(block_counts.astype(np.float64), block_sizes.astype(np.float64))
+        zero_blocks = int((block_counts[:, 0] == block_sizes).sum())
+        histogram = block_counts.sum(axis=0)
+        # Drop the views on the mapping, otherwise it can't be closed
+        del data, block
+
+        # IOC search over a copy of the chunk plus an overlap on each side: matches starting in the
+        # trailing overlap belong to the next chunk, the leading one only feeds lookbehinds
+        lead = min(start, OVERLAP)
+        buf = mm[start - lead:min(len(mm), start + length + OVERLAP)]
+    hits = scan_iocs(buf, lead, lead + length, literals, base=start - lead)
+
+    return {
+        "entropy": entropy.round(3).tolist(),
+        "zero_blocks": zero_blocks,
+        "histogram": histogram.tolist(),
+        "hits": hits,
+    }
+
+
+def scan_iocs(buf, lo, hi, literals, base=0):
+    """
+    IOC hits for matches starting in buf[lo:hi] (the rest is overlap context):
+    {kind: {value: [count, first_offset]}}, offsets shifted by `base`.
+    """
+    hits = {}
+
+    def add(kind, value, offset):
+        value = value.replace(b"\x00", b"").decode("ascii", "replace")
+        kind_hits = hits.setdefault(kind, {})
+        if value in kind_hits:
+            kind_hits[value][0] += 1
+        elif len(kind_hits) < MAX_HITS_PER_KIND:
+            kind_hits[value] = [1, base + offset]
+
+    lowered = buf.translate(LOWER)
+    for kind, needle, value_re in literals:
+        for pos in _find_all(lowered, needle, lo, hi):
+            if value_re is None:
+                add(kind, buf[pos:pos + len(needle)], pos)
+            else:
+                m = value_re.match(buf, pos)
+                if m:
+                    add(kind, m.group(), pos)
+    # UTF-16LE forms of the bad strings, common in Windows memory
+    halves = (lowered[0::2], lowered[1::2])
+    for kind, needle, value_re in literals:
+        if kind == "bad_string":
+            for pos in _find_wide(lowered, halves, needle, lo, hi):
+                add(kind, buf[pos:pos + 2 * len(needle)], pos)
+    del lowered, halves
+
+    for m in _windowed_matches(IPV4_RE, buf, _ipv4_candidates(buf, lo, len(buf)), IPV4_WINDOW, lo, hi):
+        add("ipv4", m.group(), m.start())
+    for m in _windowed_matches(URL_RE, buf, list(_find_all(buf, b"://", lo, len(buf))), URL_WINDOW, lo, hi):
+        add("url", m.group(), m.start())
+    return hits
+
+
+def _hash_file(path, out):
+    """MD5 + SHA-256 over the mapping; hashlib releases the GIL on large updates."""
+    md5, sha256 = hashlib.md5(), hashlib.sha256()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            for offset in range(0, len(mm), HASH_CHUNK):
+                piece = view[offset:offset + HASH_CHUNK]
+                md5.update(piece)
+                sha256.update(piece)
+                piece.release()
+        finally:
+            view.release()
+    out["md5"] = md5.hexdigest()
+    out["sha256"] = sha256.hexdigest()
+
+
+def sidecar_path(path):
+    return path + ".triage.json"
+
+
+def load_index(path):
+    """The stored triage index if it still matches the dump's size and mtime, else None."""
+    try:
+        with open(sidecar_path(path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stat = os.stat(path)
+    if index.get("size") != stat.st_size or index.get("mtime") != stat.st_mtime:
+        return None
+    return index
+
+
+def triage(path, workers=WORKERS, on_progress=None):
+    """
+    Triage a dump and write its sidecar index. `on_progress(chunks_done, chunks_total)`
+    is called as chunks finish. Returns the index dict.
+    """
+    started = time.time()
+    stat = os.stat(path)
+    size = stat.st_size
+    if size == 0:
+        raise ValueError("Dump is empty")
+    ioc_strings = load_ioc_strings()
+
+    hashes = {}
+    hasher = threading.Thread(target=_hash_file, args=(path, hashes), daemon=True)
+    hasher.start()
+
+    chunks = [(start, min(CHUNK_SIZE, size - start)) for start in range(0, size, CHUNK_SIZE)]
+    histogram = np.zeros(256, dtype=np.int64)
+    entropy_map = []
+    zero_blocks = 0
+    merged = {}
+    # spawn: workers must not inherit the web server's monkey-patched state
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_scan_chunk, path, start, length, ioc_strings) for start, length in chunks]
+        # Collected in submission order, which keeps the entropy map in file order
+        for done, fut in enumerate(futures, 1):
+            part = fut.result()
+            entropy_map += part["entropy"]
+            zero_blocks += part["zero_blocks"]
+            histogram += np.array(part["histogram"], dtype=np.int64)
+            for kind, values in part["hits"].items():
+                kind_hits = merged.setdefault(kind, {})
+                for value, (count, offset) in values.items():
+                    if value in kind_hits:
+                        kind_hits[value]["count"] += count
+                        kind_hits[value]["first_offset"] = min(kind_hits[value]["first_offset"], offset)
+                    elif len(kind_hits) < MAX_HITS_PER_KIND:
+                        kind_hits[value] = {"value": value, "count": count, "first_offset": offset}
+            if on_progress:
+                on_progress(done, len(chunks))
+    hasher.join()
+
+    iocs = {kind: sorted(values.values(), key=lambda h: -h["count"]) for kind, values in merged.items()}
+    signatures = {name: iocs.pop(name) for name in KERNEL_SIGNATURES if name in iocs}
+
+    index = {
+        "file": os.path.basename(path),
+        "size": size,
+        "mtime": stat.st_mtime,
+        "md5": hashes.get("md5"),
+        "sha256": hashes.get("sha256"),
+        "block_size": BLOCK_SIZE,
+        "entropy_map": entropy_map,
+        "entropy_mean": round(float(np.mean(entropy_map)), 3),
+        "high_entropy_blocks": sum(1 for e in entropy_map if e >= 7.5),
+        "zero_blocks": zero_blocks,
+        "histogram": histogram.tolist(),
+        "overall_entropy": round(float(_entropy(histogram.astype(np.float64), np.float64(size))), 3),
+        "iocs": iocs,
+        "kernel": {
+            "os_guess": guess_os(signatures),
+            "signatures": {name: hits[0] for name, hits in signatures.items()},
+        },
+        "elapsed_seconds": round(time.time() - started, 2),
+    }
+
+    tmp = sidecar_path(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp, sidecar_path(path))
+    return index
+
+
+def guess_os(signatures):
+    if "windows_kdbg" in signatures or "windows_ntoskrnl" in signatures:
+        return "windows"
+    if "linux_banner" in signatures:
+        banner = signatures["linux_banner"][0]["value"].lower()
+        return "android" if "android" in banner else "linux"
+    return "unknown"
+
+
+def summary_lines(index):
+    """Human-readable summary of a triage index for the terminal stream."""
+    yield f"[+] Size: {index['size']} bytes ({len(index['entropy_map'])} x {index['block_size'] // 1024} KiB blocks)\n"
+    yield f"[+] MD5: {index['md5']}\n"
+    yield f"[+] SHA-256: {index['sha256']}\n"
+    yield f"[+] Entropy: overall {index['overall_entropy']} bits/byte, block mean {index['entropy_mean']}, " \
+          f"{index['high_entropy_blocks']} high-entropy blocks, {index['zero_blocks']} zero blocks\n"
+    kernel = index["kernel"]
+    yield f"[+] Kernel: {kernel['os_guess']}\n"
+    for name, hit in kernel["signatures"].items():
+        yield f"    {name} @ 0x{hit['first_offset']:x}: {hit['value'][:120]}\n"
+    for kind, hits in index["iocs"].items():
+        yield f"[+] {kind}: {len(hits)} distinct value(s)\n"
+        for hit in hits[:10]:
+            yield f"    {hit['value'][:120]} (x{hit['count']}, first @ 0x{hit['first_offset']:x})\n"
+    yield f"[+] Triage finished in {index['elapsed_seconds']}s\n"
@@ -4,6 +4,21 @@ import shutil
 import datetime
 import time
 import ctypes
+import queue
+import tempfile
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from . import results, symbols, triage, jobs, acquisition, catalog
+except ImportError:  # running as a script (main.py)
+    import results
+    import symbols
+    import triage
+    import jobs
+    import acquisition
+    import catalog
 
 # ================= CONFIG =================
 def find_tool(tool_name, local_fallback=None):
@@ -34,26 +49,13 @@ VOL_PLUGINS = [
     ["windows.registry.printkey", "--key", "ControlSet001\\Services\\Tcpip\\Parameters"]
 ]
 
+# Plugins run concurrently, each as its own vol process; bounded so several
+# multi-GB scans don't thrash the host
+MAX_PARALLEL_PLUGINS = max(1, min(len(VOL_PLUGINS), os.cpu_count() or 1))
+
 def get_timestamp():
     return datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
-# ================= LOGIC GENERATORS =================
-CURRENT_PROCESS = None
-
-def kill_process():
-    """Kill the currently running background process."""
-    global CURRENT_PROCESS
-    if CURRENT_PROCESS and CURRENT_PROCESS.poll() is None:
-        try:
-            CURRENT_PROCESS.terminate()
-            time.sleep(0.5)
-            if CURRENT_PROCESS.poll() is None:
-                CURRENT_PROCESS.kill()
-            return True
-        except Exception:
-            return False
-    return False
-
 def is_admin():
     try:
         return ctypes.windll.shell32.IsUserAnAdmin()
@@ -95,36 +97,37 @@ def stream_extract_windows():
 
     yield "[*] Starting RAM acquisition on Windows...\n"
     timestamp = get_timestamp()
-    dump_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"memory_dump_windows_{timestamp}.raw")
+    catalog.init()
+    dump_file = catalog.evidence_path(f"memory_dump_windows_{timestamp}.raw")
 
     try:
         cmd = [WINPMEM_PATH, "acquire", dump_file]
         yield f"[*] Executing: {' '.join(cmd)}\n"
         
         # Run subprocess and capture output real-time
-        CURRENT_PROCESS = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-        
-        for line in CURRENT_PROCESS.stdout:
-            yield line
-        
-        CURRENT_PROCESS.wait()
-        
-        if CURRENT_PROCESS.returncode == 0:
+        with jobs.managed_process(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as proc:
+            for line in proc.stdout:
+                yield line
+            proc.wait()
+
+        if jobs.cancelled() or proc.returncode < 0:
+            yield "\n[!] Process Terminated by User.\n"
+        elif proc.returncode == 0:
+            catalog.register(os.path.basename(dump_file), platform="windows")
             yield f"\n[+] RAM dump saved as {dump_file}\n"
             yield f"[+] Filename: {os.path.basename(dump_file)}\n"
-        elif CURRENT_PROCESS.returncode is not None:
-             if CURRENT_PROCESS.returncode < 0:
-                  yield "\n[!] Process Terminated by User.\n"
-             else:
-                  yield f"\n[-] Process exited with code {CURRENT_PROCESS.returncode}\n"
-        
-        CURRENT_PROCESS = None
+        else:
+            yield f"\n[-] Process exited with code {proc.returncode}\n"
             
     except Exception as e:
         yield f"[-] Error: {e}\n"
-        CURRENT_PROCESS = None
 
-def stream_extract_android():
+def stream_extract_android(mode="stream", compression="none", resume=None):
+    """
+    mode "stream": dd piped over adb exec-out straight to the host (hashed, optionally
+    compressed, resumable by passing the interrupted dump's name as `resume`).
+    mode "pull": legacy dd to /sdcard, adb pull, then delete.
+    """
     yield "[*] Checking ADB connection...\n"
     try:
         subprocess.run([ADB_PATH, "devices"], check=True, capture_output=True)
@@ -151,87 +154,276 @@ def stream_extract_android():
 
     yield "[+] Root access confirmed. Starting extraction...\n"
     timestamp = get_timestamp()
-    dump_filename = f"memory_dump_android_{timestamp}.raw"
-    local_dump_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), dump_filename)
+    dump_filename = os.path.basename(resume) if resume else f"memory_dump_android_{timestamp}.raw"
+    catalog.init()
+    local_dump_file = catalog.evidence_path(dump_filename)
+
+    if mode == "stream":
+        yield from acquisition.stream_dd(ADB_PATH, local_dump_file, compression, resume=bool(resume))
+        for suffix in acquisition.SUFFIXES.values():
+            if os.path.exists(local_dump_file + suffix):
+                catalog.register(dump_filename + suffix, platform="android")
+        return
     remote_path = "/sdcard/memory_dump.raw"
 
+    def run_step(cmd):
+        with jobs.managed_process(cmd) as proc:
+            proc.wait()
+        if jobs.cancelled():
+            raise jobs.JobCancelled()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
     try:
         cmd = [ADB_PATH, "shell", f"su -c 'dd if=/dev/mem of={remote_path}'"] 
         yield "[*] Dumping memory to internal storage (processing)...\n"
         
         # DD output is usually silent or on stderr, we just wait here
-        subprocess.run(" ".join(cmd), shell=True, check=True)
+        run_step(cmd)
         yield "[+] Dump created on device.\n"
 
         yield f"[*] Pulling {remote_path} to PC...\n"
-        subprocess.run([ADB_PATH, "pull", remote_path, local_dump_file], check=True)
+        run_step([ADB_PATH, "pull", remote_path, local_dump_file])
         
         yield "[*] Cleaning up temporary files...\n"
-        subprocess.run([ADB_PATH, "shell", f"rm {remote_path}"], check=True)
+        run_step([ADB_PATH, "shell", f"rm {remote_path}"])
 
+        catalog.register(dump_filename, platform="android")
         yield f"[+] Android RAM dump saved as {local_dump_file}\n"
+    except jobs.JobCancelled:
+        # Killing the local adb doesn't stop dd on the device
+        subprocess.run([ADB_PATH, "shell", f"su -c 'pkill -f \"dd if=/dev/mem\"; rm -f {remote_path}'"],
+                       capture_output=True)
+        yield "\n[!] Process Terminated by User.\n"
     except Exception as e:
         yield f"[-] Error: {e}\n"
 
-def stream_analyze(filename, platform="windows"):
-    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+def stream_warm_symbols(filename):
+    """Pre-build the symbol cache for a dump so later analyses skip symbol resolution."""
+    file_path = catalog.evidence_path(filename)
     if not os.path.exists(file_path):
         yield f"[-] Error: File {filename} not found.\n"
         return
-
     if not VOL_PATH:
         yield "[-] Error: Volatility not found.\n"
         return
+    yield "[*] Hashing dump...\n"
+    yield from symbols.stream_warmup(VOL_PATH, file_path, results.dump_sha256(file_path))
+
+def stream_triage(filename, refresh=False):
+    """Quick mmap/NumPy triage of a dump (hashes, entropy, IOC hits, kernel signature)."""
+    file_path = catalog.evidence_path(filename)
+    if not os.path.exists(file_path):
+        yield f"[-] Error: File {filename} not found.\n"
+        return
+
+    index = None if refresh else triage.load_index(file_path)
+    if index:
+        yield f"[*] Using triage index from {os.path.basename(triage.sidecar_path(file_path))}\n"
+    else:
+        yield f"[*] Triaging {filename} ({triage.WORKERS} workers)...\n"
+        progress = queue.Queue()
+        outcome = {}
+
+        def run():
+            try:
+                outcome["index"] = triage.triage(file_path, on_progress=lambda done, total: progress.put((done, total)))
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                progress.put(None)
+
+        threading.Thread(target=run, daemon=True).start()
+        while True:
+            item = progress.get()
+            if item is None:
+                break
+            done, total = item
+            yield f"[*] Scanned chunk {done}/{total}\n"
+        if "error" in outcome:
+            yield f"[-] Triage error: {outcome['error']}\n"
+            return
+        index = outcome["index"]
+        # Later analyses reuse this hash instead of reading the dump again
+        results.remember_sha256(file_path, index["sha256"])
+
+    yield from triage.summary_lines(index)
+
+def find_plugins(names):
+    """VOL_PLUGINS entries matching the given plugin names (all plugins if names is empty)."""
+    if not names:
+        return list(VOL_PLUGINS)
+    return [p for p in VOL_PLUGINS if p[0] in names]
+
+def stream_analyze(filename, platform="windows", plugins=None, refresh=False):
+    """
+    Run Volatility plugins on a dump and stream their output.
+    `plugins` limits the run to VOL_PLUGINS entries by name; results already cached
+    for this dump are replayed instead of re-running the plugin unless `refresh`.
+    """
+    catalog.init()
+    file_path = catalog.evidence_path(filename)
+    if not os.path.exists(file_path):
+        yield f"[-] Error: File {filename} not found.\n"
+        return
+
+    selected = find_plugins(plugins)
+    if not selected:
+        yield f"[-] Error: Unknown plugin(s): {', '.join(plugins)}\n"
+        return
+
+    yield f"[*] Analyzing {platform} dump: {filename}\n"
+    yield "[*] Hashing dump for the result cache...\n"
+    dump_hash = results.dump_sha256(file_path)
+    yield f"[*] SHA-256: {dump_hash}\n"
+
+    cached = {} if refresh else {p[0]: results.load(dump_hash, p) for p in selected}
+    pending = [p for p in selected if not cached.get(p[0])]
+
+    if pending and not VOL_PATH:
+        yield "[-] Error: Volatility not found.\n"
+        return
 
     # Location args
     abs_path = os.path.abspath(file_path)
     file_uri = f"file://{abs_path}"
-    base_vol_args = [VOL_PATH, "-f", abs_path, "--single-location", file_uri]
+    base_vol_args = [VOL_PATH] + symbols.vol_args() + ["-f", abs_path, "--single-location", file_uri]
 
-    yield f"[*] Analyzing {platform} dump: {filename}\n"
-    yield "[*] Running Pre-check (windows.info)...\n"
+    warm = symbols.warm_entry(dump_hash)
+    if pending and warm:
+        yield f"[*] Kernel symbols already cached ({warm['symbols']}); skipping pre-check.\n"
+    elif pending:
+        yield "[*] Running Pre-check (windows.info)...\n"
 
-    # Pre-check
-    try:
-        check_proc = subprocess.Popen(base_vol_args + ["windows.info"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-        for line in check_proc.stdout:
-            yield line
-        check_proc.wait()
-        
-        if check_proc.returncode != 0:
-             yield "\n[!] Pre-check failed. Volatility may need Internet access for symbols.\n"
-    except Exception as e:
-        yield f"[-] Pre-check error: {e}\n"
+        # Pre-check
+        try:
+            info_lines = []
+            with jobs.managed_process(base_vol_args + ["windows.info"], vol=True,
+                                      stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as check_proc:
+                for line in check_proc.stdout:
+                    info_lines.append(line)
+                    yield line
+                check_proc.wait()
 
-    # Plugins
+            # A successful pre-check warms the symbol store for the next run of this dump
+            if check_proc.returncode == 0:
+                symbols.record_from_info(dump_hash, os.path.basename(file_path), info_lines)
+
+            if check_proc.returncode != 0:
+                 yield "\n[!] Pre-check failed. Volatility may need Internet access for symbols, or import a symbol pack.\n"
+        except jobs.JobCancelled:
+            raise
+        except Exception as e:
+            yield f"[-] Pre-check error: {e}\n"
+
+    # Plugins (run concurrently; output is multiplexed as "[plugin] line")
     timestamp = get_timestamp()
     report_filename = f"report_{platform}_{timestamp}.txt"
-    report_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), report_filename)
-    
-    with open(report_path, "w", encoding="utf-8") as report:
-        report.write(f"Analysis Report {timestamp}\nTarget: {filename}\n\n")
-
-        for plugin in VOL_PLUGINS:
-            yield f"\n=== Running Plugin: {plugin[0]} ===\n"
-            report.write(f"\n=== Plugin: {plugin[0]} ===\n")
-            
-            cmd = base_vol_args + plugin
-            try:
-                CURRENT_PROCESS = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-                for line in CURRENT_PROCESS.stdout:
-                    yield line
-                    report.write(line)
-                CURRENT_PROCESS.wait()
-                
-                if CURRENT_PROCESS.returncode != 0:
-                    if CURRENT_PROCESS.returncode < 0:
-                         yield "\n[!] Analysis Terminated by User.\n"
-                         break
-                    yield f"\n[!] Plugin exited with code {CURRENT_PROCESS.returncode}\n"
-            except Exception as e:
-                yield f"[-] Plugin Error: {e}\n"
-                report.write(f"Error: {e}\n")
-    
-    CURRENT_PROCESS = None
+    report_path = catalog.evidence_path(report_filename)
+
+    sections = [tempfile.TemporaryFile(mode="w+", encoding="utf-8") for _ in selected]
+    for index, plugin in enumerate(selected):
+        result = cached.get(plugin[0])
+        if result:
+            yield f"\n=== Plugin: {plugin[0]} (cached, {len(result['rows'])} rows) ===\n"
+            for line in results.render_text(result["columns"], result["rows"]):
+                sections[index].write(line)
+                yield f"[{plugin[0]}] {line}"
+
+    if pending:
+        yield f"\n=== Running {len(pending)} plugins ({MAX_PARALLEL_PLUGINS} in parallel) ===\n"
+    events = queue.Queue()
+    stopped = threading.Event()
+    running = set()  # this analysis' vol processes
+
+    def run_plugin(index, plugin):
+        name = plugin[0]
+        if stopped.is_set():
+            events.put((name, None, "skipped"))
+            return
+        # JSON goes to a temp file (the renderer emits it all at the end);
+        # stderr carries Volatility's progress lines and is streamed live
+        raw = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        status = -1
+        try:
+            # Waits here for a slot when other jobs already use the global Volatility cap
+            with jobs.managed_process(base_vol_args[:1] + ["-r", "json"] + base_vol_args[1:] + plugin, vol=True,
+                                      stdout=raw, stderr=subprocess.PIPE, text=True) as proc:
+                running.add(proc)
+                events.put((name, None, "started"))
+                for line in proc.stderr:
+                    events.put((name, line, None))
+                status = proc.wait()
+                running.discard(proc)
+            if jobs.cancelled():
+                status = -1
+            raw.seek(0)
+            output = raw.read()
+            if status == 0:
+                try:
+                    columns, rows = results.parse_json_output(output)
+                    results.save(dump_hash, plugin, columns, rows)
+                    lines = results.render_text(columns, rows)
+                except ValueError:
+                    lines = output.splitlines(keepends=True)
+            else:
+                lines = output.splitlines(keepends=True)
+            for line in lines:
+                sections[index].write(line)
+                events.put((name, line, None))
+        except jobs.JobCancelled:
+            status = "skipped"
+        except Exception as e:
+            sections[index].write(f"Error: {e}\n")
+            status = f"error: {e}"
+        finally:
+            raw.close()
+            events.put((name, None, status))
+
+    pool = ThreadPoolExecutor(max_workers=MAX_PARALLEL_PLUGINS)
+    try:
+        for index, plugin in enumerate(selected):
+            if plugin in pending:
+                # Workers inherit the job context so their processes are registered with it
+                pool.submit(contextvars.copy_context().run, run_plugin, index, plugin)
+
+        finished = 0
+        while finished < len(pending):
+            name, line, status = events.get()
+            if line is not None:
+                yield f"[{name}] {line}"
+                continue
+            if status == "started":
+                yield f"\n=== Started Plugin: {name} ===\n"
+                continue
+            finished += 1
+            if status == "skipped":
+                continue
+            if isinstance(status, str):
+                yield f"[-] Plugin Error ({name}): {status[7:]}\n"
+            elif status < 0:
+                if not stopped.is_set():
+                    yield "\n[!] Analysis Terminated by User.\n"
+                stopped.set()
+            elif status != 0:
+                yield f"\n[!] Plugin {name} exited with code {status}\n"
+            else:
+                yield f"=== Finished Plugin: {name} ===\n"
+    finally:
+        # Client went away or analysis was stopped: don't leave vol processes running
+        stopped.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        for proc in list(running):
+            jobs.kill_tree(proc)
+
+        # Report sections always follow VOL_PLUGINS order, whatever order plugins finished in
+        with open(report_path, "w", encoding="utf-8") as report:
+            report.write(f"Analysis Report {timestamp}\nTarget: {filename}\nSHA-256: {dump_hash}\n\n")
+            for plugin, section in zip(selected, sections):
+                report.write(f"\n=== Plugin: {plugin[0]} ===\n")
+                section.seek(0)
+                shutil.copyfileobj(section, report)
+                section.close()
+        catalog.register(report_filename, source_dump=os.path.basename(file_path), platform=platform)
 
     yield f"\n[+] Analysis Complete. Report saved to {report_filename}\n"
@@ -0,0 +1,113 @@
+import time
+import threading
+from flask_socketio import join_room, leave_room, emit
+from unified_dashboard.extensions import socketio
+
+# -------------------------
+# Job progress channel
+# -------------------------
+# Background jobs publish progress here instead of clients polling for it.
+# Updates are merged per job and emitted to the job's Socket.IO room at most
+# once per MIN_INTERVAL; the latest state always goes out (trailing flush),
+# and terminal updates (finished / error) are sent immediately.
+
+PROGRESS_EVENT = "job_progress"
+MIN_INTERVAL = 0.25  # seconds between emits per job
+KEEP_FINISHED = 50   # finished jobs kept for late subscribers
+
+
+def _room(job_id):
+    return f"progress:{job_id}"
+
+
+class ProgressChannel:
+    def __init__(self, min_interval=MIN_INTERVAL):
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.jobs = {}  # job_id -> {"state": dict, "last_emit": float, "timer": Timer|None}
+
+    def start(self, job_id, **fields):
+        state = {"job_id": job_id, "running": True, "percent": 0, "stage": None, "message": "",
+                 "error": None, "eta_seconds": None, "started_at": time.time()}
+        state.update(fields)
+        with self.lock:
+            self.jobs[job_id] = {"state": state, "last_emit": 0.0, "timer": None}
+            self._prune()
+        self._emit(job_id)
+
+    def update(self, job_id, **fields):
+        """Merge `fields` into the job state; emits now or coalesces into a trailing emit."""
+        if job_id is None:
+            return
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            state = job["state"]
+            state.update(fields)
+            state["eta_seconds"] = self._eta(state)
+            terminal = not state.get("running") or state.get("error")
+            wait = job["last_emit"] + self.min_interval - time.time()
+            if not terminal and wait > 0:
+                if job["timer"] is None:
+                    job["timer"] = threading.Timer(wait, self._emit, args=(job_id,))
+                    job["timer"].daemon = True
+                    job["timer"].start()
+                return
+        self._emit(job_id)
+
+    def finish(self, job_id, **fields):
+        fields.setdefault("running", False)
+        self.update(job_id, **fields)
+
+    def snapshot(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job["state"]) if job else None
+
+    def _emit(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            if job["timer"] is not None:
+                job["timer"].cancel()
+                job["timer"] = None
+            job["last_emit"] = time.time()
+            payload = dict(job["state"])
+        socketio.emit(PROGRESS_EVENT, payload, to=_room(job_id))
+
+    @staticmethod
+    def _eta(state):
+        """Seconds remaining, extrapolated from elapsed time and percent complete."""
+        percent = state.get("percent") or 0
+        if 0 < percent < 100:
+            return int((time.time() - state["started_at"]) * (100 - percent) / percent)
+        return None
+
+    def _prune(self):
+        finished = [jid for jid, job in self.jobs.items() if not job["state"].get("running")]
+        for jid in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+            del self.jobs[jid]
+
+
+progress_channel = ProgressChannel()
+
+
+@socketio.on("progress_subscribe")
+def _on_progress_subscribe(data):
+    """Join a job's room and get its current state right away (covers jobs that already finished)."""
+    job_id = (data or {}).get("job_id")
+    if not job_id:
+        return
+    join_room(_room(job_id))
+    snap = progress_channel.snapshot(job_id)
+    if snap:
+        emit(PROGRESS_EVENT, snap)
+
+
+@socketio.on("progress_unsubscribe")
+def _on_progress_unsubscribe(data):
+    job_id = (data or {}).get("job_id")
+    if job_id:
+        leave_room(_room(job_id))